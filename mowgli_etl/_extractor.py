@@ -1,6 +1,7 @@
-import bz2
+import hashlib
 import logging
 import os.path
+import time
 from abc import ABC, abstractmethod
 from pathlib import Path
 from typing import Optional, Dict, Tuple, Union
@@ -10,7 +11,9 @@ from pathvalidate import sanitize_filename
 
 from mowgli_etl.http_client.etl_http_client import EtlHttpClient
 from mowgli_etl.http_client.real_etl_http_client import RealEtlHttpClient
+from mowgli_etl.parallel_bz2_decompressor import ParallelBz2Decompressor
 from mowgli_etl.pipeline_storage import PipelineStorage
+from mowgli_etl.virtual_extracted_file import VirtualExtractedFile
 
 
 class _Extractor(ABC):
@@ -20,15 +23,26 @@ class _Extractor(ABC):
     See the extract method.
     """
 
+    __DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+    __DOWNLOAD_PROGRESS_LOG_INTERVAL_S = 30.0
+
     def __init__(self, http_client: EtlHttpClient = None, **kwargs):
         if http_client is None:
             http_client = RealEtlHttpClient()
         self.__http_client = http_client
         self._logger = logging.getLogger(self.__class__.__name__)
 
-    def _download(self, from_url: str, force: bool, storage: PipelineStorage) -> Path:
+    def _download(self, from_url: str, force: bool, storage: PipelineStorage, sha256: Optional[str] = None) -> Path:
         """
         Utility method to download a file from a URL to a local file path.
+
+        The response is streamed to a .part file, which is renamed when the download is complete, so an interrupted
+        download is never mistaken for a complete one. The response's ETag or Last-Modified is saved to a
+        .part.validator file alongside. The next call resumes an interrupted download with an HTTP Range request, if the
+        server supports them, conditioned on the saved validator with If-Range, so the download starts over if the
+        content has changed since.
+
+        :param sha256: optional expected SHA-256 hex digest of the file, checked before the file is renamed
         """
 
         downloaded_file_path = storage.extracted_data_dir_path / sanitize_filename(
@@ -39,12 +53,82 @@ class _Extractor(ABC):
                 "%s already download and force not specified, skipping download",
                 from_url,
             )
+            return downloaded_file_path
+
+        part_file_path = downloaded_file_path.with_name(downloaded_file_path.name + ".part")
+        validator_file_path = downloaded_file_path.with_name(downloaded_file_path.name + ".part.validator")
+        part_file_size = 0
+        validator = None
+        if os.path.isfile(part_file_path):
+            if force:
+                os.unlink(part_file_path)
+            else:
+                part_file_size = os.path.getsize(part_file_path)
+                if os.path.isfile(validator_file_path):
+                    with open(validator_file_path) as validator_file:
+                        validator = validator_file.read()
+
+        hash_ = hashlib.sha256()
+        if part_file_size > 0 and not validator:
+            # Without a validator there's no telling whether the content has changed since
+            self._logger.info("no ETag or Last-Modified for the partial download of %s, restarting download", from_url)
+            in_f, start = self.__http_client.urlopen(from_url), 0
+        elif part_file_size > 0:
+            self._logger.info("resuming download of %s from byte %d", from_url, part_file_size)
+            in_f, start = self.__http_client.urlopen_range(from_url, part_file_size, if_range=validator)
+            if start == part_file_size:
+                with open(part_file_path, "rb") as part_f:
+                    for chunk in iter(lambda: part_f.read(self.__DOWNLOAD_CHUNK_SIZE), b""):
+                        hash_.update(chunk)
+            else:
+                self._logger.info("server didn't honor the range request, restarting download of %s", from_url)
         else:
             self._logger.info("downloading %s", from_url)
-            in_f = self.__http_client.urlopen(from_url)
-            with open(downloaded_file_path, "w+b") as out_f:
-                out_f.write(in_f.read())
-            self._logger.info("downloaded %s", from_url)
+            in_f, start = self.__http_client.urlopen(from_url), 0
+
+        if start == 0:
+            self.__write_download_validator(in_f, validator_file_path)
+
+        # Remaining length of an http.client.HTTPResponse, if the server sent a Content-Length
+        remaining_length = getattr(in_f, "length", None)
+        expected_size = start + remaining_length if isinstance(remaining_length, int) else None
+        size = start
+        last_progress_log_time = time.perf_counter()
+        try:
+            with open(part_file_path, "ab" if start > 0 else "wb") as out_f:
+                while True:
+                    chunk = in_f.read(self.__DOWNLOAD_CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    if isinstance(chunk, str):
+                        chunk = chunk.encode("utf-8")
+                    out_f.write(chunk)
+                    hash_.update(chunk)
+                    size += len(chunk)
+                    now = time.perf_counter()
+                    if now - last_progress_log_time >= self.__DOWNLOAD_PROGRESS_LOG_INTERVAL_S:
+                        last_progress_log_time = now
+                        if expected_size:
+                            self._logger.info("downloading %s: %d of %d bytes (%.1f%%)", from_url, size, expected_size, size * 100.0 / expected_size)
+                        else:
+                            self._logger.info("downloading %s: %d bytes", from_url, size)
+        finally:
+            close = getattr(in_f, "close", None)
+            if close is not None:
+                close()
+
+        if expected_size is not None and size != expected_size:
+            # Leave the .part file for the next call to resume
+            raise IOError(f"incomplete download of {from_url}: {size} of {expected_size} bytes")
+        if sha256 is not None and hash_.hexdigest() != sha256.lower():
+            os.unlink(part_file_path)
+            if os.path.isfile(validator_file_path):
+                os.unlink(validator_file_path)
+            raise ValueError(f"SHA-256 mismatch downloading {from_url}: expected {sha256}, actual {hash_.hexdigest()}")
+        os.replace(part_file_path, downloaded_file_path)
+        if os.path.isfile(validator_file_path):
+            os.unlink(validator_file_path)
+        self._logger.info("downloaded %s (%d bytes)", from_url, size)
         return downloaded_file_path
 
     @abstractmethod
@@ -57,11 +141,23 @@ class _Extractor(ABC):
         :return a **kwds dictionary to merge with kwds to pass to transformer
         """
 
-    def _extract_bz2(self, path: str, force: bool, storage: PipelineStorage) -> Path:
+    def _extract_bz2(self, path: str, force: bool, storage: PipelineStorage, processes: Optional[int] = None) -> Union[Path, VirtualExtractedFile]:
         """
         Utility method to decompress a local bz2 file and load it into the given storage repository.
+
+        Decompression is streamed to a .part file, which is renamed when it's complete. Multi-stream files are
+        decompressed in parallel (see ParallelBz2Decompressor).
+
+        If the storage streams extracted files, nothing is decompressed, and the file is returned as a
+        VirtualExtractedFile that the transformer decompresses as it reads.
+
+        :param processes: number of decompression processes, defaults to the number of CPUs
         """
 
+        if storage.stream_extracted_files:
+            self._logger.info("streaming bz2 file %s", path)
+            return VirtualExtractedFile(compressed_file_path=Path(path))
+
         extracted_file_path = storage.extracted_data_dir_path / sanitize_filename(path)
         if not force and os.path.isfile(extracted_file_path):
             self._logger.info(
@@ -70,9 +166,10 @@ class _Extractor(ABC):
             )
             return extracted_file_path
         self._logger.info("extracting bz2 file %s", path)
-        with bz2.open(path) as in_f:
-            with open(extracted_file_path, "w+b") as out_f:
-                out_f.write(in_f.read())
+        part_file_path = extracted_file_path.with_name(extracted_file_path.name + ".part")
+        with open(part_file_path, "w+b") as out_f:
+            ParallelBz2Decompressor(processes=processes).decompress(path, out_f)
+        os.replace(part_file_path, extracted_file_path)
         self._logger.info("extracted bz2 file %s", path)
         return extracted_file_path
 
@@ -83,18 +180,25 @@ class _Extractor(ABC):
         filenames: Union[str, Tuple[str, ...]],
         force: bool,
         storage: PipelineStorage
-    ) -> Dict[str, Path]:
+    ) -> Dict[str, Union[Path, VirtualExtractedFile]]:
         """
         Decompress a local zip file and load it into the given storage.
         :param archive_path: path to zip archive
         :param force: if false, extraction will be skipped for files already present in storage
         :param storage: PipelineStorage instance
         :param filenames: name or tuple of names of files to extract from the archive
-        :return paths to extracted filenames with order corresponding to filenames param.
+        :return paths to extracted filenames with order corresponding to filenames param, or VirtualExtractedFile's
+        of the archive members if the storage streams extracted files.
         """
-        extracted_dir = storage.extracted_data_dir_path
         if not isinstance(filenames, Tuple):
             filenames = (filenames,)
+        if storage.stream_extracted_files:
+            self._logger.info("streaming %s from zip archive %s", filenames, archive_path)
+            return {
+                fn: VirtualExtractedFile(compressed_file_path=Path(archive_path), member_name=fn)
+                for fn in filenames
+            }
+        extracted_dir = storage.extracted_data_dir_path
         extracted_file_paths = {fn: extracted_dir / fn for fn in filenames}
         if not force and all(fp.exists() for fp in extracted_file_paths.values()):
             self._logger.info(
@@ -109,3 +213,23 @@ class _Extractor(ABC):
             with ZipFile(archive_path) as zip_file:
                 zip_file.extractall(path=extracted_dir, members=filenames)
         return extracted_file_paths
+
+    @staticmethod
+    def __write_download_validator(in_f, validator_file_path: Path) -> None:
+        """
+        Save the strong ETag or the Last-Modified of an http.client.HTTPResponse, for If-Range when resuming.
+        """
+        validator = None
+        headers = getattr(in_f, "headers", None)
+        if headers is not None:
+            etag = headers.get("ETag")
+            if etag and not etag.startswith("W/"):
+                # Weak ETags can't be used with If-Range
+                validator = etag
+            else:
+                validator = headers.get("Last-Modified")
+        if validator:
+            with open(validator_file_path, "w") as validator_file:
+                validator_file.write(validator)
+        elif os.path.isfile(validator_file_path):
+            os.unlink(validator_file_path)
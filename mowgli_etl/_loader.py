@@ -1,11 +1,11 @@
 import logging
-import subprocess
-import sys
+import os
 from abc import ABC, abstractmethod
+from io import TextIOWrapper
 from pathlib import Path
+from typing import Dict, IO, Optional
 
-from mowgli_etl.model.kg_edge import KgEdge
-from mowgli_etl.model.kg_node import KgNode
+from mowgli_etl.loader.compressed_output_file import CompressedOutputFile
 from mowgli_etl.pipeline_storage import PipelineStorage
 
 
@@ -13,10 +13,25 @@ class _Loader(ABC):
     def __init__(self):
         self._logger = logging.getLogger(self.__class__.__name__)
 
-    def _bzip_file(self, file_path: Path):
-        if sys.platform.startswith("win"):
-            return
-        subprocess.call(["bzip2", "-9", "-f", str(file_path)])
+    def checkpoint(self) -> Dict[str, object]:
+        """
+        Flush everything loaded so far and return the JSON-serializable state needed to resume loading from this point.
+
+        Only called on loaders opened with open_checkpointed.
+        :return: the loader's checkpoint state
+        """
+        raise NotImplementedError(f"{self.__class__.__name__} doesn't support checkpointing")
+
+    @staticmethod
+    def _checkpoint_file(file: IO) -> int:
+        """
+        Flush an output file opened by _open_checkpointed_file and return its offset, for checkpoint implementations.
+        """
+        file.flush()
+        if isinstance(getattr(file, "buffer", None), CompressedOutputFile):
+            return file.buffer.checkpoint()
+        os.fsync(file.fileno())
+        return file.tell()
 
     @abstractmethod
     def close(self) -> None:
@@ -36,3 +51,47 @@ class _Loader(ABC):
         Open this loader before calling load_* methods.
         """
         return self
+
+    def open_checkpointed(self, storage: PipelineStorage, checkpoint: Optional[Dict[str, object]]):
+        """
+        Open this loader for a run that takes checkpoints, instead of open.
+
+        :param checkpoint: state returned by checkpoint in a previous run, to continue from that checkpoint and discard
+        anything loaded after it, or None to start from scratch
+        """
+        raise NotImplementedError(f"{self.__class__.__name__} doesn't support checkpointing")
+
+    @staticmethod
+    def _open_checkpointed_file(
+            file_path: Path,
+            offset: Optional[int],
+            *,
+            compression: Optional[str] = None,
+            compression_threads: int = 1
+    ) -> IO:
+        """
+        Open a text output file for open and open_checkpointed implementations: truncate it to the checkpointed offset
+        and position at the end, or create it if offset is None.
+
+        :param compression: compress the file as it's written (see CompressedOutputFile), and add the compression's
+        extension to the file name
+        :param compression_threads: number of threads to compress blocks of the file in parallel
+        """
+        if compression is not None:
+            if compression not in CompressedOutputFile.FILE_EXTENSIONS:
+                raise NotImplementedError(compression)
+            return TextIOWrapper(
+                CompressedOutputFile(
+                    file_path.with_name(file_path.name + CompressedOutputFile.FILE_EXTENSIONS[compression]),
+                    compression=compression,
+                    offset=offset,
+                    threads=compression_threads,
+                ),
+                encoding="utf-8",
+            )
+        if offset is None:
+            return open(file_path, "w+")
+        file = open(file_path, "r+")
+        file.truncate(offset)
+        file.seek(offset)
+        return file
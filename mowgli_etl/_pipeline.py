@@ -6,6 +6,7 @@ from configargparse import ArgParser
 from mowgli_etl._extractor import _Extractor
 from mowgli_etl._loader import _Loader
 from mowgli_etl._transformer import _Transformer
+from mowgli_etl.loader.composite_loader import CompositeLoader
 from mowgli_etl.loader.cskg_csv.cskg_csv_loader import CskgCsvLoader
 from mowgli_etl.loader.kgtk.kgtk_edges_tsv_loader import KgtkEdgesTsvLoader
 
@@ -53,20 +54,92 @@ class _Pipeline(ABC):
 
     @classmethod
     def __add_loader_arguments(cls, arg_parser):
-        arg_parser.add_argument("--loader", default="cskg_csv")
+        arg_parser.add_argument(
+            "--loader",
+            default="cskg_csv",
+            help="loader name, or a comma-separated list of loader names to write several formats in one pass"
+        )
+        arg_parser.add_argument(
+            "--loader-threaded",
+            action="store_true",
+            help="with several loaders, run each loader in its own thread"
+        )
+        arg_parser.add_argument(
+            "--loader-compression",
+            choices=("bz2", "gzip", "lzma"),
+            help="compress the loaded files as they're written"
+        )
+        arg_parser.add_argument(
+            "--loader-compression-threads",
+            type=int,
+            default=1,
+            help="number of threads to compress blocks of the loaded files in parallel"
+        )
+        arg_parser.add_argument(
+            "--kgtk-node-label-join",
+            choices=("lookup", "sort_merge"),
+            default="lookup",
+            help="how the kgtk_edges_tsv loader joins node labels to edges: look up each edge's nodes, or sort-merge join nodes and edges when the loader is closed, for graphs bigger than RAM"
+        )
+        arg_parser.add_argument(
+            "--kgtk-edge-order",
+            choices=("original", "subject"),
+            default="original",
+            help="order of the edges written by the kgtk_edges_tsv loader with --kgtk-node-label-join sort_merge"
+        )
 
     def __create_loader(
-        self, id: str, loader: Optional[str] = None, **loader_kwds
+        self,
+        id: str,
+        loader: Optional[str] = None,
+        loader_compression: Optional[str] = None,
+        loader_compression_threads: Optional[int] = None,
+        kgtk_edge_order: Optional[str] = None,
+        kgtk_node_label_join: Optional[str] = None,
+        loader_threaded: Optional[bool] = None,
+        **loader_kwds
     ) -> _Loader:
         if loader is None:
             loader = "cskg_csv"
         else:
             loader = loader.lower()
 
+        loader_names = []
+        for loader_name in loader.split(","):
+            loader_name = loader_name.strip()
+            if loader_name and loader_name not in loader_names:
+                loader_names.append(loader_name)
+        if len(loader_names) > 1:
+            # Transform once and fan the models out to every loader
+            return CompositeLoader(
+                tuple(
+                    self.__create_loader(
+                        id=id,
+                        loader=loader_name,
+                        loader_compression=loader_compression,
+                        loader_compression_threads=loader_compression_threads,
+                        kgtk_edge_order=kgtk_edge_order,
+                        kgtk_node_label_join=kgtk_node_label_join,
+                    )
+                    for loader_name in loader_names
+                ),
+                threaded=bool(loader_threaded),
+            )
+        elif loader_names:
+            loader = loader_names[0]
+
+        compression_kwds = {
+            "compression": loader_compression,
+            "compression_threads": loader_compression_threads if loader_compression_threads is not None else 1,
+        }
         if loader == "cskg_csv":
-            return CskgCsvLoader()
+            return CskgCsvLoader(**compression_kwds)
         elif loader == "kgtk_edges_tsv":
-            return KgtkEdgesTsvLoader()
+            return KgtkEdgesTsvLoader(
+                edge_order=kgtk_edge_order if kgtk_edge_order is not None else "original",
+                node_label_join=kgtk_node_label_join if kgtk_node_label_join is not None else "lookup",
+                **compression_kwds
+            )
         else:
             raise NotImplementedError(loader)
 
@@ -0,0 +1,85 @@
+import queue
+import threading
+from typing import Generator, Iterable, List
+
+from mowgli_etl._closeable import _Closeable
+
+
+class _ProducerException:
+    def __init__(self, exception: BaseException):
+        self.exception = exception
+
+
+class BoundedHandoff(_Closeable):
+    """
+    Run an iterable in a producer thread and hand its items to the consuming thread in batches through a bounded queue.
+
+    The consumer sees the same items in the same order as if it had iterated over the iterable itself. If the iterable
+    raises, the consumer gets the items that preceded the exception and then the exception.
+
+    The producer blocks when queue_depth batches are waiting, which bounds memory. Closing the handoff stops the producer
+    and closes the iterable (if it's a generator) in the producer thread.
+    """
+
+    __END = object()
+    # Seconds between checks of the stop flag while the queue is full
+    __PUT_TIMEOUT_S = 0.1
+
+    def __init__(self, iterable: Iterable, *, batch_size: int = 1000, queue_depth: int = 8):
+        if batch_size < 1:
+            raise ValueError("batch_size must be >= 1")
+        if queue_depth < 1:
+            raise ValueError("queue_depth must be >= 1")
+        self.__batch_size = batch_size
+        self.__iterable = iterable
+        self.__queue = queue.Queue(maxsize=queue_depth)
+        self.__stop = threading.Event()
+        self.__thread = threading.Thread(target=self.__produce, name="BoundedHandoffProducer", daemon=True)
+
+    def close(self):
+        self.__stop.set()
+        if self.__thread.is_alive():
+            self.__thread.join()
+
+    def __iter__(self) -> Generator[object, None, None]:
+        self.__thread.start()
+        while True:
+            batch = self.__queue.get()
+            if batch is self.__END:
+                return
+            elif isinstance(batch, _ProducerException):
+                raise batch.exception
+            yield from batch
+
+    def __produce(self) -> None:
+        batch: List[object] = []
+        try:
+            for item in self.__iterable:
+                batch.append(item)
+                if len(batch) == self.__batch_size:
+                    if not self.__put(batch):
+                        return
+                    batch = []
+            if batch and not self.__put(batch):
+                return
+            self.__put(self.__END)
+        except BaseException as e:
+            if batch and not self.__put(batch):
+                return
+            self.__put(_ProducerException(e))
+        finally:
+            close = getattr(self.__iterable, "close", None)
+            if close is not None:
+                close()
+
+    def __put(self, item) -> bool:
+        """
+        :return: False if the handoff was stopped before the item could be queued
+        """
+        while not self.__stop.is_set():
+            try:
+                self.__queue.put(item, timeout=self.__PUT_TIMEOUT_S)
+                return True
+            except queue.Full:
+                continue
+        return False
@@ -1,11 +1,14 @@
+import cProfile
 import logging
 import sys
+from pathlib import Path
 
 from configargparse import ArgParser
 
 from mowgli_etl.cli.commands.augment_cskg_release_command import AugmentCskgReleaseCommand
 from mowgli_etl.cli.commands.drive_upload_command import DriveUploadCommand
 from mowgli_etl.cli.commands.etl_command import EtlCommand
+from mowgli_etl.cli.sampling_profiler import SamplingProfiler
 try:
     from mowgli_etl.cli.commands.index_concept_net_command import IndexConceptNetCommand
 except ImportError:
@@ -32,6 +35,17 @@ class Cli:
             "--logging-level",
             help="set logging-level level (see Python logging module)",
         )
+        arg_parser.add_argument(
+            "--profile",
+            choices=("cprofile", "sampling"),
+            const="cprofile",
+            nargs="?",
+            help="profile the command with cProfile (default), and write a pstats file, or with a low-overhead sampling profiler, and write a pstats file and a collapsed stack file for flame graphs. The sampling profiler only samples the main thread, so it doesn't see work moved to other threads by --pipelined or --loader-threaded",
+        )
+        arg_parser.add_argument(
+            "--profile-output",
+            help="profile output path prefix, defaults to mowgli-etl-<command> in the current directory; .pstats and, when sampling, .collapsed are appended",
+        )
 
     def __configure_logging(self, args):
         if args.debug:
@@ -48,7 +62,42 @@ class Cli:
     def main(self):
         args = self.__parse_args()
         self.__configure_logging(args)
-        self.__commands[args.command](args)
+        command = self.__commands[args.command]
+        if args.profile is None:
+            command(args)
+        else:
+            self.__profile_command(args, command)
+
+    def __profile_command(self, args, command):
+        logger = logging.getLogger(self.__class__.__name__)
+        profile_output_path_prefix = args.profile_output
+        if profile_output_path_prefix is None:
+            profile_output_path_prefix = "mowgli-etl-" + args.command
+        pstats_file_path = Path(profile_output_path_prefix + ".pstats")
+        collapsed_stacks_file_path = Path(profile_output_path_prefix + ".collapsed")
+
+        if args.profile == "cprofile":
+            # Not sampled as well, since cProfile would profile the sampler's signal handler and inflate the time of
+            # whatever function it interrupted
+            profile = cProfile.Profile()
+            try:
+                profile.runcall(command, args)
+            finally:
+                profile.dump_stats(str(pstats_file_path))
+                logger.info("wrote profile to %s", pstats_file_path)
+            return
+
+        sampling_profiler = SamplingProfiler()
+        try:
+            with sampling_profiler:
+                command(args)
+        finally:
+            sampling_profiler.write_pstats(pstats_file_path)
+            sampling_profiler.write_collapsed_stacks(collapsed_stacks_file_path)
+            logger.info(
+                "wrote profile to %s and %d samples to %s",
+                pstats_file_path, sampling_profiler.sample_count, collapsed_stacks_file_path
+            )
 
     def __parse_args(self):
         arg_parser = ArgParser()
@@ -1,9 +1,9 @@
-import importlib.util
+import importlib
 import os.path
 import re
 from inspect import isclass
 from types import FunctionType
-from typing import Type, Tuple, Optional
+from typing import Dict, Type, Tuple, Optional
 
 from configargparse import ArgParser
 
@@ -17,6 +17,9 @@ from mowgli_etl.pipeline_wrapper import PipelineWrapper
 
 
 class EtlCommand(_Command):
+    # Arguments that affect how the pipeline is run but not what it loads
+    __RUN_ARGS = ("check_workers", "checkpoint_interval", "debug", "handoff_batch_size", "handoff_queue_depth", "loader_compression_threads", "loader_threaded", "parallel", "profile", "profile_output", "stream_extracted_files", "whole_graph_check")
+
     def __init__(self):
         super().__init__()
         self.__pipeline_class_dict = self.__import_pipeline_classes()
@@ -50,6 +53,61 @@ class EtlCommand(_Command):
             action="store_true",
             help="Skip checking of nodes/edges during transform"
         )
+        arg_parser.add_argument(
+            "--check-workers",
+            type=int,
+            help="check nodes/edges during transform in this many worker processes, each owning a shard of the graph"
+        )
+        arg_parser.add_argument(
+            "--whole-graph-check",
+            choices=("exact", "fingerprint", "external_sort", "bloom_filter"),
+            help="how to check nodes/edges during transform: exact (default); fingerprint, which is exact but stores fixed-width digests instead of models; external_sort, which sorts the graph on disk with bounded memory; or bloom_filter, which avoids most storage lookups. external_sort and bloom_filter report violations at the end of the transform"
+        )
+        arg_parser.add_argument(
+            "--pipelined",
+            action="store_true",
+            help="run the loader in a separate thread from the transform, linked by a bounded queue of model batches"
+        )
+        arg_parser.add_argument(
+            "--handoff-batch-size",
+            type=int,
+            help="number of models per batch handed to the loader with --pipelined (default 1000)"
+        )
+        arg_parser.add_argument(
+            "--handoff-queue-depth",
+            type=int,
+            help="maximum number of batches waiting for the loader with --pipelined (default 8)"
+        )
+        arg_parser.add_argument(
+            "--checkpoint-interval",
+            type=int,
+            help="checkpoint the run every this many transformed models, so that it can be continued with --resume"
+        )
+        arg_parser.add_argument(
+            "--resume",
+            action="store_true",
+            help="continue from the last checkpoint of a failed run, truncating output written after it"
+        )
+        arg_parser.add_argument(
+            "--spill-transform-output",
+            action="store_true",
+            help="write the checked transform output to a binary file in the transformed data directory, for --replay-transform-output"
+        )
+        arg_parser.add_argument(
+            "--replay-transform-output",
+            action="store_true",
+            help="skip the extract, transform, and whole graph check, and map and load the transform output spilled by a previous run"
+        )
+        arg_parser.add_argument(
+            "--incremental",
+            action="store_true",
+            help="skip the transform and load if the extracted inputs, code, and arguments haven't changed since the last successful incremental run"
+        )
+        arg_parser.add_argument(
+            "--stream-extracted-files",
+            action="store_true",
+            help="read .bz2 and zip sources directly in the transform instead of decompressing them to the extracted directory first"
+        )
 
     def __call__(self, args):
         if args.pipeline_module is None:
@@ -60,10 +118,27 @@ class EtlCommand(_Command):
         pipeline_storage = PipelineStorage(
             pipeline_id=pipeline.id,
             root_data_dir_path=self.__create_data_dir_path(args),
+            stream_extracted_files=bool(getattr(args, "stream_extracted_files", False)),
         )
         pipeline_wrapper = PipelineWrapper(pipeline=pipeline, storage=pipeline_storage)
         run_kwds = {"force": bool(getattr(args, "force", False)),
-                    "skip_whole_graph_check": bool(getattr(args, "skip_whole_graph_check", False))}
+                    "skip_whole_graph_check": bool(getattr(args, "skip_whole_graph_check", False)),
+                    "check_workers": getattr(args, "check_workers", None),
+                    "whole_graph_check": getattr(args, "whole_graph_check", None),
+                    "pipelined": bool(getattr(args, "pipelined", False)),
+                    "resume": bool(getattr(args, "resume", False)),
+                    "incremental": bool(getattr(args, "incremental", False)),
+                    "replay_transform_output": bool(getattr(args, "replay_transform_output", False)),
+                    "spill_transform_output": bool(getattr(args, "spill_transform_output", False))}
+        for optional_arg in ("checkpoint_interval", "handoff_batch_size", "handoff_queue_depth"):
+            if getattr(args, optional_arg, None) is not None:
+                run_kwds[optional_arg] = getattr(args, optional_arg)
+        # Record the pipeline's own arguments in the incremental run manifest, not the run options or logging settings
+        run_kwds["pipeline_arguments"] = {
+            key: value
+            for key, value in self.__pipeline_kwds(args).items()
+            if key not in run_kwds and key not in self.__RUN_ARGS
+        }
         if pipeline_class.__name__ == RpiCombinedPipeline.__name__:  # The odd imports make this necessary
             # Combined pipeline does its own mapping
             pipeline_wrapper.run(**run_kwds)
@@ -85,11 +160,11 @@ class EtlCommand(_Command):
     def __import_pipeline_class_from_file(
         self, file_path
     ) -> Optional[Tuple[str, Type[_Pipeline]]]:
-        module_name = re.sub(r"\.py$", "", file_path.name)
+        # Import the module by its package path, so it's the same module other code imports and profilers see a
+        # meaningful module name.
+        module_name = ".".join(file_path.relative_to(paths.PROJECT_ROOT).with_suffix("").parts)
         try:
-            spec = importlib.util.spec_from_file_location(module_name, file_path)
-            pipeline_module = importlib.util.module_from_spec(spec)
-            spec.loader.exec_module(pipeline_module)
+            pipeline_module = importlib.import_module(module_name)
         except (ImportError, SyntaxError):
             self._logger.error("error importing pipeline module %s", module_name, exc_info=True)
             return
@@ -124,6 +199,11 @@ class EtlCommand(_Command):
         return pipeline_class_dict
 
     def __instantiate_pipeline(self, args, pipeline_class, **kwds) -> _Pipeline:
+        pipeline_kwds = self.__pipeline_kwds(args)
+        pipeline_kwds.update(kwds)
+        return pipeline_class(**pipeline_kwds)
+
+    def __pipeline_kwds(self, args) -> Dict[str, object]:
         pipeline_kwds = vars(args).copy()
         pipeline_kwds.pop("c")
         pipeline_kwds.pop("command")
@@ -131,5 +211,4 @@ class EtlCommand(_Command):
         pipeline_kwds.pop("force")
         pipeline_kwds.pop("logging_level")
         pipeline_kwds.pop("pipeline_module")
-        pipeline_kwds.update(kwds)
-        return pipeline_class(**pipeline_kwds)
+        return pipeline_kwds
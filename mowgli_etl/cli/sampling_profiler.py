@@ -0,0 +1,117 @@
+import marshal
+import os.path
+import signal
+from pathlib import Path
+from types import CodeType, FrameType
+from typing import Dict, Tuple
+
+from mowgli_etl import paths
+
+
+class SamplingProfiler:
+    """
+    Low-overhead statistical profiler of the main thread.
+
+    A CPU time interval timer (signal.setitimer(ITIMER_PROF)) interrupts the process every interval seconds, and the
+    signal handler records the main thread's Python call stack. Unlike cProfile, the profiled code runs at full speed
+    between samples.
+
+    Functions are named by module and qualified name, with modules under the project root named by their package path
+    (e.g., mowgli_etl.pipeline.swow.swow_transformer) rather than by how they happened to be imported.
+
+    Requires a platform with SIGPROF (i.e., not Windows). Only the main thread of the current process is sampled, so work
+    in other threads, such as loading with --pipelined or --loader-threaded, doesn't show up in the profile.
+    """
+
+    def __init__(self, *, interval_s: float = 0.001):
+        self.__frame_names: Dict[CodeType, str] = {}
+        self.__interval_s = interval_s
+        self.__previous_signal_handler = None
+        # stack of frame names, root first -> sample count
+        self.__stack_counts: Dict[Tuple[str, ...], int] = {}
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *args, **kwds):
+        self.stop()
+
+    def __frame_name(self, code: CodeType) -> str:
+        try:
+            return self.__frame_names[code]
+        except KeyError:
+            pass
+        file_path = Path(os.path.abspath(code.co_filename))
+        try:
+            module_name = ".".join(file_path.relative_to(paths.PROJECT_ROOT).with_suffix("").parts)
+        except ValueError:
+            module_name = file_path.stem
+        frame_name = self.__frame_names[code] = "%s:%s:%d" % (
+            module_name, getattr(code, "co_qualname", code.co_name), code.co_firstlineno
+        )
+        return frame_name
+
+    def __on_signal(self, signum: int, frame: FrameType) -> None:
+        stack = []
+        while frame is not None:
+            stack.append(self.__frame_name(frame.f_code))
+            frame = frame.f_back
+        stack.reverse()
+        stack = tuple(stack)
+        self.__stack_counts[stack] = self.__stack_counts.get(stack, 0) + 1
+
+    @property
+    def sample_count(self) -> int:
+        return sum(self.__stack_counts.values())
+
+    def start(self) -> None:
+        self.__previous_signal_handler = signal.signal(signal.SIGPROF, self.__on_signal)
+        signal.setitimer(signal.ITIMER_PROF, self.__interval_s, self.__interval_s)
+
+    def stop(self) -> None:
+        signal.setitimer(signal.ITIMER_PROF, 0, 0)
+        signal.signal(signal.SIGPROF, self.__previous_signal_handler or signal.SIG_DFL)
+
+    def write_collapsed_stacks(self, file_path: Path) -> None:
+        """
+        Write the samples in the collapsed stack format read by flamegraph.pl, speedscope, and similar tools:
+        one line per distinct stack, frames separated by ;, followed by the sample count.
+        """
+        with open(file_path, "w") as file_:
+            for stack, count in sorted(self.__stack_counts.items()):
+                file_.write("%s %d\n" % (";".join(stack), count))
+
+    def write_pstats(self, file_path: Path) -> None:
+        """
+        Write the samples as a pstats file, with times estimated as sample count * interval.
+        """
+        # (file, line, function) -> [primitive calls, total calls, own time, cumulative time, {caller: ...}]
+        stats = {}
+        for stack, count in self.__stack_counts.items():
+            time_s = count * self.__interval_s
+            seen = set()
+            caller = None
+            for frame_i, frame_name in enumerate(stack):
+                module_name, function_name, line = frame_name.rsplit(":", 2)
+                function = (module_name, int(line), function_name)
+                function_stats = stats.setdefault(function, [0, 0, 0.0, 0.0, {}])
+                if function not in seen:
+                    # Count recursive frames once in the cumulative time
+                    function_stats[0] += count
+                    function_stats[1] += count
+                    function_stats[3] += time_s
+                    seen.add(function)
+                if frame_i == len(stack) - 1:
+                    function_stats[2] += time_s
+                if caller is not None:
+                    caller_stats = function_stats[4].setdefault(caller, [0, 0, 0.0, 0.0])
+                    caller_stats[0] += count
+                    caller_stats[1] += count
+                    caller_stats[3] += time_s
+                caller = function
+        with open(file_path, "wb") as file_:
+            marshal.dump({
+                function: (cc, nc, tt, ct, {caller: tuple(caller_stats) for caller, caller_stats in callers.items()})
+                for function, (cc, nc, tt, ct, callers) in stats.items()
+            }, file_)
@@ -1,8 +1,19 @@
 from abc import ABC, abstractmethod
-from typing import IO
+from typing import IO, Tuple
 
 
 class EtlHttpClient(ABC):
     @abstractmethod
     def urlopen(self, url: str) -> IO:
         raise NotImplementedError()
+
+    def urlopen_range(self, url: str, start: int, *, if_range: str) -> Tuple[IO, int]:
+        """
+        Open a URL, asking for the content from a byte offset on.
+
+        The default implementation doesn't support ranges and always returns the whole content.
+        :param if_range: ETag or Last-Modified of the content the range continues, the whole content is returned if the
+        content has changed since
+        :return: (response, offset of the response's first byte in the content, 0 if the range was not honored)
+        """
+        return self.urlopen(url), 0
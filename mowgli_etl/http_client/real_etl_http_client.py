@@ -1,5 +1,7 @@
-from typing import IO
-from urllib.request import urlopen
+import re
+from typing import IO, Tuple
+from urllib.error import HTTPError
+from urllib.request import Request, urlopen
 
 from mowgli_etl.http_client.etl_http_client import EtlHttpClient
 
@@ -7,3 +9,20 @@ from mowgli_etl.http_client.etl_http_client import EtlHttpClient
 class RealEtlHttpClient(EtlHttpClient):
     def urlopen(self, url: str) -> IO:
         return urlopen(url)
+
+    def urlopen_range(self, url: str, start: int, *, if_range: str) -> Tuple[IO, int]:
+        try:
+            # If the content has changed, the server ignores the Range and returns the whole content.
+            response = urlopen(Request(url, headers={"If-Range": if_range, "Range": "bytes=%d-" % start}))
+        except HTTPError as e:
+            if e.code != 416:
+                raise
+            # Range Not Satisfiable, e.g., the content changed size. Start over.
+            return self.urlopen(url), 0
+        if response.status != 206:
+            return response, 0
+        content_range = re.match(r"bytes (\d+)-", response.headers.get("Content-Range", ""))
+        if content_range is not None and int(content_range.group(1)) != start:
+            response.close()
+            return self.urlopen(url), 0
+        return response, start
@@ -1,5 +1,7 @@
-from pathlib import Path
-from typing import Sequence, Optional
+import queue
+import threading
+from functools import partial
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
 
 from mowgli_etl._loader import _Loader
 from mowgli_etl.loader._benchmark_answer_loader import _BenchmarkAnswerLoader
@@ -11,49 +13,200 @@ from mowgli_etl.loader._kg_node_loader import _KgNodeLoader
 from mowgli_etl.loader._kg_path_loader import _KgPathLoader
 
 
+class _LoaderThread:
+    """
+    Thread that calls one loader's load methods with batches of models from a bounded queue.
+
+    If a load method raises, the thread discards the rest of the models, so the submitting thread never blocks, and the
+    exception is raised in the submitting thread by the next submit, drain, or stop.
+    """
+
+    __END = None
+
+    def __init__(self, loader: _Loader, *, batch_size: int, queue_depth: int):
+        self.__batch: List[Tuple[Callable, object]] = []
+        self.__batch_size = batch_size
+        self.__exception: Optional[BaseException] = None
+        self.__queue = queue.Queue(maxsize=queue_depth)
+        self.__thread = threading.Thread(target=self.__run, name=f"{loader.__class__.__name__}Thread", daemon=True)
+        self.__thread.start()
+
+    def drain(self) -> None:
+        """
+        Wait until every submitted model has been loaded.
+        """
+        self.__put_batch()
+        self.__queue.join()
+        self.__raise_exception()
+
+    def __put_batch(self) -> None:
+        if self.__batch:
+            self.__queue.put(self.__batch)
+            self.__batch = []
+
+    def __raise_exception(self) -> None:
+        if self.__exception is not None:
+            exception, self.__exception = self.__exception, None
+            raise exception
+
+    def __run(self) -> None:
+        while True:
+            batch = self.__queue.get()
+            try:
+                if batch is self.__END:
+                    return
+                if self.__exception is not None:
+                    continue
+                try:
+                    for load_method, model in batch:
+                        load_method(model)
+                except BaseException as e:
+                    self.__exception = e
+            finally:
+                self.__queue.task_done()
+
+    def stop(self) -> None:
+        """
+        Load every submitted model, then stop the thread.
+        """
+        self.__put_batch()
+        self.__queue.put(self.__END)
+        self.__thread.join()
+        self.__raise_exception()
+
+    def submit(self, load_method: Callable, model) -> None:
+        self.__raise_exception()
+        self.__batch.append((load_method, model))
+        if len(self.__batch) >= self.__batch_size:
+            self.__put_batch()
+
+
 class CompositeLoader(_BenchmarkLoader, _BenchmarkAnswerLoader, _BenchmarkQuestionLoader, _BenchmarkSubmissionLoader, _KgEdgeLoader, _KgNodeLoader, _KgPathLoader):
-    def __init__(self, loaders: Optional[Sequence[_Loader]] = None):
+    """
+    Loader that loads each model into every child loader of the model's type.
+
+    Which children load which model types is resolved once, on the first load after opening, rather than per model.
+
+    If threaded, each child loader runs in its own thread, fed batches of models through a bounded queue, so slow
+    loaders, such as compressing ones, run concurrently instead of one after another. Each child still gets the models
+    in order. Loading errors are raised on a later load, a checkpoint, or close.
+    """
+
+    __LOAD_METHODS = (
+        (_BenchmarkLoader, "load_benchmark"),
+        (_BenchmarkAnswerLoader, "load_benchmark_answer"),
+        (_BenchmarkQuestionLoader, "load_benchmark_question"),
+        (_BenchmarkSubmissionLoader, "load_benchmark_submission"),
+        (_KgEdgeLoader, "load_kg_edge"),
+        (_KgNodeLoader, "load_kg_node"),
+        (_KgPathLoader, "load_kg_path"),
+    )
+
+    def __init__(
+            self,
+            loaders: Optional[Sequence[_Loader]] = None,
+            *,
+            batch_size: int = 1000,
+            queue_depth: int = 8,
+            threaded: bool = False
+    ):
+        """
+        :param loaders: child loaders, more can be appended to _loaders until the first load
+        :param batch_size: if threaded, number of models per batch handed to a child loader's thread
+        :param queue_depth: if threaded, maximum number of batches waiting for each child loader
+        :param threaded: run each child loader in its own thread
+        """
         self._loaders = []
         if loaders is not None:
             self._loaders.extend(loaders)
+        self.__batch_size = batch_size
+        self.__load_methods: Optional[Dict[str, Tuple[Callable, ...]]] = None
+        self.__queue_depth = queue_depth
+        self.__threaded = threaded
+        self.__threads: List[_LoaderThread] = []
+
+    def checkpoint(self):
+        for thread in self.__threads:
+            thread.drain()
+        return {"loaders": [loader.checkpoint() for loader in self._loaders]}
 
     def close(self):
+        exception = None
+        for thread in self.__threads:
+            try:
+                thread.stop()
+            except BaseException as e:
+                if exception is None:
+                    exception = e
+        self.__threads = []
+        self.__load_methods = None
         for loader in self._loaders:
             loader.close()
+        if exception is not None:
+            raise exception
 
     def load_benchmark(self, benchmark):
-        self.__load_model(loader_class=_BenchmarkLoader, load_method_name="load_benchmark", model=benchmark)
+        self.__load_model("load_benchmark", benchmark)
 
     def load_benchmark_answer(self, benchmark_answer):
-        self.__load_model(loader_class=_BenchmarkAnswerLoader, load_method_name="load_benchmark_answer", model=benchmark_answer)
+        self.__load_model("load_benchmark_answer", benchmark_answer)
 
     def load_benchmark_question(self, benchmark_question):
-        self.__load_model(loader_class=_BenchmarkQuestionLoader, load_method_name="load_benchmark_question", model=benchmark_question)
+        self.__load_model("load_benchmark_question", benchmark_question)
 
     def load_benchmark_submission(self, benchmark_submission):
-        self.__load_model(loader_class=_BenchmarkSubmissionLoader, load_method_name="load_benchmark_submission", model=benchmark_submission)
+        self.__load_model("load_benchmark_submission", benchmark_submission)
 
     def load_kg_edge(self, edge):
-        self.__load_model(loader_class=_KgEdgeLoader, load_method_name="load_kg_edge", model=edge)
+        self.__load_model("load_kg_edge", edge)
 
-    def __load_model(self, loader_class, load_method_name: str, model) -> None:
-        loaded = False
-        for loader in self._loaders:
-            if not isinstance(loader, loader_class):
-                continue
-            load_method = getattr(loader, load_method_name)
-            load_method(model)
-            loaded = True
-        if not loaded:
+    def __load_model(self, load_method_name: str, model) -> None:
+        load_methods = self.__load_methods
+        if load_methods is None:
+            load_methods = self.__resolve_load_methods()
+        load_methods = load_methods[load_method_name]
+        if not load_methods:
             raise RuntimeError(f"no loader for {model.__class__.__name__}")
+        for load_method in load_methods:
+            load_method(model)
 
     def load_kg_node(self, node):
-        self.__load_model(loader_class=_KgNodeLoader, load_method_name="load_kg_node", model=node)
+        self.__load_model("load_kg_node", node)
 
     def load_kg_path(self, path):
-        self.__load_model(loader_class=_KgPathLoader, load_method_name="load_kg_path", model=path)
+        self.__load_model("load_kg_path", path)
 
     def open(self, storage):
+        self.__load_methods = None
         for loader in self._loaders:
             loader.open(storage)
         return self
+
+    def open_checkpointed(self, storage, checkpoint):
+        self.__load_methods = None
+        for loader_i, loader in enumerate(self._loaders):
+            loader.open_checkpointed(storage, checkpoint["loaders"][loader_i] if checkpoint is not None else None)
+        return self
+
+    def __resolve_load_methods(self) -> Dict[str, Tuple[Callable, ...]]:
+        """
+        Map each load method name to the load methods of the child loaders that implement it, or in threaded mode to
+        functions that submit models to the child loaders' threads.
+        """
+        threads = [
+            _LoaderThread(loader, batch_size=self.__batch_size, queue_depth=self.__queue_depth)
+            if self.__threaded else None
+            for loader in self._loaders
+        ]
+        self.__threads = [thread for thread in threads if thread is not None]
+        load_methods = {}
+        for loader_class, load_method_name in self.__LOAD_METHODS:
+            loader_load_methods = []
+            for loader, thread in zip(self._loaders, threads):
+                if not isinstance(loader, loader_class):
+                    continue
+                load_method = getattr(loader, load_method_name)
+                loader_load_methods.append(partial(thread.submit, load_method) if thread is not None else load_method)
+            load_methods[load_method_name] = tuple(loader_load_methods)
+        self.__load_methods = load_methods
+        return load_methods
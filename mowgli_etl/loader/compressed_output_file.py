@@ -0,0 +1,145 @@
+import bz2
+import gzip
+import io
+import lzma
+import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Optional
+
+
+class CompressedOutputFile(io.BufferedIOBase):
+    """
+    Binary output file that is compressed in-process as it's written, for loaders. Wrap it in a TextIOWrapper to write
+    text.
+
+    With one thread, the file is a single bz2, gzip, or xz stream written by the stdlib. With more threads, the data is
+    split into fixed-size blocks that are compressed in a thread pool (the compressors release the GIL) and written in
+    order as a series of concatenated streams, which bzip2, gzip, xz, and the stdlib all decompress as one.
+
+    checkpoint ends the current stream and returns the compressed offset. Truncating the file to that offset leaves a
+    valid compressed file, to which more streams can be appended.
+    """
+
+    COMPRESSIONS = ("bz2", "gzip", "lzma")
+    DEFAULT_BLOCK_SIZE = 4 * 1024 * 1024
+    FILE_EXTENSIONS = {"bz2": ".bz2", "gzip": ".gz", "lzma": ".xz"}
+
+    __COMPRESS = {"bz2": bz2.compress, "gzip": gzip.compress, "lzma": lzma.compress}
+    __OPEN_STREAM = {
+        "bz2": lambda file_: bz2.BZ2File(file_, "wb"),
+        "gzip": lambda file_: gzip.GzipFile(fileobj=file_, mode="wb"),
+        "lzma": lambda file_: lzma.LZMAFile(file_, "wb"),
+    }
+
+    def __init__(
+            self,
+            file_path: Path,
+            *,
+            compression: str,
+            block_size: int = DEFAULT_BLOCK_SIZE,
+            offset: Optional[int] = None,
+            threads: int = 1
+    ):
+        """
+        :param file_path: path of the compressed file, including the extension
+        :param compression: one of COMPRESSIONS
+        :param block_size: uncompressed size of the blocks compressed in parallel, if threads > 1
+        :param offset: offset returned by checkpoint, to truncate an existing file to and append to, or None to create
+        the file
+        :param threads: number of compression threads
+        """
+        io.BufferedIOBase.__init__(self)
+        if compression not in self.COMPRESSIONS:
+            raise NotImplementedError(compression)
+        self.__compression = compression
+        if offset is None:
+            self.__file = open(file_path, "wb")
+        else:
+            self.__file = open(file_path, "r+b")
+            self.__file.truncate(offset)
+            self.__file.seek(offset)
+        self.__name = str(file_path)
+
+        if threads > 1:
+            self.__block = bytearray()
+            self.__block_size = block_size
+            self.__executor = ThreadPoolExecutor(max_workers=threads)
+            self.__pending = deque()
+            self.__stream = None
+            self.__threads = threads
+        else:
+            self.__executor = None
+            self.__stream = self.__OPEN_STREAM[compression](self.__file)
+
+    def checkpoint(self) -> int:
+        """
+        End the current stream, write everything to disk, and return the compressed offset.
+        """
+        if self.__executor is not None:
+            self.__submit_block()
+            self.__write_pending(0)
+        else:
+            self.__stream.close()
+        self.__file.flush()
+        os.fsync(self.__file.fileno())
+        offset = self.__file.tell()
+        if self.__executor is None:
+            # Before the next stream's header is written
+            self.__stream = self.__OPEN_STREAM[self.__compression](self.__file)
+        return offset
+
+    def close(self) -> None:
+        if self.closed:
+            return
+        try:
+            if self.__executor is not None:
+                self.__submit_block()
+                self.__write_pending(0)
+                self.__executor.shutdown()
+                if self.__file.tell() == 0:
+                    # An empty stream rather than an empty file, which isn't valid for all formats
+                    self.__file.write(self.__COMPRESS[self.__compression](b""))
+            else:
+                self.__stream.close()
+            self.__file.close()
+        finally:
+            io.BufferedIOBase.close(self)
+
+    def flush(self) -> None:
+        # Compressed data is only flushed at block boundaries and checkpoints
+        if self.closed:
+            raise ValueError("flush of closed file")
+
+    @property
+    def name(self) -> str:
+        return self.__name
+
+    def __submit_block(self) -> None:
+        if not self.__block:
+            return
+        self.__pending.append(self.__executor.submit(self.__COMPRESS[self.__compression], bytes(self.__block)))
+        self.__block.clear()
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        if self.closed:
+            raise ValueError("write to closed file")
+        if self.__executor is None:
+            return self.__stream.write(data)
+        self.__block += data
+        while len(self.__block) >= self.__block_size:
+            self.__pending.append(
+                self.__executor.submit(self.__COMPRESS[self.__compression], bytes(self.__block[:self.__block_size]))
+            )
+            del self.__block[:self.__block_size]
+        # Keep two blocks per thread in flight
+        self.__write_pending(self.__threads * 2)
+        return len(data)
+
+    def __write_pending(self, max_pending: int) -> None:
+        while len(self.__pending) > max_pending:
+            self.__file.write(self.__pending.popleft().result())
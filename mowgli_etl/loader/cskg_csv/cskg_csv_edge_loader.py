@@ -1,42 +1,56 @@
-from csv import DictWriter
-from pathlib import Path
-from typing import Dict, Callable
+from typing import Optional, Tuple
 
 from mowgli_etl.loader._kg_edge_loader import _KgEdgeLoader
+from mowgli_etl.loader.tsv_row_writer import TsvRowWriter
 from mowgli_etl.model.kg_edge import KgEdge
 
 
 class CskgCsvEdgeLoader(_KgEdgeLoader):
-    __FIELDS = (
-        ("subject", lambda edge: edge.subject),
-        ("predicate", lambda edge: edge.predicate),
-        ("object", lambda edge: edge.object),
-        ("datasource", lambda edge: edge.source_ids[0]),
-        ("weight", lambda edge: edge.weight if edge.weight is not None else 1.0),
-        ("other", lambda edge: None),
-    )
-
-    def __init__(self, *, bzip: bool = False):
+    __HEADER = ("subject", "predicate", "object", "datasource", "weight", "other")
+
+    def __init__(self, *, bzip: bool = False, compression: Optional[str] = None, compression_threads: int = 1):
+        """
+        :param bzip: shorthand for compression="bz2"
+        :param compression: compress the output as it's written: "bz2", "gzip", or "lzma"
+        :param compression_threads: number of threads to compress blocks of the output in parallel
+        """
         _KgEdgeLoader.__init__(self)
-        self.__bzip = bzip
+        self.__compression = "bz2" if bzip and compression is None else compression
+        self.__compression_threads = compression_threads
+
+    def checkpoint(self):
+        self.__writer.flush()
+        return {"edges.csv": self._checkpoint_file(self.__file)}
 
     def open(self, storage):
-        self.__file = open(storage.loaded_data_dir_path / "edges.csv", "w+")
-        writer_opts = {"delimiter": "\t", "lineterminator": "\n"}
-        self.__writer = DictWriter(
-            self.__file, tuple(field[0] for field in self.__FIELDS), **writer_opts
+        return self.open_checkpointed(storage, None)
+
+    def open_checkpointed(self, storage, checkpoint):
+        self.__file = self._open_checkpointed_file(
+            storage.loaded_data_dir_path / "edges.csv",
+            checkpoint["edges.csv"] if checkpoint is not None else None,
+            compression=self.__compression,
+            compression_threads=self.__compression_threads,
         )
-        self.__writer.writeheader()
+        self.__writer = TsvRowWriter(self.__file)
+        if checkpoint is None:
+            self.__writer.writerow(self.__HEADER)
         return self
 
     def close(self):
+        self.__writer.flush()
         self.__file.close()
-        if self.__bzip:
-            self._bzip_file(Path(self.__file.name))
+
+    @staticmethod
+    def _encode_row(edge: KgEdge) -> Tuple[str, ...]:
+        return (
+            edge.subject,
+            edge.predicate,
+            edge.object,
+            edge.source_ids[0],
+            str(edge.weight) if edge.weight is not None else "1.0",
+            "",
+        )
 
     def load_kg_edge(self, edge: KgEdge):
-        row = {}
-        for field in self.__FIELDS:
-            value = field[1](edge)
-            row[field[0]] = value if value is not None else ""
-        self.__writer.writerow(row)
+        self.__writer.writerow(self._encode_row(edge))
@@ -1,3 +1,5 @@
+from typing import Optional
+
 from mowgli_etl.loader._kg_edge_loader import _KgEdgeLoader
 from mowgli_etl.loader._kg_node_loader import _KgNodeLoader
 from mowgli_etl.loader.cskg_csv.cskg_csv_edge_loader import CskgCsvEdgeLoader
@@ -7,15 +9,22 @@ from mowgli_etl.model.kg_node import KgNode
 
 
 class CskgCsvLoader(_KgEdgeLoader, _KgNodeLoader):
-    def __init__(self, *, bzip: bool = False):
-        self.__edge_loader = CskgCsvEdgeLoader(bzip=bzip)
-        self.__node_loader = CskgCsvNodeLoader(bzip=bzip)
+    def __init__(self, *, bzip: bool = False, compression: Optional[str] = None, compression_threads: int = 1):
+        self.__edge_loader = CskgCsvEdgeLoader(
+            bzip=bzip, compression=compression, compression_threads=compression_threads
+        )
+        self.__node_loader = CskgCsvNodeLoader(
+            bzip=bzip, compression=compression, compression_threads=compression_threads
+        )
 
     def open(self, storage):
         self.__edge_loader.open(storage)
         self.__node_loader.open(storage)
         return self
 
+    def checkpoint(self):
+        return {"edges": self.__edge_loader.checkpoint(), "nodes": self.__node_loader.checkpoint()}
+
     def close(self):
         self.__edge_loader.close()
         self.__node_loader.close()
@@ -25,3 +34,8 @@ class CskgCsvLoader(_KgEdgeLoader, _KgNodeLoader):
 
     def load_kg_node(self, node: KgNode):
         self.__node_loader.load_kg_node(node)
+
+    def open_checkpointed(self, storage, checkpoint):
+        self.__edge_loader.open_checkpointed(storage, checkpoint["edges"] if checkpoint is not None else None)
+        self.__node_loader.open_checkpointed(storage, checkpoint["nodes"] if checkpoint is not None else None)
+        return self
@@ -0,0 +1,95 @@
+"""
+Benchmark the CSKG CSV loaders' row writing against the csv.DictWriter implementation they replaced: rows/s.
+
+python -m mowgli_etl.loader.cskg_csv.cskg_csv_loader_benchmark [row count]
+"""
+
+import sys
+import timeit
+from csv import DictWriter
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from mowgli_etl.loader.cskg_csv.cskg_csv_edge_loader import CskgCsvEdgeLoader
+from mowgli_etl.loader.cskg_csv.cskg_csv_node_loader import CskgCsvNodeLoader
+from mowgli_etl.model.concept_net_predicates import RELATED_TO
+from mowgli_etl.model.kg_edge import KgEdge
+from mowgli_etl.model.kg_node import KgNode
+from mowgli_etl.pipeline_storage import PipelineStorage
+
+_DICT_WRITER_EDGE_FIELDS = (
+    ("subject", lambda edge: edge.subject),
+    ("predicate", lambda edge: edge.predicate),
+    ("object", lambda edge: edge.object),
+    ("datasource", lambda edge: edge.source_ids[0]),
+    ("weight", lambda edge: edge.weight if edge.weight is not None else 1.0),
+    ("other", lambda edge: None),
+)
+
+_DICT_WRITER_NODE_FIELDS = (
+    ("id", lambda node: node.id),
+    ("label", lambda node: node.labels[0]),
+    ("aliases", lambda node: " ".join(node.labels[1:]) if len(node.labels) > 1 else None),
+    ("pos", lambda node: node.pos),
+    ("datasource", lambda node: node.source_ids[0]),
+    ("other", lambda node: None),
+)
+
+
+def _load_dict_writer(*, fields, file_path: Path, models) -> None:
+    with open(file_path, "w+") as file_:
+        writer = DictWriter(file_, tuple(field[0] for field in fields), delimiter="\t", lineterminator="\n")
+        writer.writeheader()
+        for model in models:
+            row = {}
+            for field in fields:
+                value = field[1](model)
+                row[field[0]] = value if value is not None else ""
+            writer.writerow(row)
+
+
+def _load_loader(*, loader_class, load_method_name: str, models, storage: PipelineStorage) -> None:
+    with loader_class().open(storage) as loader:
+        load = getattr(loader, load_method_name)
+        for model in models:
+            load(model)
+
+
+def main(row_count: int = 200000) -> None:
+    nodes = [
+        KgNode.legacy(datasource="benchmark", id=f"benchmark:node{node_i}", label=f"node {node_i}", aliases=("alias",), pos="n")
+        for node_i in range(row_count)
+    ]
+    edges = [
+        KgEdge.legacy(datasource="benchmark", object=f"benchmark:node{edge_i + 1}", predicate=RELATED_TO, subject=f"benchmark:node{edge_i}", weight=0.5)
+        for edge_i in range(row_count)
+    ]
+
+    with TemporaryDirectory() as temp_dir_path:
+        temp_dir_path = Path(temp_dir_path)
+        storage = PipelineStorage(pipeline_id="benchmark", root_data_dir_path=temp_dir_path)
+        for name, models, fields, loader_class, load_method_name, file_name in (
+                ("edges", edges, _DICT_WRITER_EDGE_FIELDS, CskgCsvEdgeLoader, "load_kg_edge", "edges.csv"),
+                ("nodes", nodes, _DICT_WRITER_NODE_FIELDS, CskgCsvNodeLoader, "load_kg_node", "nodes.csv"),
+        ):
+            dict_writer_file_path = temp_dir_path / ("dict_writer_" + file_name)
+            dict_writer_s = min(timeit.repeat(
+                lambda: _load_dict_writer(fields=fields, file_path=dict_writer_file_path, models=models),
+                number=1, repeat=3
+            ))
+            loader_s = min(timeit.repeat(
+                lambda: _load_loader(loader_class=loader_class, load_method_name=load_method_name, models=models, storage=storage),
+                number=1, repeat=3
+            ))
+            assert (storage.loaded_data_dir_path / file_name).read_text() == dict_writer_file_path.read_text()
+            print("%-6s %10.0f rows/s DictWriter %10.0f rows/s %s (%.1fx)" % (
+                name,
+                row_count / dict_writer_s,
+                row_count / loader_s,
+                loader_class.__name__,
+                dict_writer_s / loader_s,
+            ))
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
@@ -1,48 +1,57 @@
-from csv import DictWriter
-from pathlib import Path
-from typing import Dict, Callable
+from typing import Optional, Tuple
 
-from mowgli_etl.loader._kg_edge_loader import _KgEdgeLoader
 from mowgli_etl.loader._kg_node_loader import _KgNodeLoader
-from mowgli_etl.loader.cskg_csv.cskg_csv_edge_loader import CskgCsvEdgeLoader
-from mowgli_etl.model.kg_edge import KgEdge
+from mowgli_etl.loader.tsv_row_writer import TsvRowWriter
 from mowgli_etl.model.kg_node import KgNode
 
 
 class CskgCsvNodeLoader(_KgNodeLoader):
-    __FIELDS = (
-        ("id", lambda node: node.id),
-        ("label", lambda node: node.labels[0]),
-        (
-            "aliases",
-            lambda node: " ".join(node.labels[1:]) if len(node.labels) > 1 else None,
-        ),
-        ("pos", lambda node: node.pos),
-        ("datasource", lambda node: node.source_ids[0]),
-        ("other", lambda node: None),
-    )
-
-    def __init__(self, *, bzip: bool = False):
+    __HEADER = ("id", "label", "aliases", "pos", "datasource", "other")
+
+    def __init__(self, *, bzip: bool = False, compression: Optional[str] = None, compression_threads: int = 1):
+        """
+        :param bzip: shorthand for compression="bz2"
+        :param compression: compress the output as it's written: "bz2", "gzip", or "lzma"
+        :param compression_threads: number of threads to compress blocks of the output in parallel
+        """
         _KgNodeLoader.__init__(self)
-        self.__bzip = bzip
+        self.__compression = "bz2" if bzip and compression is None else compression
+        self.__compression_threads = compression_threads
+
+    def checkpoint(self):
+        self.__writer.flush()
+        return {"nodes.csv": self._checkpoint_file(self.__file)}
 
     def open(self, storage):
-        self.__file = open(storage.loaded_data_dir_path / "nodes.csv", "w+")
-        writer_opts = {"delimiter": "\t", "lineterminator": "\n"}
-        self.__writer = DictWriter(
-            self.__file, tuple(field[0] for field in self.__FIELDS), **writer_opts
+        return self.open_checkpointed(storage, None)
+
+    def open_checkpointed(self, storage, checkpoint):
+        self.__file = self._open_checkpointed_file(
+            storage.loaded_data_dir_path / "nodes.csv",
+            checkpoint["nodes.csv"] if checkpoint is not None else None,
+            compression=self.__compression,
+            compression_threads=self.__compression_threads,
         )
-        self.__writer.writeheader()
+        self.__writer = TsvRowWriter(self.__file)
+        if checkpoint is None:
+            self.__writer.writerow(self.__HEADER)
         return self
 
     def close(self):
+        self.__writer.flush()
         self.__file.close()
-        if self.__bzip:
-            self._bzip_file(Path(self.__file.name))
+
+    @staticmethod
+    def _encode_row(node: KgNode) -> Tuple[str, ...]:
+        labels = node.labels
+        return (
+            node.id,
+            labels[0],
+            " ".join(labels[1:]) if len(labels) > 1 else "",
+            node.pos if node.pos is not None else "",
+            node.source_ids[0],
+            "",
+        )
 
     def load_kg_node(self, node: KgNode):
-        row = {}
-        for field in self.__FIELDS:
-            value = field[1](node)
-            row[field[0]] = value if value is not None else ""
-        self.__writer.writerow(row)
+        self.__writer.writerow(self._encode_row(node))
@@ -1,42 +1,49 @@
-import collections
-from typing import NamedTuple
 import json
+from typing import NamedTuple
 
-# Helper functions
-import stringcase
+from mowgli_etl.loader.json.model_json_encoders import encode_json
 
 
-def isinstance_namedtuple(x):
-    if not isinstance(x, tuple):
-        return False
-    # if not isinstance(getattr(x, '__dict__', None), collections.Mapping):
-    #     return False
-    if getattr(x, '_fields', None) is None:
-        return False
-    return True
+class _JsonLoader:
+    """
+    Mixin for loaders of models to a JSON array file.
 
+    The array is streamed to the file one element at a time, so memory use doesn't grow with the number of models. The
+    file is formatted the same as json.dump of the whole array with indent=_JSON_INDENT. Set _JSON_INDENT to None to
+    write it compactly.
+    """
 
-class _JsonLoader:
     _JSON_FILE_NAME = None
+    _JSON_INDENT = 4
 
     def close(self):
-        with open(self.__storage.loaded_data_dir_path / self._JSON_FILE_NAME, "w+") as json_file:
-            json.dump(_JsonLoader._convert_to_json(self.__models), json_file, indent=4)
+        if self.__element_count > 0 and self._JSON_INDENT is not None:
+            self.__json_file.write("\n]")
+        else:
+            self.__json_file.write("]")
+        self.__json_file.close()
 
     @staticmethod
     def _convert_to_json(obj):
-        if isinstance_namedtuple(obj):
-            # Model/named tuple
-            return {stringcase.camelcase(key): _JsonLoader._convert_to_json(value) for key, value in obj._asdict().items() if value is not None}
-        elif isinstance(obj, (list, tuple)):
-            return [_JsonLoader._convert_to_json(element) for element in obj]
-        else:
-            return obj
+        return encode_json(obj)
 
     def _load_model(self, model: NamedTuple):
-        self.__models.append(model)
+        element_json = json.dumps(encode_json(model), indent=self._JSON_INDENT)
+        if self._JSON_INDENT is not None:
+            # Indent the element as an array element. JSON strings can't contain raw newlines, so every line is a line
+            # of the element's structure.
+            element_json = "\n" + self.__element_indent + element_json.replace("\n", "\n" + self.__element_indent)
+            separator = ","
+        else:
+            separator = ", "
+        if self.__element_count > 0:
+            self.__json_file.write(separator)
+        self.__json_file.write(element_json)
+        self.__element_count += 1
 
     def open(self, storage):
-        self.__models = []
-        self.__storage = storage
+        self.__element_count = 0
+        self.__element_indent = " " * self._JSON_INDENT if self._JSON_INDENT is not None else ""
+        self.__json_file = open(storage.loaded_data_dir_path / self._JSON_FILE_NAME, "w+")
+        self.__json_file.write("[")
         return self
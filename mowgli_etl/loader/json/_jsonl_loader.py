@@ -1,27 +1,41 @@
 import json
-from pathlib import Path
-from typing import NamedTuple
+from typing import NamedTuple, Optional
 
 from mowgli_etl._loader import _Loader
-from mowgli_etl.loader.json._json_loader import _JsonLoader
+from mowgli_etl.loader.json.model_json_encoders import encode_json
 
 
 class _JsonlLoader(_Loader):
     _JSONL_FILE_NAME = None
 
-    def __init__(self, bzip: bool = False):
+    def __init__(self, bzip: bool = False, compression: Optional[str] = None, compression_threads: int = 1):
+        """
+        :param bzip: shorthand for compression="bz2"
+        :param compression: compress the output as it's written: "bz2", "gzip", or "lzma"
+        :param compression_threads: number of threads to compress blocks of the output in parallel
+        """
         _Loader.__init__(self)
-        self.__bzip = bzip
+        self.__compression = "bz2" if bzip and compression is None else compression
+        self.__compression_threads = compression_threads
+
+    def checkpoint(self):
+        return {self._JSONL_FILE_NAME: self._checkpoint_file(self.__jsonl_file)}
 
     def close(self):
         self.__jsonl_file.close()
-        if self.__bzip:
-            self._bzip_file(Path(self.__jsonl_file.name))
 
     def _load_model(self, model: NamedTuple):
-        json.dump(_JsonLoader._convert_to_json(model), self.__jsonl_file)
+        self.__jsonl_file.write(json.dumps(encode_json(model)))
         self.__jsonl_file.write("\n")
 
     def open(self, storage):
-        self.__jsonl_file = open(storage.loaded_data_dir_path / self._JSONL_FILE_NAME, "w+")
+        return self.open_checkpointed(storage, None)
+
+    def open_checkpointed(self, storage, checkpoint):
+        self.__jsonl_file = self._open_checkpointed_file(
+            storage.loaded_data_dir_path / self._JSONL_FILE_NAME,
+            checkpoint[self._JSONL_FILE_NAME] if checkpoint is not None else None,
+            compression=self.__compression,
+            compression_threads=self.__compression_threads,
+        )
         return self
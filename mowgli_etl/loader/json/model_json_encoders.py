@@ -0,0 +1,102 @@
+"""
+Conversion of models to JSON-serializable objects, for the JSON loaders.
+
+NamedTuple models are converted to dicts with camelCase keys and without None values, tuples and lists to lists, and
+everything else is left as-is. The first time a NamedTuple class is converted, an encoder function specialized to the
+class is generated from its fields and type hints, with the camelCase keys computed ahead of time, and cached.
+"""
+
+import typing
+from enum import Enum
+from typing import Callable, Dict, List, Optional
+
+import stringcase
+
+_PRIMITIVE_TYPES = (bool, float, int, str)
+
+# NamedTuple class -> encoder
+_ENCODERS: Dict[type, Callable[[tuple], dict]] = {}
+
+
+def _is_namedtuple_class(type_) -> bool:
+    return isinstance(type_, type) and issubclass(type_, tuple) and hasattr(type_, "_fields")
+
+
+def _is_primitive_type(type_) -> bool:
+    # str and int Enum's are serialized as their values
+    return type_ in _PRIMITIVE_TYPES or (
+            isinstance(type_, type) and issubclass(type_, Enum) and issubclass(type_, _PRIMITIVE_TYPES)
+    )
+
+
+def _unwrap_optional(type_hint):
+    if typing.get_origin(type_hint) is typing.Union:
+        args = tuple(arg for arg in typing.get_args(type_hint) if arg is not type(None))
+        if len(args) == 1:
+            return args[0]
+    return type_hint
+
+
+def _value_expression(type_hint, value: str, namespace: Dict[str, object]) -> str:
+    """
+    :return: a Python expression that converts the value, a field of the given type, to JSON
+    """
+    type_hint = _unwrap_optional(type_hint)
+    if _is_primitive_type(type_hint):
+        return value
+    if _is_namedtuple_class(type_hint):
+        encoder_name = "encode_" + type_hint.__name__
+        namespace[encoder_name] = _encoder(type_hint)
+        return f"{encoder_name}({value})"
+    if typing.get_origin(type_hint) in (list, tuple):
+        args = typing.get_args(type_hint)
+        if len(args) == 1 or (len(args) == 2 and args[1] is Ellipsis):
+            element_type_hint = _unwrap_optional(args[0])
+            if _is_primitive_type(element_type_hint):
+                return f"list({value})"
+            if _is_namedtuple_class(element_type_hint):
+                return f"[{_value_expression(element_type_hint, 'element', namespace)} for element in {value}]"
+    return f"encode_json({value})"
+
+
+def _encoder(namedtuple_class: type) -> Callable[[tuple], dict]:
+    encoder = _ENCODERS.get(namedtuple_class)
+    if encoder is not None:
+        return encoder
+
+    # Refer to the class through encode_json until it's compiled, in case a field's type refers back to it
+    _ENCODERS[namedtuple_class] = encode_json
+    try:
+        type_hints = typing.get_type_hints(namedtuple_class)
+    except (NameError, TypeError):
+        type_hints = {}
+    namespace: Dict[str, object] = {"encode_json": encode_json}
+    lines: List[str] = ["def encode(model):", "    result = {}"]
+    for field_i, field in enumerate(namedtuple_class._fields):
+        lines.append(f"    value = model[{field_i}]")
+        lines.append("    if value is not None:")
+        lines.append(
+            f"        result[{stringcase.camelcase(field)!r}] = "
+            f"{_value_expression(type_hints.get(field, object), 'value', namespace)}"
+        )
+    lines.append("    return result")
+    exec("\n".join(lines), namespace)
+    encoder = _ENCODERS[namedtuple_class] = namespace["encode"]
+    return encoder
+
+
+def encode_json(obj) -> Optional[object]:
+    """
+    Convert a model, or a tuple, list, or primitive value in a model, to a JSON-serializable object.
+    """
+    encoder = _ENCODERS.get(obj.__class__)
+    if encoder is not None and encoder is not encode_json:
+        return encoder(obj)
+    if isinstance(obj, tuple) and getattr(obj, "_fields", None) is not None:
+        if encoder is encode_json:
+            # Recursive reference while the class's encoder is being compiled
+            return {stringcase.camelcase(key): encode_json(value) for key, value in obj._asdict().items() if value is not None}
+        return _encoder(obj.__class__)(obj)
+    if isinstance(obj, (list, tuple)):
+        return [encode_json(element) for element in obj]
+    return obj
@@ -0,0 +1,41 @@
+"""
+Benchmark the generated model JSON encoders against the recursive conversion they replaced, on the portal test data's
+benchmark answers: answers/s converted, and converted and serialized.
+
+python -m mowgli_etl.loader.json.model_json_encoders_benchmark
+"""
+
+import json
+import timeit
+
+import stringcase
+
+from mowgli_etl.loader.json.model_json_encoders import encode_json
+from mowgli_etl.model.benchmark_answer import BenchmarkAnswer
+from mowgli_etl.pipeline.portal_test_data.portal_test_data_transformer import PortalTestDataTransformer
+
+
+def _convert_to_json_recursively(obj):
+    if isinstance(obj, tuple) and getattr(obj, "_fields", None) is not None:
+        return {stringcase.camelcase(key): _convert_to_json_recursively(value) for key, value in obj._asdict().items() if value is not None}
+    elif isinstance(obj, (list, tuple)):
+        return [_convert_to_json_recursively(element) for element in obj]
+    else:
+        return obj
+
+
+def main() -> None:
+    answers = [model for model in PortalTestDataTransformer().transform() if isinstance(model, BenchmarkAnswer)]
+    for answer in answers:
+        assert encode_json(answer) == _convert_to_json_recursively(answer)
+
+    for name, convert in (("recursive", _convert_to_json_recursively), ("generated", encode_json)):
+        convert_s = min(timeit.repeat(lambda: [convert(answer) for answer in answers], number=1, repeat=5))
+        serialize_s = min(timeit.repeat(lambda: [json.dumps(convert(answer)) for answer in answers], number=1, repeat=5))
+        print("%-10s %10.0f answers/s converted %10.0f answers/s converted and serialized" % (
+            name, len(answers) / convert_s, len(answers) / serialize_s
+        ))
+
+
+if __name__ == "__main__":
+    main()
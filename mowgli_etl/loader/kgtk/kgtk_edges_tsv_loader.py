@@ -1,10 +1,16 @@
-from csv import DictWriter
+import sys
 from pathlib import Path
+from shutil import rmtree
+from tempfile import mkdtemp
+from typing import Dict, Generator, Iterable, List, Optional, Tuple
 
 from mowgli_etl.loader._kg_edge_loader import _KgEdgeLoader
 from mowgli_etl.loader._kg_node_loader import _KgNodeLoader
+from mowgli_etl.loader.tsv_row_writer import TsvRowWriter
 from mowgli_etl.model.kg_edge import KgEdge
 from mowgli_etl.model.kg_node import KgNode
+from mowgli_etl.whole_graph_check._sorted_runs import _SortedRuns
+from mowgli_etl.whole_graph_check._spill_file import _SpillFile
 
 try:
     from mowgli_etl.storage.persistent_kg_node_set import PersistentKgNodeSet as NodeSet
@@ -13,53 +19,260 @@ except ImportError:
 
 
 class KgtkEdgesTsvLoader(_KgEdgeLoader, _KgNodeLoader):
+    """
+    Loader of edges to a KGTK edges TSV file, with the labels of their nodes.
+
+    Node labels are joined to edges in one of two ways (node_label_join):
+    - lookup: nodes are stored in a node set and looked up as each edge is loaded. Nodes have to be loaded before the
+    edges that use them.
+    - sort_merge: edges are written when the loader is closed, in two passes with bounded memory and sequential I/O.
+    Nodes are kept in a dictionary of id -> labels until there are more than in_memory_node_limit of them, and the
+    edges are joined to it. Past that, nodes and edges are spilled to sorted runs and merge joined, on object node id
+    and then on subject node id. Edges are then sorted back into the order they were loaded, unless edge_order is
+    "subject". Nodes can be loaded in any order, and missing nodes are reported on close.
+    """
+
+    DEFAULT_IN_MEMORY_NODE_LIMIT = 1000000
+    DEFAULT_RUN_SIZE = 1000000
+
     __HEADER = """node1	relation	node2	node1;label	node2;label	relation;label	relation;dimension	weight	source	origin	sentence	question	id"""
+    # Indices of columns in rows
+    __NODE1 = 0
+    __NODE2 = 2
+    __NODE1_LABEL = 3
+    __NODE2_LABEL = 4
 
-    def __init__(self, bzip: bool = False):
+    def __init__(
+            self,
+            bzip: bool = False,
+            compression: Optional[str] = None,
+            compression_threads: int = 1,
+            *,
+            edge_order: str = "original",
+            in_memory_node_limit: int = DEFAULT_IN_MEMORY_NODE_LIMIT,
+            node_label_join: str = "lookup",
+            run_size: int = DEFAULT_RUN_SIZE
+    ):
+        """
+        :param bzip: shorthand for compression="bz2"
+        :param compression: compress the output as it's written: "bz2", "gzip", or "lzma"
+        :param compression_threads: number of threads to compress blocks of the output in parallel
+        :param edge_order: with the sort_merge join, "original" to write edges in the order they were loaded or
+        "subject" to write them in subject node id order, which saves a sort
+        :param in_memory_node_limit: with the sort_merge join, maximum number of nodes to join in memory
+        :param node_label_join: "lookup" or "sort_merge", see the class docstring
+        :param run_size: with the sort_merge join, number of records per sorted run
+        """
         _KgEdgeLoader.__init__(self)
         _KgNodeLoader.__init__(self)
-        self.__bzip = bzip
+        self.__compression = "bz2" if bzip and compression is None else compression
+        self.__compression_threads = compression_threads
+        if edge_order not in ("original", "subject"):
+            raise NotImplementedError(edge_order)
+        self.__edge_order = edge_order
+        self.__in_memory_node_limit = in_memory_node_limit
+        if node_label_join not in ("lookup", "sort_merge"):
+            raise NotImplementedError(node_label_join)
+        self.__node_label_join = node_label_join
+        self.__run_size = run_size
+
+    def checkpoint(self):
+        self.__node_set.flush()
+        self.__edges_writer.flush()
+        return {"edges.tsv": self._checkpoint_file(self.__edges_file)}
 
     def close(self):
-        self.__edges_file.close()
-        self.__node_set.close()
-        if self.__bzip:
-            self._bzip_file(Path(self.__edges_file.name))
+        try:
+            if self.__node_label_join == "sort_merge":
+                try:
+                    self.__edges_writer.writerows(self.__sort_merge_rows())
+                finally:
+                    for sorted_runs in self.__sorted_runs:
+                        sorted_runs.close()
+                    self.__edge_rows.close()
+                    rmtree(self.__sort_directory_path)
+            else:
+                self.__node_set.close()
+            self.__edges_writer.flush()
+        finally:
+            self.__edges_file.close()
 
-    def open(self, storage):
-        self.__edges_file = open(storage.loaded_data_dir_path / "edges.tsv", "w+")
-        writer_opts = {"delimiter": "\t", "lineterminator": "\n"}
-        self.__edges_writer = DictWriter(
-            self.__edges_file, self.__HEADER.split(), **writer_opts
+    @staticmethod
+    def __encode_row(edge: KgEdge, subject_node_labels: str, object_node_labels: str) -> Tuple[str, ...]:
+        return (
+            edge.subject,
+            edge.predicate,
+            edge.object,
+            subject_node_labels,
+            object_node_labels,
+            "|".join(edge.labels) if edge.labels is not None else "",
+            "",
+            str(edge.weight) if edge.weight is not None else "",
+            "|".join(edge.source_ids),
+            "",
+            "",
+            "",
+            edge.id,
         )
-        self.__edges_writer.writeheader()
-        self.__node_set = NodeSet.temporary()
-        return self
+
+    def __join_in_memory(self, records: Iterable[Tuple[int, tuple]]) -> Generator[Tuple[str, ...], None, None]:
+        node_labels = self.__node_labels
+        for _, row in records:
+            subject_node_labels = node_labels.get(row[self.__NODE1])
+            if subject_node_labels is None:
+                raise ValueError(f"missing edge subject node {row[self.__NODE1]}")
+            object_node_labels = node_labels.get(row[self.__NODE2])
+            if object_node_labels is None:
+                raise ValueError(f"missing edge object node {row[self.__NODE2]}")
+            yield row[:self.__NODE1_LABEL] + (subject_node_labels, object_node_labels) + row[self.__NODE2_LABEL + 1:]
 
     def load_kg_edge(self, edge: KgEdge):
-        object_node = self.__node_set.get(edge.object)
-        if object_node is None:
+        if self.__node_label_join == "sort_merge":
+            self.__edge_rows.append((len(self.__edge_rows), self.__encode_row(edge, "", "")))
+            return
+
+        object_node_labels = self.__node_set.get_labels(edge.object)
+        if object_node_labels is None:
             raise ValueError(f"missing edge object node {edge.object}")
-        subject_node = self.__node_set.get(edge.subject)
-        if subject_node is None:
+        subject_node_labels = self.__node_set.get_labels(edge.subject)
+        if subject_node_labels is None:
             raise ValueError(f"missing edge subject node {edge.subject}")
-
         self.__edges_writer.writerow(
-            {
-                "id": edge.id,
-                "node1": edge.subject,
-                "node1;label": "|".join(subject_node.labels),
-                "node2": edge.object,
-                "node2;label": "|".join(object_node.labels),
-                "relation": edge.predicate,
-                "relation;label": "|".join(edge.labels)
-                if edge.labels is not None
-                else "",
-                "source": "|".join(edge.source_ids),
-                "weight": edge.weight if edge.weight is not None else "",
-            }
+            self.__encode_row(edge, "|".join(subject_node_labels), "|".join(object_node_labels))
         )
 
     def load_kg_node(self, node: KgNode):
+        if self.__node_label_join == "sort_merge":
+            if self.__node_runs is not None:
+                # Duplicates are sorted after the first node with the same id, which is the one that's joined
+                self.__node_runs.append((node.id, self.__node_position, "|".join(node.labels)))
+                self.__node_position += 1
+            elif node.id not in self.__node_labels:
+                self.__node_labels[node.id] = "|".join(node.labels)
+                if len(self.__node_labels) > self.__in_memory_node_limit:
+                    self.__spill_node_labels()
+            return
+
         if node.id not in self.__node_set:
             self.__node_set.add(node)
+
+    def __merge_join(
+            self,
+            records: Iterable[Tuple[str, int, tuple]],
+            *,
+            label_column: int,
+            role: str
+    ) -> Generator[Tuple[int, tuple], None, None]:
+        """
+        Merge join (node id, position, row) records sorted by node id with the sorted nodes, and fill in the row's
+        node label column.
+        """
+        nodes = iter(self.__node_runs)
+        node = next(nodes, None)
+        for node_id, position, row in records:
+            while node is not None and node[0] < node_id:
+                node = next(nodes, None)
+            if node is None or node[0] != node_id:
+                raise ValueError(f"missing edge {role} node {node_id}")
+            yield position, row[:label_column] + (node[2],) + row[label_column + 1:]
+
+    def open(self, storage):
+        self.__edges_file = self._open_checkpointed_file(
+            storage.loaded_data_dir_path / "edges.tsv",
+            None,
+            compression=self.__compression,
+            compression_threads=self.__compression_threads,
+        )
+        self.__open_edges_writer(write_header=True)
+        if self.__node_label_join == "sort_merge":
+            self.__sort_directory_path = Path(mkdtemp())
+            # (position, row) in load order
+            self.__edge_rows = _SpillFile(self.__sort_directory_path / "edges")
+            self.__node_labels: Dict[str, str] = {}
+            self.__node_position = 0
+            # (node id, position, labels), once there are too many nodes for node_labels
+            self.__node_runs: Optional[_SortedRuns] = None
+            # To close
+            self.__sorted_runs: List[_SortedRuns] = []
+        else:
+            self.__node_set = NodeSet.temporary()
+        return self
+
+    def open_checkpointed(self, storage, checkpoint):
+        from mowgli_etl.storage.persistent_kg_node_set import PersistentKgNodeSet
+
+        if self.__node_label_join != "lookup":
+            raise NotImplementedError(f"{self.__class__.__name__} only supports checkpointing with the lookup join")
+
+        self.__edges_file = self._open_checkpointed_file(
+            storage.loaded_data_dir_path / "edges.tsv",
+            checkpoint["edges.tsv"] if checkpoint is not None else None,
+            compression=self.__compression,
+            compression_threads=self.__compression_threads,
+        )
+        self.__open_edges_writer(write_header=checkpoint is None)
+        # Like the whole graph checker's sets, only flushed at checkpoints, so it always reflects the last one
+        self.__node_set = PersistentKgNodeSet(
+            directory_path=storage.checkpoint_data_dir_path / "kgtk_edges_tsv_loader_nodes",
+            create_if_missing=True,
+            flush_on_close=False,
+            write_batch_size=sys.maxsize,
+        )
+        return self
+
+    def __open_edges_writer(self, *, write_header: bool):
+        self.__edges_writer = TsvRowWriter(self.__edges_file)
+        if write_header:
+            self.__edges_writer.writerow(self.__HEADER.split())
+
+    def __sort(self, records: Iterable[tuple], *, name: str) -> _SortedRuns:
+        sorted_runs = self.__sorted_runs_named(name)
+        for record in records:
+            sorted_runs.append(record)
+        return sorted_runs
+
+    def __sorted_runs_named(self, name: str) -> _SortedRuns:
+        sorted_runs = _SortedRuns(directory_path=self.__sort_directory_path, name=name, run_size=self.__run_size)
+        self.__sorted_runs.append(sorted_runs)
+        return sorted_runs
+
+    def __sort_by_node(self, records: Iterable[Tuple[int, tuple]], *, column: int, name: str) -> _SortedRuns:
+        return self.__sort(((row[column], position, row) for position, row in records), name=name)
+
+    def __sort_merge_rows(self) -> Generator[Tuple[str, ...], None, None]:
+        if self.__node_runs is None:
+            self._logger.info("joining %d edges to %d nodes in memory", len(self.__edge_rows), len(self.__node_labels))
+            records = self.__edge_rows
+            if self.__edge_order == "subject":
+                records = (
+                    (position, row)
+                    for _, position, row in self.__sort_by_node(records, column=self.__NODE1, name="edges_by_subject")
+                )
+            yield from self.__join_in_memory(records)
+            return
+
+        self._logger.info("merge joining %d edges to %d nodes", len(self.__edge_rows), len(self.__node_runs))
+        # Object labels, then subject labels, which leaves the edges sorted by subject
+        records = self.__merge_join(
+            self.__sort_by_node(self.__edge_rows, column=self.__NODE2, name="edges_by_object"),
+            label_column=self.__NODE2_LABEL,
+            role="object",
+        )
+        records = self.__merge_join(
+            self.__sort_by_node(records, column=self.__NODE1, name="edges_by_subject"),
+            label_column=self.__NODE1_LABEL,
+            role="subject",
+        )
+        if self.__edge_order == "original":
+            records = self.__sort(records, name="edges_by_position")
+        for _, row in records:
+            yield row
+
+    def __spill_node_labels(self) -> None:
+        self._logger.info("more than %d nodes, spilling them to sorted runs", self.__in_memory_node_limit)
+        self.__node_runs = self.__sorted_runs_named("nodes")
+        # These are all first occurrences, so they can share a position before any later duplicate
+        for node_id, node_labels in self.__node_labels.items():
+            self.__node_runs.append((node_id, 0, node_labels))
+        self.__node_labels = {}
+        self.__node_position = 1
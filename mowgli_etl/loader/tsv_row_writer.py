@@ -0,0 +1,46 @@
+import csv
+from typing import List, Sequence, TextIO
+
+
+class TsvRowWriter:
+    """
+    Writer of rows of strings to a text file, in the same format as csv.writer(file, delimiter="\t",
+    lineterminator="\n") but several times faster, for loaders.
+
+    Most fields don't need quoting, so rows are joined directly and written in batches. Rows with a field that contains
+    a tab, a quote, or a line break are written by csv.writer instead.
+
+    Rows must have at least two fields: csv.writer quotes a row of one empty field.
+    """
+
+    DEFAULT_BATCH_SIZE = 1000
+
+    def __init__(self, file: TextIO, *, batch_size: int = DEFAULT_BATCH_SIZE):
+        self.__batch_size = batch_size
+        self.__csv_writer = csv.writer(file, delimiter="\t", lineterminator="\n")
+        self.__file = file
+        self.__lines: List[str] = []
+
+    def flush(self) -> None:
+        """
+        Write the batched rows to the file. Call before flushing or closing the file.
+        """
+        if self.__lines:
+            self.__file.write("".join(self.__lines))
+            self.__lines.clear()
+
+    def writerow(self, row: Sequence[str]) -> None:
+        line = "\t".join(row)
+        if '"' in line or "\n" in line or "\r" in line or line.count("\t") != len(row) - 1:
+            # Keep rows in order
+            self.flush()
+            self.__csv_writer.writerow(row)
+            return
+        lines = self.__lines
+        lines.append(line + "\n")
+        if len(lines) >= self.__batch_size:
+            self.flush()
+
+    def writerows(self, rows) -> None:
+        for row in rows:
+            self.writerow(row)
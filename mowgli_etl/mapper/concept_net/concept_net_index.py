@@ -1,147 +1,373 @@
 import bz2
 import logging
+import multiprocessing
 import os.path
 import pickle
-from io import TextIOWrapper
+import queue
+from collections import OrderedDict
+from contextlib import contextmanager
+from itertools import groupby
+from operator import itemgetter
 from pathlib import Path
 from shutil import rmtree
-from typing import Optional, Union, TextIO
+from tempfile import TemporaryDirectory
+from typing import Generator, Iterable, Optional, Tuple, Union, TextIO
 
-import plyvel
 from tqdm import tqdm
 
 from mowgli_etl import paths
 from mowgli_etl._closeable import _Closeable
+from mowgli_etl.mapper.concept_net.concept_net_index_file import ConceptNetIndexFile
 from mowgli_etl.pipeline.cskg_csv.cskg_nodes_csv_transformer import CskgNodesCsvTransformer
-from mowgli_etl.storage.level_db import LevelDb
+from mowgli_etl.whole_graph_check._sorted_runs import _SortedRuns
+
+
+def _node_labels(
+        nodes_csv_file: TextIO,
+        *,
+        limit: Optional[int],
+        namespace: Optional[str]
+) -> Generator[Tuple[bytes, str], None, None]:
+    """
+    Parse (label key, node id) pairs from a ConceptNet nodes CSV file.
+    """
+    if namespace is not None:
+        # Skip the rows of nodes in other namespaces without parsing them. The id is the first column.
+        nodes_csv_file = (
+            line for line_i, line in enumerate(nodes_csv_file) if line_i == 0 or line.startswith(namespace)
+        )
+    nodes = CskgNodesCsvTransformer().transform(nodes_csv_file=nodes_csv_file)
+    for node_i, node in enumerate(nodes):
+        if len(node.labels) != 1:
+            raise AssertionError(f"node {node.id} has aliases")
+        node_label = node.labels[0]
+        if node_label.lower() != node_label:
+            raise AssertionError(f"label is not lower-case: {node_label}")
+        assert '/' not in node_label
+
+        # Store the node ID(s) as the value
+        # Other information, such as the part of speech, can be reconstructed from it.
+        yield node_label.encode("utf-8"), node.id
+
+        if limit is not None and node_i + 1 == limit:
+            break
+
+
+@contextmanager
+def _open_nodes_csv_file(nodes_csv_file_path: Path) -> Generator[TextIO, None, None]:
+    if os.path.splitext(nodes_csv_file_path.name)[-1].lower() == ".bz2":
+        with bz2.open(nodes_csv_file_path, "rt") as nodes_csv_file:
+            yield nodes_csv_file
+    else:
+        with open(nodes_csv_file_path) as nodes_csv_file:
+            yield nodes_csv_file
+
+
+def _read_node_labels(
+        *,
+        batch_size: int,
+        limit: Optional[int],
+        namespace: Optional[str],
+        nodes_csv_file_path: Path,
+        queue_: multiprocessing.Queue
+) -> None:
+    """
+    Decompress and parse a ConceptNet nodes CSV file in a separate process, putting batches of (label key, node id)
+    pairs on the queue, then None, or the exception that stopped it.
+    """
+    try:
+        with _open_nodes_csv_file(nodes_csv_file_path) as nodes_csv_file:
+            batch = []
+            for node_label in _node_labels(nodes_csv_file, limit=limit, namespace=namespace):
+                batch.append(node_label)
+                if len(batch) == batch_size:
+                    queue_.put(batch)
+                    batch = []
+            if batch:
+                queue_.put(batch)
+        queue_.put(None)
+    except BaseException as e:
+        queue_.put(e)
 
 
 class ConceptNetIndex(_Closeable):
+    """
+    Index of ConceptNet node ids by label.
+
+    The index is a read-only ConceptNetIndexFile, which is memory-mapped, so it can be opened by any number of processes
+    at once.
+
+    The index is built with an external sort of the (label, node id) pairs in the ConceptNet nodes CSV file, which
+    groups the node ids of each label so it's written once. The CSV file is decompressed and parsed in a separate
+    process, in parallel with the sort.
+
+    The node ids of labels with more than one are written as an entry precomputed for each part of speech, so looking
+    them up doesn't parse node ids:
+
+    node id for no part of speech | node id without qualifiers, or "" | pos 1 | node id for pos 1 | pos 2 | ...
+
+    Lookups go through a bounded LRU cache of (label, pos) -> node id or None.
+    """
+
+    DEFAULT_CACHE_SIZE = 100000
+    DEFAULT_RUN_SIZE = 1000000
+
     __DIRECTORY_PATH_DEFAULT = paths.DATA_DIR / "concept_net" / "indexed"
+    # Changed with the layout of the entries, so older index files are rebuilt rather than misread
+    __INDEX_FILE_NAME = "concept_net_index.2.dat"
     __NODES_CSV_FILE_DEFAULT = paths.DATA_DIR / "concept_net" / "extracted" / "nodes.csv.bz2"
+    __READ_BATCH_SIZE = 10000
+    __READ_QUEUE_DEPTH = 16
 
-    def __init__(self, db: LevelDb):
-        self.__db = db
+    def __init__(self, index_file: ConceptNetIndexFile, *, cache_size: int = DEFAULT_CACHE_SIZE):
+        """
+        :param index_file: the open index file
+        :param cache_size: maximum number of (label, pos) lookups to cache, 0 to disable the cache
+        """
+        self.__cache: "OrderedDict[Tuple[str, Optional[str]], Optional[str]]" = OrderedDict()
+        self.__cache_size = cache_size
+        self.__index_file = index_file
 
     @classmethod
-    def __build(cls, *, db: LevelDb, directory_path: Path, nodes_csv_file: TextIO, limit: Optional[int],
-                report_progress: bool):
+    def __build(
+            cls,
+            *,
+            directory_path: Path,
+            node_labels: Iterable[Tuple[bytes, str]],
+            report_progress: bool,
+            run_size: int
+    ) -> None:
         logger = logging.getLogger(cls.__name__)
         logger.info("building ConceptNet index at %s", directory_path)
-        nodes = CskgNodesCsvTransformer().transform(nodes_csv_file=nodes_csv_file)
         if report_progress:
-            nodes = tqdm(nodes)
-        for node_i, node in enumerate(nodes):
-            if len(node.labels) != 1:
-                raise AssertionError(f"node {node.id} has aliases")
-            node_label = node.labels[0]
-            if node_label.lower() != node_label:
-                raise AssertionError(f"label is not lower-case: {node_label}")
-
-            assert '/' not in node_label
-            key = cls.__label_to_key(node_label)
-
-            # Store the node ID(s) as the value
-            # Other information, such as the part of speech, can be reconstructed from it.
-            value = node.id
-
-            existing_values = db.get(key)
-            if existing_values is not None:
-                existing_values = pickle.loads(existing_values)
-                if isinstance(existing_values, str):
-                    new_values = [existing_values, value]
-                else:
-                    assert isinstance(existing_values, list)
-                    existing_values.append(value)
-                    new_values = existing_values
-            else:
-                new_values = node.id
-
-            db.put(node_label.encode("utf-8"), pickle.dumps(new_values))
-
-            if limit is not None and node_i + 1 == limit:
-                break
-        db.compact_range()  # Compact the underlying storage
+            node_labels = tqdm(node_labels)
+        with TemporaryDirectory(dir=directory_path) as sort_directory_path:
+            sorted_runs = _SortedRuns(directory_path=Path(sort_directory_path), name="node_labels", run_size=run_size)
+            try:
+                # Sort by label key, then by position, so each label's node ids stay in the order they were read
+                for position, (key, node_id) in enumerate(node_labels):
+                    sorted_runs.append((key, position, node_id))
+                ConceptNetIndexFile.write(
+                    directory_path / cls.__INDEX_FILE_NAME,
+                    (
+                        (key, cls.__entry(tuple(record[2] for record in records)))
+                        for key, records in groupby(sorted_runs, key=itemgetter(0))
+                    )
+                )
+            finally:
+                sorted_runs.close()
         logger.info("built ConceptNet index")
 
+    def __cache_node_id(self, cache_key: Tuple[str, Optional[str]], node_id: Optional[str]) -> None:
+        if self.__cache_size <= 0:
+            return
+        self.__cache[cache_key] = node_id
+        if len(self.__cache) > self.__cache_size:
+            self.__cache.popitem(last=False)
+
     def close(self):
-        self.__db.close()
+        self.__index_file.close()
 
     @classmethod
     def create(
             cls,
             *,
+            cache_size: int = DEFAULT_CACHE_SIZE,
             directory_path: Optional[Path] = __DIRECTORY_PATH_DEFAULT,
             limit: Optional[int] = None,
+            namespace: Optional[str] = None,
             nodes_csv_file: Union[Path, TextIO] = __NODES_CSV_FILE_DEFAULT,
-            report_progress: bool = False
+            parallel: bool = True,
+            report_progress: bool = False,
+            run_size: int = DEFAULT_RUN_SIZE
     ):
+        """
+        :param cache_size: maximum number of (label, pos) lookups to cache, 0 to disable the cache
+        :param directory_path: directory to build the index in, which is replaced if it exists
+        :param limit: maximum number of nodes to index
+        :param namespace: only index nodes whose ids start with this prefix, such as "/c/en/"
+        :param nodes_csv_file: path to a nodes CSV file, optionally .bz2-compressed, or an open nodes CSV file
+        :param parallel: decompress and parse a nodes CSV file path in a separate process
+        :param report_progress: show a progress bar
+        :param run_size: number of (label, node id) pairs per sorted run
+        """
+
         if directory_path.exists():
             rmtree(directory_path)
         directory_path.mkdir(parents=True)
-        db = LevelDb(directory_path=directory_path, create_if_missing=True, error_if_exists=True)
-
-        build_kwds = {
-            "db": db,
-            "directory_path": directory_path,
-            "limit": limit,
-            "report_progress": report_progress
-        }
-
-        if isinstance(nodes_csv_file, TextIO):
-            cls.__build(nodes_csv_file=nodes_csv_file, **build_kwds)
-        elif isinstance(nodes_csv_file, Path):
-            nodes_csv_file_path = nodes_csv_file
-            nodes_csv_file_ext = os.path.splitext(nodes_csv_file_path.name)[-1].lower()
-            if nodes_csv_file_ext == ".bz2":
-                with bz2.BZ2File(nodes_csv_file_path) as nodes_csv_file:
-                    cls.__build(nodes_csv_file=TextIOWrapper(nodes_csv_file), **build_kwds)
-            else:
-                with open(nodes_csv_file_path) as nodes_csv_file:
-                    cls.__build(nodes_csv_file=nodes_csv_file, **build_kwds)
+
+        if not isinstance(nodes_csv_file, Path):
+            node_labels = _node_labels(nodes_csv_file, limit=limit, namespace=namespace)
+        elif parallel:
+            node_labels = cls.__read_node_labels_in_process(nodes_csv_file, limit=limit, namespace=namespace)
         else:
-            raise ValueError(nodes_csv_file)
+            node_labels = cls.__read_node_labels(nodes_csv_file, limit=limit, namespace=namespace)
 
-        return cls(db)
+        cls.__build(
+            directory_path=directory_path,
+            node_labels=node_labels,
+            report_progress=report_progress,
+            run_size=run_size
+        )
 
-    @classmethod
-    def open(cls, directory_path: Optional[Path] = __DIRECTORY_PATH_DEFAULT):
-        try:
-            return cls(LevelDb(directory_path=directory_path, create_if_missing=False))
-        except plyvel.Error:
-            raise FileNotFoundError
+        return cls(ConceptNetIndexFile.open(directory_path / cls.__INDEX_FILE_NAME), cache_size=cache_size)
 
-    def get(self, label: str, *, pos: Optional[str] = None) -> Optional[str]:
+    @staticmethod
+    def __entry(node_ids: Tuple[str, ...]) -> Tuple[str, ...]:
         """
-        Get the ConceptNet node ID corresponding to a label and optional part of speech.
+        Precompute the entry of a label's node ids, see the class docstring.
         """
-        value = self.__db.get(self.__label_to_key(label))
-        if value is None:
-            return None
-        node_id = pickle.loads(value)
-        if isinstance(node_id, str):
-            return node_id
-        node_ids = node_id
-        assert isinstance(node_ids, list)
-        if pos is None:
-            return node_ids[0]
-        parsed_node_ids = []
+        if len(node_ids) == 1:
+            return node_ids
         # Parse the node id's with the same label
-        # If there's one that corresponds exactly with the requested qualifiers, return it.
-        node_id_without_qualifiers = None
+        # The first one with a part of speech qualifier is the one for that part of speech.
+        node_id_without_qualifiers = ""
+        pos_node_ids = {}
         for node_id in node_ids:
             node_id_split = node_id.split('/')
             assert len(node_id_split) >= 4
-            unqualified_node_id, qualifiers = '/'.join(node_id_split[:4]), node_id_split[4:]
+            qualifiers = node_id_split[4:]
             if qualifiers:
-                node_pos = qualifiers.pop(0)
-                if node_pos == pos:
-                    return node_id
+                pos_node_ids.setdefault(qualifiers[0], node_id)
             else:
                 node_id_without_qualifiers = node_id
+        entry = [node_ids[0], node_id_without_qualifiers]
+        for pos, node_id in pos_node_ids.items():
+            entry.append(pos)
+            entry.append(node_id)
+        return tuple(entry)
+
+    @classmethod
+    def open(cls, directory_path: Optional[Path] = __DIRECTORY_PATH_DEFAULT, *, cache_size: int = DEFAULT_CACHE_SIZE):
+        directory_path = Path(directory_path)
+        index_file_path = directory_path / cls.__INDEX_FILE_NAME
+        if not index_file_path.is_file():
+            # An index directory built as a LevelDB database, before the index file existed. Write the file from it.
+            try:
+                import plyvel
+                from mowgli_etl.storage.level_db import LevelDb
+            except ImportError:
+                raise FileNotFoundError
+            try:
+                db = LevelDb(directory_path=directory_path, create_if_missing=False)
+            except plyvel.Error:
+                raise FileNotFoundError
+            try:
+                # LevelDB iterates over keys in sorted order
+                ConceptNetIndexFile.write(
+                    index_file_path,
+                    (
+                        (key, cls.__entry((node_ids,) if isinstance(node_ids, str) else tuple(node_ids)))
+                        for key, node_ids in ((key, pickle.loads(value)) for key, value in db.iterator())
+                    )
+                )
+            finally:
+                db.close()
+        return cls(ConceptNetIndexFile.open(index_file_path), cache_size=cache_size)
+
+    def get(self, label: str, *, pos: Optional[str] = None) -> Optional[str]:
+        """
+        Get the ConceptNet node ID corresponding to a label and optional part of speech.
+        """
+        cache_key = (label, pos)
+        try:
+            node_id = self.__cache[cache_key]
+            self.__cache.move_to_end(cache_key)
+            return node_id
+        except KeyError:
+            pass
+        node_id = self.__entry_node_id(self.__index_file.get(self.__label_to_key(label)), pos=pos)
+        self.__cache_node_id(cache_key, node_id)
+        return node_id
+
+    def get_many(self, labels: Iterable[str], *, pos: Optional[str] = None) -> Tuple[Optional[str], ...]:
+        """
+        Get the ConceptNet node IDs corresponding to several labels with the same optional part of speech.
+
+        Labels that aren't cached are looked up together, in one sweep of the index file.
+
+        :return: the node ID or None for each label, in order
+        """
+        labels = tuple(labels)
+        node_ids = {}
+        uncached_keys = {}
+        for label in labels:
+            cache_key = (label, pos)
+            try:
+                node_ids[label] = self.__cache[cache_key]
+                self.__cache.move_to_end(cache_key)
+            except KeyError:
+                uncached_keys[label] = self.__label_to_key(label)
+        if uncached_keys:
+            entries = self.__index_file.get_many(uncached_keys.values())
+            for label, key in uncached_keys.items():
+                node_id = node_ids[label] = self.__entry_node_id(entries.get(key), pos=pos)
+                self.__cache_node_id((label, pos), node_id)
+        return tuple(node_ids[label] for label in labels)
+
+    @staticmethod
+    def __entry_node_id(entry: Optional[Tuple[str, ...]], *, pos: Optional[str]) -> Optional[str]:
+        if entry is None:
+            return None
+        if len(entry) == 1 or pos is None:
+            return entry[0]
+        # If there's a node id that corresponds exactly with the requested part of speech, return it.
+        for pos_i in range(2, len(entry), 2):
+            if entry[pos_i] == pos:
+                return entry[pos_i + 1]
         # No node id corresponds exactly with the requested qualifiers, return a node id without qualifiers if we have one.
-        return node_id_without_qualifiers
+        return entry[1] or None
 
     @staticmethod
     def __label_to_key(label: str):
         return label.lower().encode("utf-8")
+
+    @staticmethod
+    def __read_node_labels(
+            nodes_csv_file_path: Path,
+            *,
+            limit: Optional[int],
+            namespace: Optional[str]
+    ) -> Generator[Tuple[bytes, str], None, None]:
+        with _open_nodes_csv_file(nodes_csv_file_path) as nodes_csv_file:
+            yield from _node_labels(nodes_csv_file, limit=limit, namespace=namespace)
+
+    @classmethod
+    def __read_node_labels_in_process(
+            cls,
+            nodes_csv_file_path: Path,
+            *,
+            limit: Optional[int],
+            namespace: Optional[str]
+    ) -> Generator[Tuple[bytes, str], None, None]:
+        queue_ = multiprocessing.Queue(maxsize=cls.__READ_QUEUE_DEPTH)
+        process = multiprocessing.Process(
+            target=_read_node_labels,
+            kwargs={
+                "batch_size": cls.__READ_BATCH_SIZE,
+                "limit": limit,
+                "namespace": namespace,
+                "nodes_csv_file_path": nodes_csv_file_path,
+                "queue_": queue_,
+            },
+            daemon=True,
+        )
+        process.start()
+        try:
+            while True:
+                try:
+                    batch = queue_.get(timeout=1)
+                except queue.Empty:
+                    # The process puts None or an exception before it exits normally
+                    if process.exitcode not in (None, 0):
+                        raise RuntimeError(f"process reading {nodes_csv_file_path} exited with code {process.exitcode}")
+                    continue
+                if batch is None:
+                    break
+                if isinstance(batch, BaseException):
+                    raise batch
+                yield from batch
+        finally:
+            if process.is_alive():
+                process.terminate()
+            process.join()
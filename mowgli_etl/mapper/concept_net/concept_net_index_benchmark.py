@@ -0,0 +1,61 @@
+"""
+Benchmark ConceptNetIndex lookups of a stream of repeated labels, like a word association source's, with and without
+the cache, one at a time and in batches: lookups/s.
+
+python -m mowgli_etl.mapper.concept_net.concept_net_index_benchmark [label count] [lookup count]
+"""
+
+import random
+import sys
+import timeit
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from mowgli_etl.mapper.concept_net.concept_net_index import ConceptNetIndex
+
+
+def main(label_count: int = 200000, lookup_count: int = 200000) -> None:
+    random.seed(0)
+    # Zipf-like label frequencies, with some labels that aren't in the index
+    lookup_labels = [
+        "word %d" % int(random.paretovariate(1.0) * 10)
+        for _ in range(lookup_count)
+    ]
+    batch_size = 100
+
+    with TemporaryDirectory() as temp_dir_path:
+        temp_dir_path = Path(temp_dir_path)
+        nodes_csv_file_path = temp_dir_path / "nodes.csv"
+        with open(nodes_csv_file_path, "w") as nodes_csv_file:
+            nodes_csv_file.write("id\tlabel\taliases\tpos\tdatasource\tother\n")
+            for label_i in range(label_count):
+                nodes_csv_file.write(f"/c/en/word_{label_i}\tword {label_i}\t\t\tCN\t\n")
+                nodes_csv_file.write(f"/c/en/word_{label_i}/n\tword {label_i}\t\tn\tCN\t\n")
+        ConceptNetIndex.create(
+            directory_path=temp_dir_path / "indexed",
+            nodes_csv_file=nodes_csv_file_path,
+            parallel=False
+        ).close()
+
+        def get(cache_size: int) -> None:
+            with ConceptNetIndex.open(temp_dir_path / "indexed", cache_size=cache_size) as index:
+                for label in lookup_labels:
+                    index.get(label, pos="n")
+
+        def get_many(cache_size: int) -> None:
+            with ConceptNetIndex.open(temp_dir_path / "indexed", cache_size=cache_size) as index:
+                for batch_start in range(0, len(lookup_labels), batch_size):
+                    index.get_many(lookup_labels[batch_start:batch_start + batch_size], pos="n")
+
+        for name, lookup in (
+                ("get, no cache", lambda: get(0)),
+                ("get", lambda: get(ConceptNetIndex.DEFAULT_CACHE_SIZE)),
+                ("get_many, no cache", lambda: get_many(0)),
+                ("get_many", lambda: get_many(ConceptNetIndex.DEFAULT_CACHE_SIZE)),
+        ):
+            lookup_s = min(timeit.repeat(lookup, number=1, repeat=3))
+            print("%-20s %10.0f lookups/s" % (name, lookup_count / lookup_s))
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
@@ -0,0 +1,279 @@
+import mmap
+from bisect import bisect_right
+import os
+import struct
+import sys
+from array import array
+from os.path import commonprefix
+from pathlib import Path
+from shutil import copyfileobj
+from tempfile import TemporaryFile
+from typing import Dict, Generator, Iterable, Optional, Sequence, Tuple
+
+from mowgli_etl._closeable import _Closeable
+
+
+class ConceptNetIndexFile(_Closeable):
+    """
+    Read-only file of ConceptNet node ids by label key, which is memory-mapped and binary searched rather than loaded.
+
+    Any number of processes can open the same file and share its pages in the page cache.
+
+    The file starts with a header:
+
+    magic (8s) | version (u8) | padding (3x) | block size (u32) | label count (u64) | node id count (u64) |
+    offsets of the block offsets, label node ids, node id offsets, labels, and node ids sections (u64 each)
+
+    followed by the sections:
+
+    - block offsets (u64 per block): offset of each block of labels in the labels section
+    - label node ids (u64 per label + 1): index of each label's first node id, the last label's end
+    - node id offsets (u64 per node id + 1): offset of each node id in the node ids section, the last node id's end
+    - labels: the label keys, sorted, in blocks of block size. Each key is front-coded as the length of the prefix it
+    shares with the previous key (u16), the length of the rest of the key (u16), and the rest of the key. The first key
+    of a block shares nothing, so blocks can be binary searched by their first keys.
+    - node ids: the UTF-8 encoded node ids, packed, in label order
+
+    The file is written to a temporary path and renamed at the end, so readers never see a partial file.
+    """
+
+    DEFAULT_BLOCK_SIZE = 16
+    VERSION = 1
+
+    __BUFFER_SIZE = 1024 * 1024
+    __HEADER = struct.Struct("<8sBxxxIQQQQQQQ")
+    __LABEL_HEADER = struct.Struct("<HH")
+    __MAGIC = b"MOWGLICN"
+    __SPARSE_INDEX_INTERVAL = 64
+    __U64 = struct.Struct("<Q")
+    __U64_PAIR = struct.Struct("<QQ")
+
+    def __init__(self, file_path: Path):
+        with open(file_path, "rb") as file_:
+            self.__mmap = mmap.mmap(file_.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            header = self.__HEADER.unpack_from(self.__mmap, 0)
+        except struct.error:
+            self.__mmap.close()
+            raise ValueError(f"{file_path} is not a ConceptNet index file")
+        magic, version = header[:2]
+        if magic != self.__MAGIC or version != self.VERSION:
+            self.__mmap.close()
+            raise ValueError(f"{file_path} is not a version {self.VERSION} ConceptNet index file")
+        (
+            self.__block_size,
+            self.__label_count,
+            self.__node_id_count,
+            self.__block_offsets_offset,
+            self.__label_node_ids_offset,
+            self.__node_id_offsets_offset,
+            self.__labels_offset,
+            self.__node_ids_offset,
+        ) = header[2:]
+        self.__block_count = (self.__label_count + self.__block_size - 1) // self.__block_size
+        # First keys of every SPARSE_INDEX_INTERVAL blocks, to narrow the binary search before touching the file
+        self.__sparse_index = [
+            self.__block_first_key(block_i) for block_i in range(0, self.__block_count, self.__SPARSE_INDEX_INTERVAL)
+        ]
+
+    def __block_first_key(self, block_i: int) -> bytes:
+        offset = self.__labels_offset + self.__U64.unpack_from(self.__mmap, self.__block_offsets_offset + block_i * 8)[0]
+        _, first_key_length = self.__LABEL_HEADER.unpack_from(self.__mmap, offset)
+        offset += self.__LABEL_HEADER.size
+        return self.__mmap[offset:offset + first_key_length]
+
+    def close(self):
+        self.__mmap.close()
+
+    def __find(self, key: bytes) -> Optional[int]:
+        """
+        :return: the index of the label with the given key, or None
+        """
+        block_i = self.__find_block(key)
+        if block_i is None:
+            return None
+        for label_key, label_i in self.__scan_block(block_i):
+            if label_key == key:
+                return label_i
+            if label_key > key:
+                return None
+        return None
+
+    def __find_block(self, key: bytes) -> Optional[int]:
+        """
+        :return: the index of the last block whose first key is <= the key, or None
+        """
+        sparse_index_i = bisect_right(self.__sparse_index, key) - 1
+        if sparse_index_i < 0:
+            return None
+        low = sparse_index_i * self.__SPARSE_INDEX_INTERVAL + 1
+        high = min(low + self.__SPARSE_INDEX_INTERVAL - 1, self.__block_count)
+        while low < high:
+            middle = (low + high) // 2
+            if self.__block_first_key(middle) <= key:
+                low = middle + 1
+            else:
+                high = middle
+        return low - 1
+
+    def get(self, key: bytes) -> Optional[Tuple[str, ...]]:
+        """
+        Get the node ids of the label with the given key, in the order they were written.
+        """
+        label_i = self.__find(key)
+        if label_i is None:
+            return None
+        return self.__node_ids(label_i)
+
+    def get_many(self, keys: Iterable[bytes]) -> Dict[bytes, Tuple[str, ...]]:
+        """
+        Get the node ids of the labels with the given keys.
+
+        The keys are deduplicated and sorted, then the labels are read in one sweep, which binary searches for and scans
+        each block with any of the keys once.
+
+        :return: dict of key -> node ids, without the keys that weren't found
+        """
+        results = {}
+        block_i = None
+        next_block_first_key = None
+        block_labels = iter(())
+        label_key = label_i = None
+        for key in sorted(set(keys)):
+            if block_i is None or (next_block_first_key is not None and key >= next_block_first_key):
+                block_i = self.__find_block(key)
+                if block_i is None:
+                    continue
+                next_block_first_key = \
+                    self.__block_first_key(block_i + 1) if block_i + 1 < self.__block_count else None
+                block_labels = self.__scan_block(block_i)
+                label_key, label_i = next(block_labels)
+            # Keys are sorted, so continue scanning the block from the previous key's label
+            while label_key is not None and label_key < key:
+                label_key, label_i = next(block_labels, (None, None))
+            if label_key == key:
+                results[key] = self.__node_ids(label_i)
+        return results
+
+    def __len__(self):
+        return self.__label_count
+
+    def __node_ids(self, label_i: int) -> Tuple[str, ...]:
+        mmap_ = self.__mmap
+        node_id_i, end_node_id_i = self.__U64_PAIR.unpack_from(mmap_, self.__label_node_ids_offset + label_i * 8)
+        if end_node_id_i == node_id_i + 1:
+            start, end = self.__U64_PAIR.unpack_from(mmap_, self.__node_id_offsets_offset + node_id_i * 8)
+            return mmap_[self.__node_ids_offset + start:self.__node_ids_offset + end].decode("utf-8"),
+        offsets = struct.unpack_from(
+            "<%dQ" % (end_node_id_i - node_id_i + 1), mmap_, self.__node_id_offsets_offset + node_id_i * 8
+        )
+        return tuple(
+            mmap_[self.__node_ids_offset + start:self.__node_ids_offset + end].decode("utf-8")
+            for start, end in zip(offsets, offsets[1:])
+        )
+
+    @classmethod
+    def open(cls, file_path: Path) -> "ConceptNetIndexFile":
+        return cls(file_path)
+
+    def __scan_block(self, block_i: int) -> Generator[Tuple[bytes, int], None, None]:
+        """
+        Generate the (key, label index) of each label in a block.
+        """
+        label_header_size = self.__LABEL_HEADER.size
+        mmap_ = self.__mmap
+        unpack_label_header = self.__LABEL_HEADER.unpack_from
+        offset = self.__labels_offset + self.__U64.unpack_from(mmap_, self.__block_offsets_offset + block_i * 8)[0]
+        label_i = block_i * self.__block_size
+        block_end_label_i = min(label_i + self.__block_size, self.__label_count)
+        label_key = b""
+        while label_i < block_end_label_i:
+            shared_length, suffix_length = unpack_label_header(mmap_, offset)
+            offset += label_header_size
+            label_key = label_key[:shared_length] + mmap_[offset:offset + suffix_length]
+            offset += suffix_length
+            yield label_key, label_i
+            label_i += 1
+
+    @classmethod
+    def write(
+            cls,
+            file_path: Path,
+            entries: Iterable[Tuple[bytes, Sequence[str]]],
+            *,
+            block_size: int = DEFAULT_BLOCK_SIZE
+    ) -> None:
+        """
+        Write a file.
+
+        :param file_path: path to the file, which is replaced if it exists
+        :param entries: (label key, node ids) entries, sorted by label key, with no duplicate keys
+        :param block_size: number of labels per front-coded block
+        """
+
+        block_offsets = array("Q")
+        label_node_ids = array("Q", (0,))
+        node_id_offsets = array("Q", (0,))
+        temp_file_path = file_path.with_name(f".{file_path.name}.{os.getpid()}.tmp")
+        try:
+            with TemporaryFile() as labels_file, TemporaryFile() as node_ids_file:
+                labels_size = node_ids_size = 0
+                previous_key = None
+                for label_i, (key, node_ids) in enumerate(entries):
+                    if previous_key is not None and key <= previous_key:
+                        raise ValueError(f"label keys are not sorted or not unique: {previous_key!r}, {key!r}")
+                    if not node_ids:
+                        raise ValueError(f"label has no node ids: {key!r}")
+                    if len(key) > 0xFFFF:
+                        raise ValueError(f"label is too long: {key[:100]!r}...")
+
+                    if label_i % block_size == 0:
+                        block_offsets.append(labels_size)
+                        shared_length = 0
+                    else:
+                        shared_length = len(commonprefix((previous_key, key)))
+                    suffix = key[shared_length:]
+                    labels_file.write(cls.__LABEL_HEADER.pack(shared_length, len(suffix)))
+                    labels_file.write(suffix)
+                    labels_size += cls.__LABEL_HEADER.size + len(suffix)
+
+                    for node_id in node_ids:
+                        encoded_node_id = node_id.encode("utf-8")
+                        node_ids_file.write(encoded_node_id)
+                        node_ids_size += len(encoded_node_id)
+                        node_id_offsets.append(node_ids_size)
+                    label_node_ids.append(len(node_id_offsets) - 1)
+
+                    previous_key = key
+
+                sections = (block_offsets, label_node_ids, node_id_offsets)
+                section_offsets = []
+                offset = cls.__HEADER.size
+                for section in sections:
+                    section_offsets.append(offset)
+                    offset += len(section) * section.itemsize
+                labels_offset = offset
+                node_ids_offset = labels_offset + labels_size
+
+                with open(temp_file_path, "wb", buffering=cls.__BUFFER_SIZE) as file_:
+                    file_.write(cls.__HEADER.pack(
+                        cls.__MAGIC,
+                        cls.VERSION,
+                        block_size,
+                        len(label_node_ids) - 1,
+                        len(node_id_offsets) - 1,
+                        *section_offsets,
+                        labels_offset,
+                        node_ids_offset
+                    ))
+                    for section in sections:
+                        if sys.byteorder != "little":
+                            section.byteswap()
+                        section.tofile(file_)
+                    for data_file in (labels_file, node_ids_file):
+                        data_file.seek(0)
+                        copyfileobj(data_file, file_, cls.__BUFFER_SIZE)
+            os.replace(temp_file_path, file_path)
+        finally:
+            if temp_file_path.exists():
+                temp_file_path.unlink()
@@ -18,10 +18,7 @@ class ConceptNetMapper(_Closeable):
         """
         Given a node from another data source, generate a sequence of edges mapping that node to ConceptNet concepts.
         """
-        for node_label in node.labels:
-            concept_net_id = self.__concept_net_index.get(
-                label=node_label, pos=node.pos
-            )
+        for concept_net_id in self.__concept_net_index.get_many(node.labels, pos=node.pos):
             if concept_net_id is None:
                 continue
             yield KgEdge.with_generated_id(
@@ -0,0 +1,116 @@
+import bz2
+import logging
+import multiprocessing
+import os
+import re
+from collections import deque
+from pathlib import Path
+from typing import BinaryIO, List, Optional, Tuple, Union
+
+# Start of a bz2 stream: the stream header (BZh + block size) followed by the first block's magic number (pi)
+_STREAM_START = re.compile(rb"BZh[1-9]1AY&SY")
+
+
+def _decompress_range(file_path: str, start: int, end: int) -> bytes:
+    with open(file_path, "rb") as file_:
+        file_.seek(start)
+        # bz2.decompress handles the concatenated streams in the range, and raises if the last one is incomplete
+        return bz2.decompress(file_.read(end - start))
+
+
+class ParallelBz2Decompressor:
+    """
+    Decompress multi-stream bz2 files, such as those written by pbzip2 or lbzip2, in a process pool.
+
+    bz2 streams are byte-aligned and independent, so the file is split at stream starts, consecutive streams are grouped
+    into chunks, and the chunks are decompressed in parallel and written out in order. Memory is bounded by the number of
+    chunks in flight.
+
+    Blocks within one stream aren't byte-aligned, so single-stream files are decompressed serially, with the same bounded
+    memory. Files are also decompressed serially in a daemonic process, which can't have child processes. A stream start pattern can also occur by chance inside compressed data; if a chunk then fails to decompress,
+    the file is decompressed serially instead.
+    """
+
+    DEFAULT_CHUNK_SIZE = 8 * 1024 * 1024
+
+    __COPY_BUFFER_SIZE = 1024 * 1024
+    __SCAN_BUFFER_SIZE = 16 * 1024 * 1024
+
+    def __init__(self, *, chunk_size: int = DEFAULT_CHUNK_SIZE, processes: Optional[int] = None):
+        """
+        :param chunk_size: minimum compressed size of a chunk of streams decompressed by one task
+        :param processes: number of worker processes, defaults to the number of CPUs
+        """
+        self._logger = logging.getLogger(self.__class__.__name__)
+        self.__chunk_size = chunk_size
+        self.__processes = processes if processes is not None else (os.cpu_count() or 1)
+
+    def __chunk_ranges(self, file_path: Path) -> List[Tuple[int, int]]:
+        """
+        Find the stream starts and group consecutive streams into chunks of at least chunk_size compressed bytes.
+        """
+        file_size = os.path.getsize(file_path)
+        overlap = len(b"BZh91AY&SY") - 1
+        chunk_starts = [0]
+        with open(file_path, "rb") as file_:
+            offset = 0
+            tail = b""
+            while True:
+                buffer = file_.read(self.__SCAN_BUFFER_SIZE)
+                if not buffer:
+                    break
+                data = tail + buffer
+                data_offset = offset - len(tail)
+                for match in _STREAM_START.finditer(data):
+                    stream_start = data_offset + match.start()
+                    if stream_start - chunk_starts[-1] >= self.__chunk_size:
+                        chunk_starts.append(stream_start)
+                offset += len(buffer)
+                tail = data[-overlap:]
+        return [
+            (chunk_start, chunk_starts[chunk_i + 1] if chunk_i + 1 < len(chunk_starts) else file_size)
+            for chunk_i, chunk_start in enumerate(chunk_starts)
+        ]
+
+    def decompress(self, in_file_path: Union[str, Path], out_file: BinaryIO) -> None:
+        in_file_path = Path(in_file_path)
+        # Daemonic processes, such as multiprocessing.Pool workers, can't start a pool of their own.
+        if self.__processes > 1 and not multiprocessing.current_process().daemon:
+            chunk_ranges = self.__chunk_ranges(in_file_path)
+        else:
+            chunk_ranges = []
+        if len(chunk_ranges) < 2:
+            self.__decompress_serially(in_file_path, out_file)
+            return
+
+        self._logger.info(
+            "decompressing %s in %d chunks in %d processes", in_file_path, len(chunk_ranges), self.__processes
+        )
+        out_file_start = out_file.tell()
+        try:
+            with multiprocessing.Pool(self.__processes) as pool:
+                pending = deque()
+                chunk_ranges = iter(chunk_ranges)
+                while True:
+                    # Keep two chunks per process in flight
+                    while len(pending) < self.__processes * 2:
+                        chunk_range = next(chunk_ranges, None)
+                        if chunk_range is None:
+                            break
+                        pending.append(pool.apply_async(_decompress_range, (str(in_file_path), *chunk_range)))
+                    if not pending:
+                        break
+                    out_file.write(pending.popleft().get())
+        except (EOFError, OSError, ValueError):
+            self._logger.info("%s isn't split at stream boundaries, decompressing serially", in_file_path)
+            out_file.seek(out_file_start)
+            out_file.truncate()
+            self.__decompress_serially(in_file_path, out_file)
+
+    def __decompress_serially(self, in_file_path: Path, out_file: BinaryIO) -> None:
+        with bz2.open(in_file_path, "rb") as in_file:
+            while True:
+                data = in_file.read(self.__COPY_BUFFER_SIZE)
+                if not data:
+                    return
+                out_file.write(data)
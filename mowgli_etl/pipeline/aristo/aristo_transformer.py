@@ -9,6 +9,7 @@ from mowgli_etl.model.kg_edge import KgEdge
 from mowgli_etl.model.kg_node import KgNode
 from mowgli_etl._transformer import _Transformer
 from mowgli_etl.model.word_net_id import WordNetId
+from mowgli_etl.virtual_extracted_file import open_extracted_file
 
 
 class AristoTransformer(_Transformer):
@@ -87,7 +88,7 @@ class AristoTransformer(_Transformer):
         yielded_edges_tree = {}
         yielded_node_ids = set()
         unmapped_preds = Counter()
-        with open(combined_kb_tsv_file_path, "r") as combined_kb_tsv_file:
+        with open_extracted_file(combined_kb_tsv_file_path, "r") as combined_kb_tsv_file:
             for row in csv.DictReader(combined_kb_tsv_file, delimiter='\t'):
                 # QStrength	- The quantification strength of the triple (0-1), where 1 = applies to most members of Arg1, 0 = applies to just a few members of Arg1.
                 # The scale is purely a ranking scale (has no probabilistic meaning) - feel free to rescale it as required for your application.
@@ -1,5 +1,5 @@
 from pathlib import Path
-from typing import Optional, Tuple
+from typing import Optional, Tuple, Union
 
 from rdflib import Graph, RDF, OWL, RDFS, URIRef
 
@@ -7,6 +7,7 @@ from mowgli_etl.model import concept_net_predicates
 from mowgli_etl.model.kg_edge import KgEdge
 from mowgli_etl.model.kg_node import KgNode
 from mowgli_etl._transformer import _Transformer
+from mowgli_etl.virtual_extracted_file import VirtualExtractedFile
 
 
 class FoodOnTransformer(_Transformer):
@@ -28,10 +29,14 @@ class FoodOnTransformer(_Transformer):
                 )
             self.node_yielded = False
 
-    def transform(self, food_on_owl_file_path: Path):
+    def transform(self, food_on_owl_file_path: Union[Path, VirtualExtractedFile]):
         graph = Graph()
         self._logger.info("parsing FoodOn OWL")
-        graph.parse(source=str(food_on_owl_file_path))
+        if isinstance(food_on_owl_file_path, VirtualExtractedFile):
+            with food_on_owl_file_path.open("rb") as food_on_owl_file:
+                graph.parse(file=food_on_owl_file, format="xml")
+        else:
+            graph.parse(source=str(food_on_owl_file_path))
         self._logger.info("parsed FoodOn OWL")
 
         self._logger.info("parsing FoodOn classes")
@@ -9,6 +9,7 @@ from mowgli_etl.model.mowgli_predicates import SAME_AS
 from mowgli_etl.model.kg_node import KgNode
 from mowgli_etl._transformer import _Transformer
 from mowgli_etl.model.word_net_id import WordNetId
+from mowgli_etl.virtual_extracted_file import open_extracted_file
 
 
 class HasPartTransformer(_Transformer):
@@ -45,7 +46,7 @@ class HasPartTransformer(_Transformer):
     def transform(self, has_part_kb_jsonl_file_path: Path):
         same_as_edges_yielded = {}
 
-        with open(has_part_kb_jsonl_file_path, "r") as has_part_kb_jsonl_file:
+        with open_extracted_file(has_part_kb_jsonl_file_path, "r") as has_part_kb_jsonl_file:
             for line in has_part_kb_jsonl_file:
                 json_object = json.loads(line)
 
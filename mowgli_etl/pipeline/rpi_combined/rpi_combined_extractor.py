@@ -1,6 +1,5 @@
 import multiprocessing
 from pathlib import Path
-from tempfile import TemporaryDirectory
 from typing import Dict, Tuple
 
 from mowgli_etl._extractor import _Extractor
@@ -11,19 +10,19 @@ from mowgli_etl.pipeline_storage import PipelineStorage
 from mowgli_etl.pipeline_wrapper import PipelineWrapper
 
 
-def parallel_worker(force: bool, pipeline: _Pipeline, root_data_dir_path: Path) -> Tuple[Path, Path]:
-    # plyvel is not multiprocessing-safe, so create a temporary directory for the ConceptNet index.
-    with TemporaryDirectory() as concept_net_index_directory_path:
-        with Mappers(concept_net_index_directory_path=Path(concept_net_index_directory_path)) as mappers:
-            return serial_worker(force, pipeline, mappers, root_data_dir_path)
+def parallel_worker(force: bool, pipeline: _Pipeline, root_data_dir_path: Path, incremental: bool = False, stream_extracted_files: bool = False) -> Tuple[Path, Path]:
+    # The ConceptNet index is a read-only memory-mapped file, which every worker opens and shares.
+    with Mappers() as mappers:
+        return serial_worker(force, pipeline, mappers, root_data_dir_path, incremental, stream_extracted_files)
 
 
-def serial_worker(force: bool, pipeline: _Pipeline, mappers: Tuple[_Mapper, ...], root_data_dir_path: Path) -> Tuple[
+def serial_worker(force: bool, pipeline: _Pipeline, mappers: Tuple[_Mapper, ...], root_data_dir_path: Path, incremental: bool = False, stream_extracted_files: bool = False) -> Tuple[
     Path, Path]:
-    storage = PipelineStorage(pipeline_id=pipeline.id, root_data_dir_path=root_data_dir_path)
+    storage = PipelineStorage(pipeline_id=pipeline.id, root_data_dir_path=root_data_dir_path, stream_extracted_files=stream_extracted_files)
     pipeline_wrapper = PipelineWrapper(pipeline, storage)
 
-    pipeline_wrapper.run(force=force, mappers=mappers)
+    # In incremental mode, member pipelines whose inputs haven't changed are skipped, leaving their loaded files as-is.
+    pipeline_wrapper.run(force=force, incremental=incremental, mappers=mappers)
 
     edges_csv_file_path = storage.loaded_data_dir_path / 'edges.csv'
     nodes_csv_file_path = storage.loaded_data_dir_path / 'nodes.csv'
@@ -36,8 +35,9 @@ class RpiCombinedExtractor(_Extractor):
     Extracts the CSKG formatted result of one or more pipelines
     """
 
-    def __init__(self, *, pipelines: Tuple[_Pipeline, ...], parallel=False):
+    def __init__(self, *, pipelines: Tuple[_Pipeline, ...], parallel=False, incremental=False):
         super().__init__()
+        self.__incremental = incremental
         self.__parallel = parallel
         self.__pipelines = pipelines
 
@@ -46,10 +46,12 @@ class RpiCombinedExtractor(_Extractor):
         nodes_csv_file_paths, edges_csv_file_paths = [], []
 
         if self.__parallel:
-            with multiprocessing.Pool() as multiprocessing_pool:
+            # Open the mappers before starting the workers, so the ConceptNet index is built here, if it has to be, rather
+            # than in every worker.
+            with Mappers(), multiprocessing.Pool() as multiprocessing_pool:
                 for edges_csv_file_path, nodes_csv_file_path in \
                         multiprocessing_pool.starmap(parallel_worker,
-                                                     tuple((force, pipeline, storage.root_data_dir_path) for pipeline in
+                                                     tuple((force, pipeline, storage.root_data_dir_path, self.__incremental, storage.stream_extracted_files) for pipeline in
                                                            self.__pipelines)):
                     edges_csv_file_paths.append(edges_csv_file_path)
                     nodes_csv_file_paths.append(nodes_csv_file_path)
@@ -57,7 +59,9 @@ class RpiCombinedExtractor(_Extractor):
             with Mappers() as mappers:
                 for pipeline in self.__pipelines:
                     edges_csv_file_path, nodes_csv_file_path = serial_worker(force, pipeline, mappers,
-                                                                             storage.root_data_dir_path)
+                                                                             storage.root_data_dir_path,
+                                                                             self.__incremental,
+                                                                             storage.stream_extracted_files)
                     edges_csv_file_paths.append(edges_csv_file_path)
                     nodes_csv_file_paths.append(nodes_csv_file_path)
         self._logger.info("Finished combined extraction")
@@ -8,12 +8,12 @@ from mowgli_etl.pipeline.rpi_combined.rpi_combined_extractor import RpiCombinedE
 
 
 class RpiCombinedPipeline(_Pipeline):
-    def __init__(self, *, pipelines: Optional[Tuple[_Pipeline, ...]] = None, parallel: Optional[bool], **kwds):
+    def __init__(self, *, pipelines: Optional[Tuple[_Pipeline, ...]] = None, parallel: Optional[bool], incremental: Optional[bool] = False, **kwds):
         if pipelines is None:
             pipelines = self.__default_pipelines()
         super().__init__(
             id="combined",
-            extractor=RpiCombinedExtractor(pipelines=pipelines, parallel=bool(parallel)),
+            extractor=RpiCombinedExtractor(pipelines=pipelines, parallel=bool(parallel), incremental=bool(incremental)),
             single_source=False,
             transformer=CskgCsvTransformer(),
             **kwds
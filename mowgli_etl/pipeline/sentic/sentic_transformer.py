@@ -12,6 +12,7 @@ from mowgli_etl.pipeline.sentic.sentic_mappers import (
     sentic_id,
     sentic_node,
 )
+from mowgli_etl.virtual_extracted_file import open_extracted_file
 
 
 class SENTICTransformer(_Transformer):
@@ -19,7 +20,7 @@ class SENTICTransformer(_Transformer):
 
         self._logger.info("transform %s", SENTIC_FILE_KEY)
 
-        with open(kwds[SENTIC_FILE_KEY], mode="r") as sentic_file:
+        with open_extracted_file(kwds[SENTIC_FILE_KEY], mode="r") as sentic_file:
             dom = parse(sentic_file)
 
             sentic_fields = (
@@ -1,7 +1,5 @@
 from typing import Dict, Optional
 
-from pathvalidate import sanitize_filename
-
 from mowgli_etl._extractor import _Extractor
 from mowgli_etl.pipeline.swow.swow_constants import SWOW_CSV_FILE_KEY
 from mowgli_etl.pipeline_storage import PipelineStorage
@@ -14,6 +12,5 @@ class SwowExtractor(_Extractor):
 
     def extract(self, *, force: bool, storage: PipelineStorage) -> Optional[Dict[str, object]]:
         self._logger.info("extract")
-        self._extract_bz2(self.__swow_archive_path, force, storage)
-        strength_file_path = storage.extracted_data_dir_path / sanitize_filename(self.__swow_archive_path)
+        strength_file_path = self._extract_bz2(self.__swow_archive_path, force, storage)
         return {SWOW_CSV_FILE_KEY: strength_file_path}
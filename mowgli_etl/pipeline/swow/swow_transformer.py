@@ -7,6 +7,7 @@ from mowgli_etl.model.kg_edge import KgEdge
 from mowgli_etl.model.kg_node import KgNode
 from mowgli_etl._transformer import _Transformer
 from mowgli_etl.pipeline.swow.swow_mappers import swow_edge, swow_node, SwowResponseType
+from mowgli_etl.virtual_extracted_file import open_extracted_file
 
 _NOT_AVAILABLE_TERM = "NA"
 
@@ -23,7 +24,7 @@ class SwowTransformer(_Transformer):
         Generate nodes and edges from a SWOW csv file.
         """
         edge_tree = {}
-        with open(swow_csv_file, mode="r") as csv_file:
+        with open_extracted_file(swow_csv_file, mode="r") as csv_file:
             csv_reader = csv.DictReader(
                 csv_file,
                 delimiter=",",
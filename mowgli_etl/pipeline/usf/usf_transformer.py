@@ -7,6 +7,7 @@ from mowgli_etl.model.kg_node import KgNode
 from mowgli_etl._transformer import _Transformer
 from mowgli_etl.pipeline.usf.usf_constants import STRENGTH_FILE_KEY
 from mowgli_etl.pipeline.usf.usf_mappers import usf_edge, usf_node
+from mowgli_etl.virtual_extracted_file import open_extracted_file
 
 """ 
 The frequency attribute refers to a score of natural frequency of said
@@ -32,7 +33,7 @@ class USFTransformer(_Transformer):
 
         self._logger.info("transform %s", STRENGTH_FILE_KEY)
 
-        with open(kwds[STRENGTH_FILE_KEY], mode='r') as strength_file:
+        with open_extracted_file(kwds[STRENGTH_FILE_KEY], mode='r') as strength_file:
             dom = parse(strength_file)
 
             cue = dom.getElementsByTagName('cue')
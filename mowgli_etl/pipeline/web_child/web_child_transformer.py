@@ -10,6 +10,7 @@ from mowgli_etl.model.kg_node import KgNode
 from mowgli_etl._transformer import _Transformer
 from mowgli_etl.storage._kg_node_set import _KgNodeSet
 from mowgli_etl.storage.mem_kg_node_set import MemKgNodeSet
+from mowgli_etl.virtual_extracted_file import open_extracted_file
 
 try:
     from mowgli_etl.storage.persistent_kg_node_set import PersistentKgNodeSet
@@ -66,7 +67,7 @@ class WebChildTransformer(_Transformer):
             self, *, csv_file_path: Path, yielded_words: _KgNodeSet
     ) -> Generator[Union[KgNode, KgEdge], None, None]:
         self._logger.info("transforming %s", csv_file_path)
-        with open(csv_file_path) as csv_file:
+        with open_extracted_file(csv_file_path) as csv_file:
             csv_reader = csv.DictReader(
                 csv_file, delimiter="\t", quoting=csv.QUOTE_NONE
             )
@@ -82,7 +83,7 @@ class WebChildTransformer(_Transformer):
             self, *, wordnet_csv_file_path: Path, yielded_words: _KgNodeSet
     ) -> Generator[Union[KgNode, KgEdge], None, None]:
         self._logger.info("transforming wordnet mappings from %s", wordnet_csv_file_path)
-        with open(wordnet_csv_file_path) as csv_file:
+        with open_extracted_file(wordnet_csv_file_path) as csv_file:
             csv_reader = csv.DictReader(
                 csv_file, delimiter="\t", quoting=csv.QUOTE_NONE
             )
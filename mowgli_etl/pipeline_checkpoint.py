@@ -0,0 +1,57 @@
+import json
+import os
+from pathlib import Path
+from shutil import rmtree
+from typing import Dict, NamedTuple, Optional
+
+
+class PipelineCheckpoint(NamedTuple):
+    """
+    Progress of a checkpointed pipeline run, written to the pipeline's checkpoint directory alongside the whole graph
+    checker's sets.
+
+    model_count is the number of models the transformer had yielded at the checkpoint. Everything derived from those
+    models had been checked, mapped, and loaded. Transformers are opaque generators, so a resumed run replays the
+    transformer from the start and skips that many models rather than seeking in the input.
+    """
+
+    model_count: int
+    # Return value of the loader's checkpoint method
+    loader_state: Optional[Dict[str, object]]
+
+    FILE_NAME = "checkpoint.json"
+
+    @staticmethod
+    def clear(directory_path: Path) -> None:
+        """
+        Delete the checkpoint and everything else in the checkpoint directory.
+        """
+        for child_path in directory_path.iterdir():
+            if child_path.is_dir():
+                rmtree(child_path)
+            else:
+                child_path.unlink()
+
+    @classmethod
+    def read(cls, directory_path: Path) -> Optional["PipelineCheckpoint"]:
+        """
+        :return: the last checkpoint written to the directory, or None if there is none
+        """
+        try:
+            with open(directory_path / cls.FILE_NAME) as file_:
+                json_object = json.load(file_)
+        except FileNotFoundError:
+            return None
+        return cls(model_count=json_object["model_count"], loader_state=json_object["loader_state"])
+
+    def write(self, directory_path: Path) -> None:
+        """
+        Replace the checkpoint in the directory atomically.
+        """
+        file_path = directory_path / self.FILE_NAME
+        temp_file_path = directory_path / (self.FILE_NAME + ".tmp")
+        with open(temp_file_path, "w") as file_:
+            json.dump(self._asdict(), file_)
+            file_.flush()
+            os.fsync(file_.fileno())
+        os.replace(temp_file_path, file_path)
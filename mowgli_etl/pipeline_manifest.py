@@ -0,0 +1,159 @@
+import hashlib
+import inspect
+import json
+import logging
+import os
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, NamedTuple, Optional
+
+from mowgli_etl import paths
+from mowgli_etl.virtual_extracted_file import VirtualExtractedFile
+
+
+def _hash_file(file_path: Path, hash_) -> None:
+    with open(file_path, "rb") as file_:
+        while True:
+            chunk = file_.read(1024 * 1024)
+            if not chunk:
+                return
+            hash_.update(chunk)
+
+
+def _hash_path(path: Path) -> str:
+    """
+    Hash a file's contents, or the relative paths and contents of every file under a directory.
+    """
+    hash_ = hashlib.sha256()
+    if path.is_dir():
+        for file_path in sorted(file_path for file_path in path.rglob("*") if file_path.is_file()):
+            hash_.update(str(file_path.relative_to(path)).encode("utf-8") + b"\0")
+            _hash_file(file_path, hash_)
+    else:
+        _hash_file(path, hash_)
+    return hash_.hexdigest()
+
+
+@lru_cache(maxsize=None)
+def _hash_source_directory(directory_path: Path, exclude_directory_path: Optional[Path] = None) -> str:
+    hash_ = hashlib.sha256()
+    for file_path in sorted(directory_path.rglob("*.py")):
+        if exclude_directory_path is not None and exclude_directory_path in file_path.parents:
+            continue
+        hash_.update(str(file_path.relative_to(directory_path)).encode("utf-8") + b"\0")
+        _hash_file(file_path, hash_)
+    return hash_.hexdigest()
+
+
+class PipelineManifest(NamedTuple):
+    """
+    Record of what went into a successful pipeline run, written next to the loaded data.
+
+    If the manifest of a new run is equal to the last one, and the loaded files are still there, the run can be skipped.
+
+    - inputs: extract keyword -> SHA-256 of the extracted file or directory
+    - code_version: SHA-256 of the pipeline's package and of the rest of mowgli_etl outside the pipeline package
+    - arguments: arguments that affect the loaded data, as repr's
+    - outputs: loaded file name -> size
+    """
+
+    arguments: Dict[str, str]
+    code_version: str
+    inputs: Dict[str, str]
+    outputs: Dict[str, int]
+
+    FILE_NAME = "manifest.json"
+
+    @classmethod
+    def create(
+            cls,
+            *,
+            arguments: Dict[str, object],
+            extract_kwds: Dict[str, object],
+            pipeline
+    ) -> "PipelineManifest":
+        """
+        Create a manifest of a run's inputs, without outputs.
+
+        :param extract_kwds: return value of the pipeline's extractor. Path and VirtualExtractedFile values are hashed,
+        other values are treated as arguments.
+        """
+        arguments = {key: repr(value) for key, value in arguments.items()}
+        inputs = {}
+        for key, value in extract_kwds.items():
+            if isinstance(value, VirtualExtractedFile):
+                # Hash the compressed source, which is what the transformer reads
+                value = value.compressed_file_path
+            if isinstance(value, Path):
+                inputs[key] = _hash_path(value)
+            elif isinstance(value, (list, tuple)) and value and all(isinstance(element, Path) for element in value):
+                for element_i, element in enumerate(value):
+                    inputs[f"{key}[{element_i}]"] = _hash_path(element)
+            else:
+                arguments["extract." + key] = repr(value)
+        return cls(
+            arguments=dict(sorted(arguments.items())),
+            code_version=cls.__code_version(pipeline),
+            inputs=dict(sorted(inputs.items())),
+            outputs={},
+        )
+
+    @staticmethod
+    def __code_version(pipeline) -> str:
+        pipeline_package_path = Path(os.path.abspath(inspect.getfile(pipeline.__class__))).parent
+        hash_ = hashlib.sha256()
+        hash_.update(_hash_source_directory(pipeline_package_path).encode("ascii"))
+        hash_.update(_hash_source_directory(paths.SRC_ROOT, paths.SRC_ROOT / "pipeline").encode("ascii"))
+        return hash_.hexdigest()
+
+    @staticmethod
+    def delete(directory_path: Path) -> None:
+        try:
+            (directory_path / PipelineManifest.FILE_NAME).unlink()
+        except FileNotFoundError:
+            pass
+
+    def is_up_to_date(self, directory_path: Path) -> bool:
+        """
+        :return: True if the last manifest in the directory has the same inputs, and its outputs are unchanged
+        """
+        logger = logging.getLogger(self.__class__.__name__)
+        last_manifest = self.read(directory_path)
+        if last_manifest is None:
+            logger.info("no manifest of a previous run in %s", directory_path)
+            return False
+        for field in ("arguments", "code_version", "inputs"):
+            if getattr(last_manifest, field) != getattr(self, field):
+                logger.info("%s changed since the last run", field.replace("_", " "))
+                return False
+        if not last_manifest.outputs:
+            return False
+        for file_name, file_size in last_manifest.outputs.items():
+            file_path = directory_path / file_name
+            if not file_path.is_file() or file_path.stat().st_size != file_size:
+                logger.info("loaded file %s changed since the last run", file_path)
+                return False
+        return True
+
+    @classmethod
+    def read(cls, directory_path: Path) -> Optional["PipelineManifest"]:
+        try:
+            with open(directory_path / cls.FILE_NAME) as file_:
+                json_object = json.load(file_)
+        except FileNotFoundError:
+            return None
+        return cls(**{field: json_object[field] for field in cls._fields})
+
+    def write(self, directory_path: Path, *, exclude_file_names=()) -> None:
+        """
+        Write this manifest to the loaded data directory, with the sizes of the loaded files in it.
+
+        :param exclude_file_names: names of files in the directory that aren't loaded data, such as the run report
+        """
+        outputs = {
+            file_path.name: file_path.stat().st_size
+            for file_path in sorted(directory_path.iterdir())
+            if file_path.is_file() and file_path.name != self.FILE_NAME and file_path.name not in exclude_file_names
+        }
+        with open(directory_path / self.FILE_NAME, "w") as file_:
+            json.dump(self._replace(outputs=outputs)._asdict(), file_, indent=4)
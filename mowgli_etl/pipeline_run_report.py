@@ -0,0 +1,250 @@
+import json
+import logging
+import os
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Generator, Iterable, List, Optional
+
+
+def _read_process_io() -> Optional[Dict[str, int]]:
+    # Bytes read and written by this process, including through the page cache (Linux)
+    try:
+        with open("/proc/self/io") as io_file:
+            io = dict(line.split(":", 1) for line in io_file if ":" in line)
+        return {"read_bytes": int(io["rchar"]), "written_bytes": int(io["wchar"])}
+    except (OSError, KeyError, ValueError):
+        return None
+
+
+class StageStatistics:
+    """
+    Counters for one stage of the pipeline's generator chain.
+
+    The chain is nested: each stage pulls from the stage before it, so the time spent inside a stage's next() includes
+    the time spent in every upstream stage. The report subtracts the upstream stage's time to get the stage's own time.
+    """
+
+    def __init__(self, name: str):
+        self.io: Optional[Dict[str, int]] = None
+        self.name = name
+        self.model_counts: Dict[str, int] = {}
+        # False if the stage's time doesn't include the upstream stage's, e.g., because they ran in different threads.
+        # Extract runs before the chain, and transform or replay is the first stage of it, so they're never nested.
+        self.nested = name not in ("extract", "replay", "transform")
+        self.wall_time_s = 0.0
+
+    def as_dict(self, *, upstream: Optional["StageStatistics"] = None) -> Dict[str, object]:
+        self_time_s = self.wall_time_s - (upstream.wall_time_s if upstream is not None else 0.0)
+        model_count = sum(self.model_counts.values())
+        return {
+            "name": self.name,
+            "io": self.io,
+            "model_counts": dict(sorted(self.model_counts.items())),
+            "model_count": model_count,
+            "wall_time_s": self.wall_time_s,
+            "self_time_s": self_time_s,
+            "models_per_s": model_count / self.wall_time_s if self.wall_time_s > 0 else None,
+        }
+
+    def instrument(self, generator: Iterable, *, on_model=None) -> Generator:
+        """
+        Wrap a generator, counting the models it yields by type and timing its next() calls.
+
+        :param on_model: optional callable invoked with the running model count after every model
+        """
+        model_counts = self.model_counts
+        perf_counter = time.perf_counter
+        iterator = iter(generator)
+        model_count = 0
+        while True:
+            start = perf_counter()
+            try:
+                model = next(iterator)
+            except StopIteration:
+                self.wall_time_s += perf_counter() - start
+                return
+            except BaseException:
+                self.wall_time_s += perf_counter() - start
+                raise
+            self.wall_time_s += perf_counter() - start
+            model_type = model.__class__.__name__
+            try:
+                model_counts[model_type] += 1
+            except KeyError:
+                model_counts[model_type] = 1
+            model_count += 1
+            if on_model is not None:
+                on_model(model_count)
+            yield model
+
+    @contextmanager
+    def time(self):
+        """
+        Time a stage that isn't a generator, such as extract or load, and count the bytes read and written during it.
+        """
+        io_start = _read_process_io()
+        start = time.perf_counter()
+        try:
+            yield self
+        finally:
+            self.wall_time_s += time.perf_counter() - start
+            io_end = _read_process_io()
+            if io_start is not None and io_end is not None:
+                self.io = {key: io_end[key] - io_start[key] for key in io_end}
+
+
+class _InputProgress:
+    """
+    Estimate progress through the extracted input files from the offsets of this process's open file descriptors.
+
+    Only available on systems with /proc/self/fdinfo (Linux).
+    """
+
+    def __init__(self, file_paths: Iterable[Path]):
+        self.__file_sizes: Dict[str, int] = {}
+        for file_path in file_paths:
+            try:
+                self.__file_sizes[os.path.realpath(file_path)] = os.path.getsize(file_path)
+            except OSError:
+                continue
+        self.__max_offsets: Dict[str, int] = {}
+        self.available = bool(self.__file_sizes) and os.path.isdir("/proc/self/fdinfo")
+
+    def fraction(self) -> Optional[float]:
+        """
+        :return: fraction of the input bytes read so far, or None if unknown
+        """
+        if not self.available:
+            return None
+        try:
+            fds = os.listdir("/proc/self/fd")
+        except OSError:
+            return None
+        for fd in fds:
+            try:
+                file_path = os.readlink("/proc/self/fd/" + fd)
+                if file_path not in self.__file_sizes:
+                    continue
+                with open("/proc/self/fdinfo/" + fd) as fdinfo:
+                    for line in fdinfo:
+                        if line.startswith("pos:"):
+                            offset = int(line[4:])
+                            if offset > self.__max_offsets.get(file_path, 0):
+                                self.__max_offsets[file_path] = offset
+                            break
+            except (OSError, ValueError):
+                continue
+        total_size = sum(self.__file_sizes.values())
+        if total_size == 0:
+            return None
+        return min(1.0, sum(self.__max_offsets.values()) / total_size)
+
+    @property
+    def total_size(self) -> int:
+        return sum(self.__file_sizes.values())
+
+
+class PipelineRunReport:
+    """
+    Per-stage throughput and latency report for a pipeline run, written as JSON.
+
+    Stages are reported in generator chain order, from extract to load.
+    """
+
+    FILE_NAME = "run_report.json"
+
+    # Generator chain order. Stages not listed here go last.
+    STAGE_NAMES = ("extract", "replay", "transform", "whole_graph_check", "map", "load")
+
+    # Check the clock for a progress log line every this many models
+    __PROGRESS_CHECK_INTERVAL = 10000
+    __PROGRESS_LOG_INTERVAL_S = 30.0
+
+    def __init__(self, *, pipeline_id: str):
+        self._logger = logging.getLogger(self.__class__.__name__)
+        self.__input_progress: Optional[_InputProgress] = None
+        self.__io_start = _read_process_io()
+        self.__last_progress_log_time = time.perf_counter()
+        self.__pipeline_id = pipeline_id
+        self.__stages: List[StageStatistics] = []
+        self.__start_time = time.perf_counter()
+        self.__started_at = datetime.now().isoformat()
+        self.__succeeded = False
+
+    def as_dict(self) -> Dict[str, object]:
+        io_end = _read_process_io()
+        stages = []
+        upstream = None
+        for stage in sorted(self.__stages, key=self.__stage_sort_key):
+            stages.append(stage.as_dict(upstream=upstream if stage.nested else None))
+            upstream = stage
+        return {
+            "pipeline_id": self.__pipeline_id,
+            "started_at": self.__started_at,
+            "succeeded": self.__succeeded,
+            "wall_time_s": time.perf_counter() - self.__start_time,
+            "input_bytes": self.__input_progress.total_size if self.__input_progress is not None else None,
+            "io": {
+                key: io_end[key] - self.__io_start[key] for key in io_end
+            } if io_end is not None and self.__io_start is not None else None,
+            "stages": stages,
+        }
+
+    def instrument(self, name: str, generator: Iterable, *, log_progress: bool = False) -> Generator:
+        """
+        Instrument a generator stage.
+
+        :param log_progress: log progress and an ETA periodically as models pass through this stage
+        """
+        return self.stage(name).instrument(generator, on_model=self.__on_model if log_progress else None)
+
+    def __on_model(self, model_count: int) -> None:
+        if model_count % self.__PROGRESS_CHECK_INTERVAL != 0:
+            return
+        now = time.perf_counter()
+        if now - self.__last_progress_log_time < self.__PROGRESS_LOG_INTERVAL_S:
+            return
+        self.__last_progress_log_time = now
+        elapsed_s = now - self.__start_time
+        fraction = self.__input_progress.fraction() if self.__input_progress is not None else None
+        if fraction:
+            self._logger.info(
+                "%s: %d models, %.0f models/s, %.1f%% of input read, ETA %.0fs",
+                self.__pipeline_id, model_count, model_count / elapsed_s, fraction * 100.0,
+                elapsed_s * (1.0 - fraction) / fraction,
+            )
+        else:
+            self._logger.info("%s: %d models, %.0f models/s", self.__pipeline_id, model_count, model_count / elapsed_s)
+
+    def __stage_sort_key(self, stage: StageStatistics) -> int:
+        try:
+            return self.STAGE_NAMES.index(stage.name)
+        except ValueError:
+            return len(self.STAGE_NAMES)
+
+    def set_input_file_paths(self, file_paths: Iterable[Path]) -> None:
+        """
+        Set the extracted input files, whose read offsets are used to estimate progress.
+        """
+        self.__input_progress = _InputProgress(file_paths)
+
+    def set_succeeded(self) -> None:
+        self.__succeeded = True
+
+    def stage(self, name: str) -> StageStatistics:
+        """
+        Get or create the statistics for a stage.
+        """
+        for stage in self.__stages:
+            if stage.name == name:
+                return stage
+        stage = StageStatistics(name)
+        self.__stages.append(stage)
+        return stage
+
+    def write(self, file_path: Path) -> None:
+        with open(file_path, "w") as file_:
+            json.dump(self.as_dict(), file_, indent=4)
+        self._logger.info("wrote run report to %s", file_path)
@@ -4,10 +4,17 @@ from typing import Optional
 
 
 class PipelineStorage:
-    def __init__(self, *, pipeline_id: str, root_data_dir_path: Path, extracted_data_dir_path: Optional[Path] = None, loaded_data_dir_path: Optional[Path] = None):
+    def __init__(self, *, pipeline_id: str, root_data_dir_path: Path, extracted_data_dir_path: Optional[Path] = None, loaded_data_dir_path: Optional[Path] = None, stream_extracted_files: bool = False):
+        """
+        :param stream_extracted_files: have extractors return VirtualExtractedFile's that read compressed sources
+        directly instead of decompressing them to the extracted data directory
+        """
         self.__root_data_dir_path = root_data_dir_path
         pipeline_data_dir_path = root_data_dir_path / Path(pipeline_id)
 
+        self.__checkpoint_data_dir_path = pipeline_data_dir_path / "checkpoint"
+        self.__checkpoint_data_dir_path_exists = False
+
         if extracted_data_dir_path is None:
             extracted_data_dir_path = pipeline_data_dir_path / "extracted"
         self.__extracted_data_dir_path = extracted_data_dir_path
@@ -17,13 +24,24 @@ class PipelineStorage:
             loaded_data_dir_path = pipeline_data_dir_path / "loaded"
         self.__loaded_data_dir_path = loaded_data_dir_path
         self.__loaded_data_dir_path_exists = False
-        # self.__transformed_data_dir_path = self.__makedirs(pipeline_data_dir_path / "transformed")
+
+        self.__stream_extracted_files = stream_extracted_files
+
+        self.__transformed_data_dir_path = pipeline_data_dir_path / "transformed"
+        self.__transformed_data_dir_path_exists = False
 
     def __makedirs(self, dir_path: Path) -> Path:
         if not os.path.isdir(dir_path):
             os.makedirs(dir_path)
         return dir_path
 
+    @property
+    def checkpoint_data_dir_path(self) -> Path:
+        if not self.__checkpoint_data_dir_path_exists:
+            self.__makedirs(self.__checkpoint_data_dir_path)
+            self.__checkpoint_data_dir_path_exists = True
+        return self.__checkpoint_data_dir_path
+
     @property
     def extracted_data_dir_path(self) -> Path:
         if not self.__extracted_data_dir_path_exists:
@@ -42,6 +60,13 @@ class PipelineStorage:
     def root_data_dir_path(self) -> Path:
         return self.__root_data_dir_path
 
-    # @property
-    # def transformed_data_dir_path(self) -> Path:
-    #     return self.__transformed_data_dir_path
+    @property
+    def stream_extracted_files(self) -> bool:
+        return self.__stream_extracted_files
+
+    @property
+    def transformed_data_dir_path(self) -> Path:
+        if not self.__transformed_data_dir_path_exists:
+            self.__makedirs(self.__transformed_data_dir_path)
+            self.__transformed_data_dir_path_exists = True
+        return self.__transformed_data_dir_path
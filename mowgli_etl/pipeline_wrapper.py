@@ -1,4 +1,5 @@
 import logging
+from pathlib import Path
 from typing import Generator, Union, Dict, Optional, Tuple
 
 from mowgli_etl.model.kg_edge import KgEdge
@@ -6,24 +7,32 @@ from mowgli_etl.model.model import Model
 from mowgli_etl.model.kg_node import KgNode
 from mowgli_etl._mapper import _Mapper
 from mowgli_etl._pipeline import _Pipeline
+from mowgli_etl.bounded_handoff import BoundedHandoff
 from mowgli_etl.model.kg_path import KgPath
+from mowgli_etl.pipeline_checkpoint import PipelineCheckpoint
+from mowgli_etl.pipeline_manifest import PipelineManifest
+from mowgli_etl.pipeline_run_report import PipelineRunReport
 from mowgli_etl.pipeline_storage import PipelineStorage
-from mowgli_etl.storage._kg_edge_set import _KgEdgeSet
-from mowgli_etl.storage._id_set import _IdSet
-from mowgli_etl.storage._kg_node_set import _KgNodeSet
+from mowgli_etl.storage.model_stream_file import ModelStreamFile
+from mowgli_etl.virtual_extracted_file import VirtualExtractedFile
+from mowgli_etl.whole_graph_check._whole_graph_checker import _WholeGraphChecker
+from mowgli_etl.whole_graph_check.bloom_filter_whole_graph_checker import BloomFilterWholeGraphChecker
+from mowgli_etl.whole_graph_check.external_sort_whole_graph_checker import ExternalSortWholeGraphChecker
+from mowgli_etl.whole_graph_check.sharded_whole_graph_checker import ShardedWholeGraphChecker
+from mowgli_etl.whole_graph_check.whole_graph_checker import WholeGraphChecker
 import stringcase
 
 try:
-    from mowgli_etl.storage.persistent_kg_edge_set import PersistentKgEdgeSet as EdgeSet
-    from mowgli_etl.storage.persistent_id_set import PersistentIdSet as NodeIdSet
-    from mowgli_etl.storage.persistent_kg_node_set import PersistentKgNodeSet as NodeSet
+    from mowgli_etl.whole_graph_check.fingerprint_whole_graph_checker import FingerprintWholeGraphChecker
 except ImportError:
-    from mowgli_etl.storage.mem_kg_edge_set import MemKgEdgeSet as EdgeSet
-    from mowgli_etl.storage.mem_id_set import MemIdSet as NodeIdSet
-    from mowgli_etl.storage.mem_kg_node_set import MemKgNodeSet as NodeSet
+    FingerprintWholeGraphChecker = None
 
 
 class PipelineWrapper:
+    __CHECK_BATCH_SIZE = 10000
+    DEFAULT_CHECKPOINT_INTERVAL = 100000
+    TRANSFORM_OUTPUT_FILE_NAME = "models.bin"
+
     def __init__(self, pipeline: _Pipeline, storage: PipelineStorage):
         self._logger = logging.getLogger(self.__class__.__name__)
         self.__pipeline = pipeline
@@ -52,19 +61,23 @@ class PipelineWrapper:
                     yield from mapper.map(node)
 
     def load(self, model_generator: Generator[Model, None, None]) -> None:
-        load_method_cache = {}
         with self.__pipeline.loader.open(storage=self.__storage) as loader:
-            for model in model_generator:
-                try:
-                    load_method = load_method_cache[model.__class__.__name__]
-                except KeyError:
-                    load_method_name = "load_" + stringcase.snakecase(
-                        model.__class__.__name__
-                    )
-                    load_method = getattr(loader, load_method_name)
-                    load_method_cache[model.__class__.__name__] = load_method
+            self.__load_into(loader, model_generator)
 
-                load_method(model)
+    @staticmethod
+    def __load_into(loader, model_generator: Generator[Model, None, None]) -> None:
+        load_method_cache = {}
+        for model in model_generator:
+            try:
+                load_method = load_method_cache[model.__class__.__name__]
+            except KeyError:
+                load_method_name = "load_" + stringcase.snakecase(
+                    model.__class__.__name__
+                )
+                load_method = getattr(loader, load_method_name)
+                load_method_cache[model.__class__.__name__] = load_method
+
+            load_method(model)
 
     def run(
         self,
@@ -72,90 +85,414 @@ class PipelineWrapper:
         force: bool = False,
         mappers: Tuple[_Mapper, ...] = (),
         skip_whole_graph_check: Optional[bool] = False,
+        check_workers: Optional[int] = None,
+        whole_graph_check: Optional[str] = None,
+        pipelined: bool = False,
+        handoff_batch_size: int = 1000,
+        handoff_queue_depth: int = 8,
+        checkpoint_interval: Optional[int] = None,
+        resume: bool = False,
+        incremental: bool = False,
+        pipeline_arguments: Optional[Dict[str, object]] = None,
+        spill_transform_output: bool = False,
+        replay_transform_output: bool = False,
     ):
         """
         Run the entire pipeline.
+
+        Writes a per-stage PipelineRunReport to the loaded data directory, even if the run fails.
+
+        :param pipelined: run the transform, whole graph check, and map stages in a producer thread and the loader in this
+        thread, linked by a bounded queue of model batches, so that parsing continues while the loader writes. The loaded
+        output is identical to the serial mode's.
+        :param handoff_batch_size: number of models per batch in pipelined mode
+        :param handoff_queue_depth: maximum number of batches waiting for the loader in pipelined mode
+        :param checkpoint_interval: if specified, checkpoint the run every this many transformed models: persist the
+        whole graph checker's sets, the loader's output offsets, and the transformer's position to the pipeline's
+        checkpoint directory. Only supported with the exact whole graph check and loaders that implement checkpoint.
+        :param resume: continue from the last checkpoint of a failed checkpointed run, truncating output written after
+        it. Implies checkpointing, every DEFAULT_CHECKPOINT_INTERVAL models unless checkpoint_interval is specified.
+        :param incremental: skip the transform and load if the extracted inputs, the pipeline code, and the arguments
+        haven't changed since the last successful incremental run, per the PipelineManifest in the loaded data directory
+        :param pipeline_arguments: arguments the pipeline was constructed with, recorded in the manifest
+        :param spill_transform_output: write the checked transform output to a ModelStreamFile in the transformed data
+        directory, for later runs to replay
+        :param replay_transform_output: skip the extract, transform, and whole graph check, and replay the models spilled
+        by a previous run into the map and load stages instead
         """
-        extract_kwds = self.extract(force=force)
-        model_generator = self.transform(
-            force=force, skip_whole_graph_check=skip_whole_graph_check, **extract_kwds
-        )
+        if resume and checkpoint_interval is None:
+            checkpoint_interval = self.DEFAULT_CHECKPOINT_INTERVAL
+        if checkpoint_interval is not None:
+            if checkpoint_interval < 1:
+                raise ValueError("checkpoint_interval must be >= 1")
+            if pipelined or check_workers or whole_graph_check not in (None, "exact"):
+                raise ValueError("checkpointing requires a serial run with the exact whole graph check")
+            if spill_transform_output or replay_transform_output:
+                raise ValueError("checkpointing can't be combined with spilling or replaying the transform output")
+        transform_output_file = ModelStreamFile(
+            self.__storage.transformed_data_dir_path / self.TRANSFORM_OUTPUT_FILE_NAME
+        ) if spill_transform_output or replay_transform_output else None
+
+        run_report = PipelineRunReport(pipeline_id=self.id)
+        try:
+            if replay_transform_output:
+                if not transform_output_file.exists():
+                    raise FileNotFoundError(f"no transform output to replay: {transform_output_file.file_path}")
+                # The spilled models are the input
+                extract_kwds = {"transform_output_file_path": transform_output_file.file_path}
+            else:
+                with run_report.stage("extract").time():
+                    extract_kwds = self.extract(force=force)
+            run_report.set_input_file_paths(
+                value.compressed_file_path if isinstance(value, VirtualExtractedFile) else value
+                for value in extract_kwds.values()
+                if isinstance(value, (Path, VirtualExtractedFile))
+            )
+            manifest = None
+            if incremental:
+                manifest = PipelineManifest.create(
+                    arguments=self.__manifest_arguments(
+                        mappers=mappers,
+                        pipeline_arguments=pipeline_arguments,
+                        skip_whole_graph_check=skip_whole_graph_check,
+                    ),
+                    extract_kwds=extract_kwds,
+                    pipeline=self.__pipeline,
+                )
+                if manifest.is_up_to_date(self.__storage.loaded_data_dir_path):
+                    self._logger.info(
+                        "%s: inputs, code, and arguments unchanged since the last successful run, skipping transform and load",
+                        self.id
+                    )
+                    run_report.set_succeeded()
+                    return
+                # Don't leave a manifest that vouches for partially overwritten loaded data
+                PipelineManifest.delete(self.__storage.loaded_data_dir_path)
+            if checkpoint_interval is not None:
+                self.__run_checkpointed(
+                    checkpoint_interval=checkpoint_interval,
+                    extract_kwds=extract_kwds,
+                    mappers=mappers,
+                    resume=resume,
+                    run_report=run_report,
+                    skip_whole_graph_check=skip_whole_graph_check,
+                )
+            else:
+                self.__run_uncheckpointed(
+                    check_workers=check_workers,
+                    extract_kwds=extract_kwds,
+                    force=force,
+                    handoff_batch_size=handoff_batch_size,
+                    handoff_queue_depth=handoff_queue_depth,
+                    mappers=mappers,
+                    pipelined=pipelined,
+                    replay_transform_output=replay_transform_output,
+                    run_report=run_report,
+                    skip_whole_graph_check=skip_whole_graph_check,
+                    spill_transform_output=spill_transform_output,
+                    transform_output_file=transform_output_file,
+                    whole_graph_check=whole_graph_check,
+                )
+            if manifest is not None:
+                manifest.write(self.__storage.loaded_data_dir_path, exclude_file_names=(PipelineRunReport.FILE_NAME,))
+            run_report.set_succeeded()
+        finally:
+            run_report.write(self.__storage.loaded_data_dir_path / PipelineRunReport.FILE_NAME)
+
+    def __manifest_arguments(
+        self,
+        *,
+        mappers: Tuple[_Mapper, ...],
+        pipeline_arguments: Optional[Dict[str, object]],
+        skip_whole_graph_check: Optional[bool],
+    ) -> Dict[str, object]:
+        arguments = {
+            "id": self.id,
+            "loader": self.__pipeline.loader.__class__.__name__,
+            "mappers": tuple(mapper.__class__.__name__ for mapper in mappers),
+            "skip_whole_graph_check": bool(skip_whole_graph_check),
+        }
+        if pipeline_arguments is not None:
+            arguments.update(("pipeline." + key, value) for key, value in pipeline_arguments.items())
+        return arguments
+
+    def __run_uncheckpointed(
+        self,
+        *,
+        check_workers: Optional[int],
+        extract_kwds: Dict[str, object],
+        force: bool,
+        handoff_batch_size: int,
+        handoff_queue_depth: int,
+        mappers: Tuple[_Mapper, ...],
+        pipelined: bool,
+        replay_transform_output: bool,
+        run_report: PipelineRunReport,
+        skip_whole_graph_check: Optional[bool],
+        spill_transform_output: bool,
+        transform_output_file: Optional[ModelStreamFile],
+        whole_graph_check: Optional[str],
+    ) -> None:
+        if replay_transform_output:
+            self._logger.info("replaying transform output from %s", transform_output_file.file_path)
+            model_generator = run_report.instrument("replay", transform_output_file.read(), log_progress=True)
+        else:
+            model_generator = self.transform(
+                force=force,
+                skip_whole_graph_check=skip_whole_graph_check,
+                check_workers=check_workers,
+                whole_graph_check=whole_graph_check,
+                run_report=run_report,
+                **extract_kwds
+            )
+            if spill_transform_output:
+                model_generator = transform_output_file.write(model_generator)
         if mappers:
-            model_generator = self.map(model_generator, mappers)
-        self.load(model_generator)
+            model_generator = run_report.instrument("map", self.map(model_generator, mappers))
+        if pipelined:
+            self._logger.info("running the loader in a separate thread from the rest of the pipeline")
+            # The load stage no longer includes the time spent in the upstream stages
+            run_report.stage("load").nested = False
+            with run_report.stage("load").time(), \
+                    BoundedHandoff(model_generator, batch_size=handoff_batch_size, queue_depth=handoff_queue_depth) as handoff:
+                self.load(iter(handoff))
+        else:
+            with run_report.stage("load").time():
+                self.load(model_generator)
+
+    def __run_checkpointed(
+        self,
+        *,
+        checkpoint_interval: int,
+        extract_kwds: Dict[str, object],
+        mappers: Tuple[_Mapper, ...],
+        resume: bool,
+        run_report: PipelineRunReport,
+        skip_whole_graph_check: Optional[bool],
+    ) -> None:
+        checkpoint_dir_path = self.__storage.checkpoint_data_dir_path
+        checkpoint = None
+        if resume:
+            checkpoint = PipelineCheckpoint.read(checkpoint_dir_path)
+            if checkpoint is None:
+                self._logger.info("no checkpoint to resume from in %s, starting from the beginning", checkpoint_dir_path)
+        if checkpoint is None:
+            PipelineCheckpoint.clear(checkpoint_dir_path)
+        else:
+            self._logger.info("resuming from checkpoint after %d transformed models", checkpoint.model_count)
+
+        loader = self.__pipeline.loader
+        loader.open_checkpointed(self.__storage, checkpoint.loader_state if checkpoint is not None else None)
+        with loader:
+            # Checkpoints' generations are their model counts. Opening the checker rolls back its sets to the last
+            # committed checkpoint.
+            checker = WholeGraphChecker.checkpointed(
+                checkpoint_dir_path / "whole_graph_check",
+                committed_generation=checkpoint.model_count if checkpoint is not None else None
+            ) if not skip_whole_graph_check else None
+
+            def take_checkpoint(model_count: int) -> None:
+                # Replacing the checkpoint file commits the checkpoint. Until then the checker's flush is undone on
+                # resume, so a crash in between leaves nothing ahead of the last committed checkpoint but loader output,
+                # which is truncated to its offsets, and loader node sets, which only ever have nodes added if absent.
+                loader_state = loader.checkpoint()
+                if checker is not None:
+                    checker.flush(generation=model_count)
+                PipelineCheckpoint(model_count=model_count, loader_state=loader_state).write(checkpoint_dir_path)
+
+            try:
+                model_generator = self.__checkpointing(
+                    checkpoint=take_checkpoint,
+                    checkpoint_interval=checkpoint_interval,
+                    skip_model_count=checkpoint.model_count if checkpoint is not None else 0,
+                    transform_generator=self.__pipeline.transformer.transform(**extract_kwds),
+                )
+                model_generator = run_report.instrument("transform", model_generator, log_progress=skip_whole_graph_check)
+                if checker is not None:
+                    model_generator = run_report.instrument(
+                        "whole_graph_check",
+                        self.__transform(checker=checker, transform_generator=model_generator),
+                        log_progress=True
+                    )
+                if mappers:
+                    model_generator = run_report.instrument("map", self.map(model_generator, mappers))
+                with run_report.stage("load").time():
+                    self.__load_into(loader, model_generator)
+            finally:
+                if checker is not None:
+                    checker.close()
+
+        PipelineCheckpoint.clear(checkpoint_dir_path)
+
+    def __checkpointing(
+        self,
+        *,
+        checkpoint,
+        checkpoint_interval: int,
+        skip_model_count: int,
+        transform_generator: Generator[Model, None, None],
+    ) -> Generator[Model, None, None]:
+        """
+        Skip the models before a checkpoint, then yield the rest and take a checkpoint every checkpoint_interval models.
+
+        The generator chain is serial, so when the next model is requested, everything derived from the previous models
+        has been checked, mapped, and loaded.
+        """
+        model_count = 0
+        for model in transform_generator:
+            model_count += 1
+            if model_count <= skip_model_count:
+                continue
+            yield model
+            if model_count % checkpoint_interval == 0:
+                checkpoint(model_count)
+        if model_count < skip_model_count:
+            raise ValueError(
+                f"transformer yielded {model_count} models, fewer than the {skip_model_count} in the checkpoint"
+            )
+        # Checkpoint before the end of graph checks, which flush the checker
+        checkpoint(model_count)
 
     def transform(
         self,
         force: bool = False,
         skip_whole_graph_check: Optional[bool] = False,
+        check_workers: Optional[int] = None,
+        whole_graph_check: Optional[str] = None,
+        run_report: Optional[PipelineRunReport] = None,
         **extract_kwds,
     ) -> Generator[Model, None, None]:
+        """
+        Transform extracted data into models, checking the whole graph along the way.
+
+        :param check_workers: if > 0, check the whole graph in this many worker processes, each owning a hash-partitioned shard of the graph
+        :param whole_graph_check: whole graph check implementation: "exact" (default), "fingerprint", "external_sort", or "bloom_filter"
+        :param run_report: if specified, instrument the transform and whole graph check stages in this report
+        """
         transform_generator = self.__pipeline.transformer.transform(**extract_kwds)
+        if run_report is not None:
+            transform_generator = run_report.instrument("transform", transform_generator, log_progress=skip_whole_graph_check)
 
         if skip_whole_graph_check:
             self._logger.info("skipping whole graph checking during transform")
             yield from transform_generator
             return
 
-        with EdgeSet.temporary() as edge_set:
-            with NodeSet.temporary() as node_set:
-                with NodeIdSet.temporary() as used_node_ids_set:
-                    yield from self.__transform(
-                        edge_set=edge_set,
-                        node_set=node_set,
-                        transform_generator=transform_generator,
-                        used_node_ids_set=used_node_ids_set,
-                    )
+        checked_generator = self.__check_whole_graph(
+            check_workers=check_workers,
+            transform_generator=transform_generator,
+            whole_graph_check=whole_graph_check,
+        )
+        if run_report is not None:
+            checked_generator = run_report.instrument("whole_graph_check", checked_generator, log_progress=True)
+        yield from checked_generator
+
+    def __check_whole_graph(
+        self,
+        *,
+        check_workers: Optional[int],
+        transform_generator: Generator[Model, None, None],
+        whole_graph_check: Optional[str],
+    ) -> Generator[Model, None, None]:
+        if check_workers:
+            if whole_graph_check not in (None, "exact"):
+                raise ValueError(f"{whole_graph_check} whole graph check can't use check workers")
+            self._logger.info("checking whole graph in %d worker processes", check_workers)
+            with ShardedWholeGraphChecker(worker_count=check_workers) as checker:
+                yield from self.__sharded_transform(
+                    checker=checker,
+                    transform_generator=transform_generator,
+                )
+            return
+
+        with self.__create_whole_graph_checker(whole_graph_check) as checker:
+            yield from self.__transform(
+                checker=checker,
+                transform_generator=transform_generator,
+            )
+
+    def __check_single_source(self, model: Model) -> None:
+        try:
+            if self.__pipeline.single_source and model.source != self.__pipeline.id:
+                raise ValueError(
+                    f"pipeline can only yield one datasource, the same as the pipeline id: expected={self.id}, actual={model.datasource}"
+                )
+        except AttributeError:
+            pass
+
+    def __create_whole_graph_checker(self, whole_graph_check: Optional[str]) -> _WholeGraphChecker:
+        if whole_graph_check is None:
+            whole_graph_check = "exact"
+        else:
+            whole_graph_check = whole_graph_check.lower()
+
+        if whole_graph_check == "exact":
+            return WholeGraphChecker.temporary()
+        elif whole_graph_check == "external_sort":
+            self._logger.info("checking whole graph with an external sort, violations will be reported at the end of the transform")
+            return ExternalSortWholeGraphChecker()
+        elif whole_graph_check == "fingerprint":
+            if FingerprintWholeGraphChecker is None:
+                # Not a ValueError, which would look like a graph violation
+                raise ModuleNotFoundError("fingerprint whole graph check requires plyvel", name="plyvel")
+            return FingerprintWholeGraphChecker()
+        elif whole_graph_check == "bloom_filter":
+            self._logger.info("checking whole graph with Bloom filters, violations will be reported at the end of the transform")
+            return BloomFilterWholeGraphChecker()
+        else:
+            raise NotImplementedError(whole_graph_check)
+
+    def __sharded_transform(
+        self,
+        *,
+        checker: ShardedWholeGraphChecker,
+        transform_generator: Generator[Model, None, None],
+    ) -> Generator[Model, None, None]:
+        # Read the next batch from the transformer while the workers check the previous one.
+        # Exceptions from the transformer are deferred until the models that preceded them have been checked and yielded.
+        deferred_exception = None
+        pending_batch = None
+        transform_exhausted = False
+        while not transform_exhausted:
+            batch = []
+            try:
+                for model in transform_generator:
+                    self.__check_single_source(model)
+                    batch.append(model)
+                    if len(batch) == self.__CHECK_BATCH_SIZE:
+                        break
+                else:
+                    transform_exhausted = True
+            except Exception as e:
+                deferred_exception = e
+                transform_exhausted = True
+
+            if batch:
+                checker.submit(batch)
+            if pending_batch is not None:
+                yield from checker.collect(pending_batch)
+            pending_batch = batch if batch else None
+        if pending_batch is not None:
+            yield from checker.collect(pending_batch)
+        if deferred_exception is not None:
+            raise deferred_exception
+        checker.check_complete_graph()
 
     def __transform(
         self,
         *,
-        edge_set: _KgEdgeSet,
-        node_set: _KgNodeSet,
+        checker: _WholeGraphChecker,
         transform_generator: Generator[Model, None, None],
-        used_node_ids_set: _IdSet,
     ) -> Generator[Model, None, None]:
         for model in transform_generator:
-            try:
-                if self.__pipeline.single_source and model.source != self.__pipeline.id:
-                    raise ValueError(
-                        f"pipeline can only yield one datasource, the same as the pipeline id: expected={self.id}, actual={model.datasource}"
-                    )
-            except AttributeError:
-                pass
+            self.__check_single_source(model)
 
             if isinstance(model, KgNode):
-                node = model
-                # KgNode ID's should be unique in the CSKG.
-                existing_node = node_set.get(node.id)
-                if existing_node is not None:
-                    if existing_node == node:
-                        # Common case: ignore exact duplicate nodes i.e., nodes that are the same in all fields.
-                        # This happens frequently in the word association sources, where the same word can come
-                        # up as a response to multiple cues.
-                        continue
-                    else:
-                        # Throw an exception if two nodes have the same id but aren't the same in all of their fields
-                        raise ValueError(
-                            "nodes with same id, different contents: original=%s, duplicate=%s"
-                            % (existing_node, node)
-                        )
-                else:
-                    node_set.add(node)
+                if not checker.check_kg_node(model):
+                    continue
             elif isinstance(model, KgEdge):
                 edge = model
-                # Edges should be unique in the CSKG, meaning that the tuple of (subject, predicate, object) should be unique.
-                existing_edge = edge_set.get(edge.id)
-                if existing_edge is not None:
-                    # Don't try to handle the exact duplicate case differently. It should never happen.
-                    raise ValueError(
-                        "duplicate edge: original=%s, duplicate=%s"
-                        % (existing_edge, edge)
-                    )
-                edge_set.add(edge)
-                used_node_ids_set.add(edge.subject)
-                used_node_ids_set.add(edge.object)
+                checker.check_kg_edge(edge)
+                checker.add_used_node_ids((edge.subject, edge.object))
             yield model
-        for node_id in node_set.keys():
-            if node_id not in used_node_ids_set:
-                raise ValueError("node %s not used by an edge" % node_id)
+        checker.check_complete_graph()
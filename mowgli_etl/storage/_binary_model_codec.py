@@ -0,0 +1,108 @@
+import struct
+from typing import Dict, List, Optional, Tuple
+
+from mowgli_etl.storage._value_codec import _ValueCodec
+
+
+class _BinaryModelCodec(_ValueCodec):
+    """
+    Abstract base class for compact binary model codecs.
+
+    A record is a fixed header followed by a table of string lengths and the UTF-8 encoded strings:
+
+    version (u8) | flags (u8) | count 1 (u16 or u32) | count 2 (u16 or u32) | string lengths (u16 or u32 each) | strings | trailer
+
+    Subclasses define what the strings, counts, and flags mean. The lengths are u32 if the WIDE_LENGTHS flag is set,
+    which is only necessary for strings longer than 65535 bytes. Likewise the counts are u32 if the WIDE_COUNTS flag is
+    set, which is only necessary for more than 65535 strings of a kind.
+    """
+
+    VERSION = 1
+
+    _HEADER = struct.Struct("<BBHH")
+    _WIDE_COUNTS = 0x40
+    _WIDE_HEADER = struct.Struct("<BBII")
+    _WIDE_LENGTHS = 0x80
+
+    # string count -> Struct of the lengths table
+    __NARROW_LENGTHS_STRUCTS: Dict[int, struct.Struct] = {}
+    __WIDE_LENGTHS_STRUCTS: Dict[int, struct.Struct] = {}
+
+    @classmethod
+    def __lengths_struct(cls, *, string_count: int, wide: bool) -> struct.Struct:
+        structs = cls.__WIDE_LENGTHS_STRUCTS if wide else cls.__NARROW_LENGTHS_STRUCTS
+        try:
+            return structs[string_count]
+        except KeyError:
+            lengths_struct = structs[string_count] = struct.Struct("<%d%s" % (string_count, "I" if wide else "H"))
+            return lengths_struct
+
+    def _pack(self, *, counts: Tuple[int, int], flags: int, strings: List[str], trailer: bytes = b"") -> bytes:
+        # Encode the strings in one call. If they're all ASCII the character lengths are the byte lengths.
+        joined_strings = "".join(strings)
+        encoded_strings = joined_strings.encode("utf-8")
+        if len(encoded_strings) == len(joined_strings):
+            lengths = [len(string) for string in strings]
+        else:
+            lengths = [len(string.encode("utf-8")) for string in strings]
+        wide = bool(lengths) and max(lengths) > 0xFFFF
+        if wide:
+            flags |= self._WIDE_LENGTHS
+        if max(counts) > 0xFFFF:
+            flags |= self._WIDE_COUNTS
+            header = self._WIDE_HEADER
+        else:
+            header = self._HEADER
+        return b"".join((
+            header.pack(self.VERSION, flags, *counts),
+            self.__lengths_struct(string_count=len(lengths), wide=wide).pack(*lengths),
+            encoded_strings,
+            trailer,
+        ))
+
+    def _unpack_header(self, data: bytes) -> Tuple[int, int, int]:
+        """
+        :return: (flags, count 1, count 2)
+        """
+        version, flags, count1, count2 = self._HEADER.unpack_from(data)
+        if version != self.VERSION:
+            raise ValueError("unsupported %s version %d" % (self.__class__.__name__, version))
+        if flags & self._WIDE_COUNTS:
+            _, _, count1, count2 = self._WIDE_HEADER.unpack_from(data)
+        return flags, count1, count2
+
+    def _unpack_strings(self, data: bytes, flags: int, string_count: int, first: int = 0, stop: Optional[int] = None) -> List[str]:
+        """
+        Decode strings [first, stop) of a record. Positional arguments only, this is the hot path.
+        """
+        try:
+            if flags & self._WIDE_LENGTHS:
+                lengths_struct = self.__WIDE_LENGTHS_STRUCTS[string_count]
+            else:
+                lengths_struct = self.__NARROW_LENGTHS_STRUCTS[string_count]
+        except KeyError:
+            lengths_struct = self.__lengths_struct(string_count=string_count, wide=bool(flags & self._WIDE_LENGTHS))
+        header_size = self._WIDE_HEADER.size if flags & self._WIDE_COUNTS else self._HEADER.size
+        lengths = lengths_struct.unpack_from(data, header_size)
+        offset = header_size + lengths_struct.size
+        if first or stop is not None:
+            offset += sum(lengths[:first])
+            lengths = lengths[first:stop]
+
+        stop_offset = offset + sum(lengths)
+        # Decode the strings in one call. If they're all ASCII, slice the decoded text instead of the bytes.
+        text = data[offset:stop_offset].decode("utf-8")
+        if len(text) != stop_offset - offset:
+            strings = []
+            for length in lengths:
+                strings.append(data[offset:offset + length].decode("utf-8"))
+                offset += length
+            return strings
+
+        strings = []
+        offset = 0
+        for length in lengths:
+            end = offset + length
+            strings.append(text[offset:end])
+            offset = end
+        return strings
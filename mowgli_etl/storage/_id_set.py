@@ -1,4 +1,5 @@
 from abc import ABC, abstractmethod
+from typing import Iterable
 
 from mowgli_etl._closeable import _Closeable
 
@@ -10,12 +11,24 @@ class _IdSet(_Closeable):
         Add a id to the set.
         """
 
+    def add_many(self, ids: Iterable[str]) -> None:
+        """
+        Add multiple id's to the set.
+        """
+        for id in ids:
+            self.add(id)
+
     @abstractmethod
     def __contains__(self, id: str) -> bool:
         """
         Test whether the given id is part of the set.
         """
 
+    def flush(self) -> None:
+        """
+        Write buffered additions to the underlying storage, if the implementation buffers them.
+        """
+
     @classmethod
     @abstractmethod
     def temporary(cls):
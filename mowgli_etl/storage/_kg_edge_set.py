@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import Optional
+from typing import Iterable, Optional
 
 from mowgli_etl._closeable import _Closeable
 from mowgli_etl.model.kg_edge import KgEdge
@@ -16,9 +16,21 @@ class _KgEdgeSet(_Closeable):
         Add an edge to the set.
         """
 
+    def add_many(self, edges: Iterable[KgEdge]) -> None:
+        """
+        Add multiple edges to the set.
+        """
+        for edge in edges:
+            self.add(edge)
+
     def __contains__(self, edge: KgEdge) -> bool:
         return self.get(edge.id) is not None
 
+    def flush(self) -> None:
+        """
+        Write buffered additions to the underlying storage, if the implementation buffers them.
+        """
+
     @abstractmethod
     def get(self, edge_id: str, default: Optional[KgEdge] = None) -> Optional[KgEdge]:
         """
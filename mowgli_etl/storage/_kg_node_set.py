@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import Optional, Generator
+from typing import Optional, Generator, Iterable, Tuple
 
 from mowgli_etl._closeable import _Closeable
 from mowgli_etl.model.kg_node import KgNode
@@ -11,6 +11,13 @@ class _KgNodeSet(_Closeable):
         Add a node to the set.
         """
 
+    def add_many(self, nodes: Iterable[KgNode]) -> None:
+        """
+        Add multiple nodes to the set.
+        """
+        for node in nodes:
+            self.add(node)
+
     def __contains__(self, node_id):
         return self.get(node_id) is not None
 
@@ -20,6 +27,11 @@ class _KgNodeSet(_Closeable):
         Delete a node from the set by id.
         """
 
+    def flush(self) -> None:
+        """
+        Write buffered additions and deletions to the underlying storage, if the implementation buffers them.
+        """
+
     @abstractmethod
     def get(self, node_id: str, default: Optional[KgNode] = None) -> Optional[KgNode]:
         """
@@ -27,6 +39,15 @@ class _KgNodeSet(_Closeable):
         :return: the node corresponding to the id if the former is in the set, otherwise None
         """
 
+    def get_labels(self, node_id: str, default: Optional[Tuple[str, ...]] = None) -> Optional[Tuple[str, ...]]:
+        """
+        Get the labels of a node by id from the set.
+        Implementations may override this to avoid constructing the whole node.
+        :return: the labels of the node corresponding to the id if the former is in the set, otherwise None
+        """
+        node = self.get(node_id)
+        return node.labels if node is not None else default
+
     @abstractmethod
     def keys(self) -> Generator[str, None, None]:
         """
@@ -0,0 +1,19 @@
+from abc import ABC, abstractmethod
+
+
+class _ValueCodec(ABC):
+    """
+    Abstract base class for codecs that convert the values stored in persistent sets to and from bytes.
+    """
+
+    @abstractmethod
+    def decode(self, data: bytes):
+        """
+        Decode a value from bytes produced by encode.
+        """
+
+    @abstractmethod
+    def encode(self, value) -> bytes:
+        """
+        Encode a value to bytes.
+        """
@@ -0,0 +1,198 @@
+import math
+import random
+import struct
+from functools import lru_cache
+from hashlib import blake2b
+from typing import Dict, Tuple
+
+import numpy as np
+
+
+class _BloomFilterSlice:
+    """
+    Blocked Bloom filter: each string sets a few bits in each of words_per_key 64-bit words instead of bits spread
+    over the whole array, so adding or testing a string costs a few word operations rather than one operation per bit.
+    The bits a string sets in a word are one of a table of precomputed random masks.
+
+    Blocking needs more bits per string than a classic Bloom filter for the same false positive rate, because some words
+    get more strings than others. The slice is sized for its error rate with that taken into account.
+    """
+
+    __slots__ = ("capacity", "count", "error_rate", "masks", "word_count", "words", "words_per_key")
+
+    MAX_WORDS_PER_KEY = 8
+
+    __MASK_COUNT = 4096
+    __MASK_INDEX_SHIFT = 64 - 12
+    __MAX_BITS_PER_KEY = 10000
+    __MAX_BITS_PER_WORD = 16
+    # Each word per key costs time, so trade some bits for fewer words
+    __MAX_EXTRA_BITS_PER_KEY_FACTOR = 1.25
+    __MIN_WORD_COUNT = 16
+    # bits per word -> masks
+    __masks: Dict[int, Tuple[int, ...]] = {}
+
+    def __init__(self, *, capacity: int, error_rate: float):
+        words_per_key, bits_per_word, bits_per_key = self.__size(error_rate)
+        self.capacity = capacity
+        self.count = 0
+        self.error_rate = error_rate
+        self.masks = self.__get_masks(bits_per_word)
+        self.word_count = max(self.__MIN_WORD_COUNT, int(math.ceil(capacity * bits_per_key / 64)))
+        # Index the numpy array through a memoryview, which is much faster than numpy scalar indexing.
+        self.words = memoryview(np.zeros(self.word_count, dtype=np.uint64))
+        self.words_per_key = words_per_key
+
+    def add(self, hashes: Tuple[int, ...]) -> None:
+        masks = self.masks
+        mask_index_shift = self.__MASK_INDEX_SHIFT
+        word_count = self.word_count
+        words = self.words
+        for hash_ in hashes[:self.words_per_key]:
+            words[hash_ % word_count] |= masks[hash_ >> mask_index_shift]
+        self.count += 1
+
+    def contains(self, hashes: Tuple[int, ...]) -> bool:
+        masks = self.masks
+        mask_index_shift = self.__MASK_INDEX_SHIFT
+        word_count = self.word_count
+        words = self.words
+        for hash_ in hashes[:self.words_per_key]:
+            mask = masks[hash_ >> mask_index_shift]
+            if words[hash_ % word_count] & mask != mask:
+                return False
+        return True
+
+    @classmethod
+    def __get_masks(cls, bits_per_word: int) -> Tuple[int, ...]:
+        masks = cls.__masks.get(bits_per_word)
+        if masks is None:
+            random_ = random.Random(bits_per_word)
+            masks = cls.__masks[bits_per_word] = tuple(
+                sum(1 << bit_i for bit_i in random_.sample(range(64), bits_per_word))
+                for _ in range(cls.__MASK_COUNT)
+            )
+        return masks
+
+    @classmethod
+    def __false_positive_rate(cls, *, bits_per_key: float, bits_per_word: int, words_per_key: int) -> float:
+        # The number of strings in a word is Poisson distributed. A word with n strings gives a false positive if all
+        # of a mask's bits are set by the n strings' masks, or if one of the n strings has the same mask.
+        mean_word_key_count = 64 * words_per_key / bits_per_key
+        word_false_positive_rate = 0
+        key_count_probability = math.exp(-mean_word_key_count)
+        key_count = 0
+        # Sum until the rest of the distribution can't matter
+        while key_count <= mean_word_key_count or key_count_probability > 1e-9 * word_false_positive_rate:
+            bits_false_positive_rate = (1 - (1 - 1 / 64) ** (key_count * bits_per_word)) ** bits_per_word
+            mask_false_positive_rate = 1 - (1 - 1 / cls.__MASK_COUNT) ** key_count
+            word_false_positive_rate += key_count_probability * (
+                bits_false_positive_rate + (1 - bits_false_positive_rate) * mask_false_positive_rate
+            )
+            key_count += 1
+            key_count_probability *= mean_word_key_count / key_count
+        return word_false_positive_rate ** words_per_key
+
+    @classmethod
+    @lru_cache(maxsize=None)
+    def __size(cls, error_rate: float) -> Tuple[int, int, float]:
+        """
+        :return: the (words per key, bits per word, bits per key) with the fewest words per key that meets the error rate
+        with at most __MAX_EXTRA_BITS_PER_KEY_FACTOR times the fewest bits per key
+        """
+        # words per key -> (words per key, bits per word, bits per key) with the fewest bits per key
+        sizes = {}
+        for words_per_key in range(1, cls.MAX_WORDS_PER_KEY + 1):
+            for bits_per_word in range(1, cls.__MAX_BITS_PER_WORD + 1):
+                # Bisect the bits per key, starting from the bits per key of a classic Bloom filter, which is the least
+                low = high = -math.log(error_rate) / (math.log(2) ** 2)
+                while high <= cls.__MAX_BITS_PER_KEY and cls.__false_positive_rate(
+                        bits_per_key=high, bits_per_word=bits_per_word, words_per_key=words_per_key
+                ) > error_rate:
+                    low = high
+                    high *= 2
+                if high > cls.__MAX_BITS_PER_KEY:
+                    continue
+                while high - low > 0.1:
+                    middle = (low + high) / 2
+                    if cls.__false_positive_rate(
+                            bits_per_key=middle, bits_per_word=bits_per_word, words_per_key=words_per_key
+                    ) > error_rate:
+                        low = middle
+                    else:
+                        high = middle
+                if words_per_key not in sizes or high < sizes[words_per_key][2]:
+                    sizes[words_per_key] = (words_per_key, bits_per_word, high)
+        if not sizes:
+            raise ValueError("error_rate is too low")
+        min_bits_per_key = min(size[2] for size in sizes.values())
+        return next(
+            size for size in sizes.values()
+            if size[2] <= min_bits_per_key * cls.__MAX_EXTRA_BITS_PER_KEY_FACTOR
+        )
+
+
+class BloomFilter:
+    """
+    Compact, probabilistic set of strings backed by numpy word arrays.
+
+    Membership tests never give false negatives. False positives occur at a rate below error_rate.
+
+    The filter is scalable: when more than capacity strings have been added, a new slice with double the capacity and
+    half the error rate is added, so the overall false positive rate stays below error_rate no matter how many strings
+    are added.
+    """
+
+    __HASHES = struct.Struct("<%dQ" % _BloomFilterSlice.MAX_WORDS_PER_KEY)
+
+    def __init__(self, *, capacity: int = 1000000, error_rate: float = 0.001):
+        if capacity < 1:
+            raise ValueError("capacity must be >= 1")
+        if not 0 < error_rate < 1:
+            raise ValueError("error_rate must be in (0, 1)")
+        self.__count = 0
+        # The error rates of the slices sum to < error_rate.
+        self.__slices = [_BloomFilterSlice(capacity=capacity, error_rate=error_rate / 2)]
+
+    def add(self, key: str) -> bool:
+        """
+        Add a string to the filter if it's not already present.
+
+        :return: True if the string was (probably) already present, False if it was added
+        """
+        hashes = self.__hash(key)
+        for slice_ in self.__slices:
+            if slice_.contains(hashes):
+                return True
+        slice_ = self.__slices[-1]
+        if slice_.count == slice_.capacity:
+            slice_ = _BloomFilterSlice(capacity=slice_.capacity * 2, error_rate=slice_.error_rate / 2)
+            self.__slices.append(slice_)
+        slice_.add(hashes)
+        self.__count += 1
+        return False
+
+    def __contains__(self, key: str) -> bool:
+        hashes = self.__hash(key)
+        for slice_ in self.__slices:
+            if slice_.contains(hashes):
+                return True
+        return False
+
+    @classmethod
+    def __hash(cls, key: str) -> Tuple[int, ...]:
+        # One 64-bit hash per word, enough for any slice
+        return cls.__HASHES.unpack(blake2b(key.encode("utf-8"), digest_size=cls.__HASHES.size).digest())
+
+    def __len__(self):
+        """
+        Number of strings added to the filter, not counting strings that were (probably) already present.
+        """
+        return self.__count
+
+    @property
+    def nbytes(self) -> int:
+        """
+        Size of the filter's word arrays in bytes.
+        """
+        return sum(slice_.words.nbytes for slice_ in self.__slices)
@@ -0,0 +1,61 @@
+import struct
+from typing import Optional, Tuple
+
+from mowgli_etl.model.kg_edge import KgEdge
+from mowgli_etl.storage._binary_model_codec import _BinaryModelCodec
+
+
+class KgEdgeCodec(_BinaryModelCodec):
+    """
+    Compact binary codec for KgEdge's.
+
+    Strings: id, object, predicate, subject, source_ids, labels (if not None)
+    Counts: len(source_ids), len(labels)
+    Trailer: weight as a little-endian double (if not None)
+    """
+
+    __LABELS = 0x01
+    __WEIGHT = 0x02
+    __WEIGHT_STRUCT = struct.Struct("<d")
+
+    def decode(self, data: bytes) -> KgEdge:
+        flags, source_id_count, label_count = self._unpack_header(data)
+        strings = self._unpack_strings(data, flags, 4 + source_id_count + label_count)
+        labels_start = 4 + source_id_count
+        # Skip the NamedTuple's keyword argument handling
+        return tuple.__new__(KgEdge, (
+            strings[0],
+            strings[1],
+            strings[2],
+            tuple(strings[4:labels_start]),
+            strings[3],
+            tuple(strings[labels_start:]) if flags & self.__LABELS else None,
+            # The weight is the trailer, at the end of the record
+            self.__WEIGHT_STRUCT.unpack_from(data, len(data) - self.__WEIGHT_STRUCT.size)[0] if flags & self.__WEIGHT else None,
+        ))
+
+    def decode_labels(self, data: bytes) -> Optional[Tuple[str, ...]]:
+        """
+        Decode only the labels of an encoded edge, without decoding the other fields or constructing a KgEdge.
+        """
+        flags, source_id_count, label_count = self._unpack_header(data)
+        if not flags & self.__LABELS:
+            return None
+        return tuple(self._unpack_strings(data, flags, 4 + source_id_count + label_count, 4 + source_id_count))
+
+    def encode(self, edge: KgEdge) -> bytes:
+        strings = [edge.id, edge.object, edge.predicate, edge.subject, *edge.source_ids]
+        flags = 0
+        if edge.labels is not None:
+            strings.extend(edge.labels)
+            flags |= self.__LABELS
+        trailer = b""
+        if edge.weight is not None:
+            trailer = self.__WEIGHT_STRUCT.pack(edge.weight)
+            flags |= self.__WEIGHT
+        return self._pack(
+            counts=(len(edge.source_ids), len(edge.labels) if edge.labels is not None else 0),
+            flags=flags,
+            strings=strings,
+            trailer=trailer,
+        )
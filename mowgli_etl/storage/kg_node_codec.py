@@ -0,0 +1,45 @@
+from typing import Tuple
+
+from mowgli_etl.model.kg_node import KgNode
+from mowgli_etl.storage._binary_model_codec import _BinaryModelCodec
+
+
+class KgNodeCodec(_BinaryModelCodec):
+    """
+    Compact binary codec for KgNode's.
+
+    Strings: id, labels, source_ids, pos (if not None)
+    Counts: len(labels), len(source_ids)
+    """
+
+    __POS = 0x01
+
+    def decode(self, data: bytes) -> KgNode:
+        flags, label_count, source_id_count = self._unpack_header(data)
+        has_pos = flags & self.__POS
+        strings = self._unpack_strings(data, flags, 1 + label_count + source_id_count + (1 if has_pos else 0))
+        source_ids_start = 1 + label_count
+        source_ids_stop = source_ids_start + source_id_count
+        # Skip the NamedTuple's keyword argument handling
+        return tuple.__new__(KgNode, (
+            strings[0],
+            tuple(strings[1:source_ids_start]),
+            tuple(strings[source_ids_start:source_ids_stop]),
+            strings[source_ids_stop] if has_pos else None,
+        ))
+
+    def decode_labels(self, data: bytes) -> Tuple[str, ...]:
+        """
+        Decode only the labels of an encoded node, without decoding the other fields or constructing a KgNode.
+        """
+        flags, label_count, source_id_count = self._unpack_header(data)
+        string_count = 1 + label_count + source_id_count + (1 if flags & self.__POS else 0)
+        return tuple(self._unpack_strings(data, flags, string_count, 1, 1 + label_count))
+
+    def encode(self, node: KgNode) -> bytes:
+        strings = [node.id, *node.labels, *node.source_ids]
+        flags = 0
+        if node.pos is not None:
+            strings.append(node.pos)
+            flags |= self.__POS
+        return self._pack(counts=(len(node.labels), len(node.source_ids)), flags=flags, strings=strings)
@@ -0,0 +1,106 @@
+import os
+import pickle
+from pathlib import Path
+from typing import Dict, Optional
+
+from mowgli_etl._closeable import _Closeable
+from mowgli_etl.storage.level_db import LevelDb
+
+
+class LevelDbWriteBuffer(_Closeable):
+    """
+    Buffer of pending puts and deletes to a LevelDb, written in a single write_batch when the buffer fills up.
+
+    Reads through the buffer see the pending writes, so callers can interleave reads and writes as if every write had
+    gone straight to the database.
+
+    Closing the buffer flushes it, unless flush_on_close is False, in which case the pending writes are discarded. It
+    doesn't close the database.
+
+    A flush can be made undoable: the values the pending writes replace are first written to an undo file tagged with a
+    generation, such as a checkpoint's, and undo_flush rolls the database back to them if that generation was never
+    committed.
+    """
+
+    DEFAULT_SIZE = 10000
+
+    def __init__(self, level_db: LevelDb, *, flush_on_close: bool = True, size: int = DEFAULT_SIZE):
+        if size < 1:
+            raise ValueError("size must be >= 1")
+        self.__flush_on_close = flush_on_close
+        self.__level_db = level_db
+        # key -> value, or None for a pending delete
+        self.__pending: Dict[bytes, Optional[bytes]] = {}
+        self.__size = size
+
+    def close(self):
+        if self.__flush_on_close:
+            self.flush()
+        else:
+            self.__pending.clear()
+
+    def delete(self, key: bytes) -> None:
+        self.__pending[key] = None
+        if len(self.__pending) >= self.__size:
+            self.flush()
+
+    def flush(self) -> None:
+        """
+        Write the pending puts and deletes to the database.
+        """
+        if not self.__pending:
+            return
+        with self.__level_db.write_batch() as write_batch:
+            for key, value in self.__pending.items():
+                if value is not None:
+                    write_batch.put(key, value)
+                else:
+                    write_batch.delete(key)
+        self.__pending.clear()
+
+    def flush_undoably(self, undo_file_path: Path, *, generation: int) -> None:
+        """
+        Write the values the pending writes replace to an undo file, replacing any earlier one, then flush.
+        """
+        undo_records = [(key, self.__level_db.get(key)) for key in self.__pending]
+        temp_undo_file_path = undo_file_path.with_name(undo_file_path.name + ".tmp")
+        with open(temp_undo_file_path, "wb") as undo_file:
+            pickle.dump((generation, undo_records), undo_file, protocol=pickle.HIGHEST_PROTOCOL)
+            undo_file.flush()
+            os.fsync(undo_file.fileno())
+        os.replace(temp_undo_file_path, undo_file_path)
+        self.flush()
+
+    def get(self, key: bytes) -> Optional[bytes]:
+        try:
+            return self.__pending[key]
+        except KeyError:
+            return self.__level_db.get(key)
+
+    def put(self, key: bytes, value: bytes) -> None:
+        self.__pending[key] = value
+        if len(self.__pending) >= self.__size:
+            self.flush()
+
+    def undo_flush(self, undo_file_path: Path, *, committed_generation: Optional[int]) -> None:
+        """
+        Roll back the flush recorded in an undo file and delete the file, if the flush's generation is later than the last
+        committed one. Rolling back is idempotent, so a crash while undoing is recovered from by undoing again.
+
+        :param committed_generation: last committed generation, or None if none was
+        """
+        try:
+            with open(undo_file_path, "rb") as undo_file:
+                generation, undo_records = pickle.load(undo_file)
+        except FileNotFoundError:
+            return
+        if committed_generation is not None and generation <= committed_generation:
+            return
+        self.__pending.clear()
+        with self.__level_db.write_batch() as write_batch:
+            for key, value in undo_records:
+                if value is not None:
+                    write_batch.put(key, value)
+                else:
+                    write_batch.delete(key)
+        os.unlink(undo_file_path)
@@ -1,3 +1,5 @@
+from typing import Iterable
+
 from mowgli_etl.storage._id_set import _IdSet
 
 
@@ -9,6 +11,9 @@ class MemIdSet(_IdSet):
     def add(self, id: str) -> None:
         self.__ids.add(id)
 
+    def add_many(self, ids: Iterable[str]) -> None:
+        self.__ids.update(ids)
+
     def close(self):
         pass
 
@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import Iterable, Optional
 
 from mowgli_etl.model.kg_edge import KgEdge
 from mowgli_etl.storage._kg_edge_set import _KgEdgeSet
@@ -12,6 +12,9 @@ class MemKgEdgeSet(_KgEdgeSet):
     def add(self, edge: KgEdge) -> None:
         self.__edges[edge.id] = edge
 
+    def add_many(self, edges: Iterable[KgEdge]) -> None:
+        self.__edges.update((edge.id, edge) for edge in edges)
+
     def close(self):
         pass
 
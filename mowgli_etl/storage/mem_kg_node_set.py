@@ -1,4 +1,4 @@
-from typing import Optional, Generator
+from typing import Optional, Generator, Iterable
 
 from mowgli_etl._closeable import _Closeable
 from mowgli_etl.model.kg_node import KgNode
@@ -14,6 +14,9 @@ class MemKgNodeSet(_KgNodeSet, _Closeable):
     def add(self, node: KgNode) -> None:
         self.__nodes[node.id] = node
 
+    def add_many(self, nodes: Iterable[KgNode]) -> None:
+        self.__nodes.update((node.id, node) for node in nodes)
+
     def close(self):
         pass
 
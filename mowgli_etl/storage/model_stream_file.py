@@ -0,0 +1,253 @@
+import logging
+import os
+import pickle
+import struct
+from pathlib import Path
+from typing import Dict, Generator, Iterable, List
+
+from mowgli_etl.model.kg_edge import KgEdge
+from mowgli_etl.model.kg_node import KgNode
+from mowgli_etl.model.kg_path import KgPath
+from mowgli_etl.model.model import Model
+
+
+class ModelStreamFile:
+    """
+    File of a stream of models in a compact binary format that can be replayed much faster than it was produced.
+
+    The file starts with a magic number, a version, and the size of the string table. Then each model is one
+    length-prefixed record:
+
+    body length (u32) | type (u8) | flags (u8) | count 1 (u16) | count 2 (u16) | body
+
+    KgNode, KgEdge, and KgPath bodies are a table of u32 string references followed by the UTF-8 strings the references
+    introduce, and an optional trailer. A reference with the high bit set introduces a new string of that many bytes,
+    which the writer and the reader both add to their string table while it has room. Other references are indices
+    into the string table. Ids, predicates, and source ids repeat a lot, so most strings are written once.
+
+    Other models, such as benchmark models, are rare, and their bodies are pickles. So are the bodies of the rare
+    KgNodes, KgEdges, and KgPaths with more than 65535 strings of a kind, which don't fit the u16 counts.
+
+    Models are only written if the stream is exhausted: the file is written to a temporary path and renamed at the end.
+    """
+
+    DEFAULT_STRING_TABLE_SIZE = 1 << 20
+    VERSION = 1
+
+    __BUFFER_SIZE = 1024 * 1024
+    __FILE_HEADER = struct.Struct("<8sBI")
+    __MAGIC = b"MOWGLIMS"
+    __NEW_STRING = 0x80000000
+    __RECORD_HEADER = struct.Struct("<IBBHH")
+    __WEIGHT = struct.Struct("<d")
+
+    __KG_NODE = 1
+    __KG_EDGE = 2
+    __KG_PATH = 3
+    __PICKLE = 0xFF
+
+    # KgNode flags
+    __NODE_POS = 0x01
+    # KgEdge flags
+    __EDGE_LABELS = 0x01
+    __EDGE_WEIGHT = 0x02
+
+    # string count -> Struct of the references table
+    __REFERENCES_STRUCTS: Dict[int, struct.Struct] = {}
+
+    def __init__(self, file_path: Path):
+        self._logger = logging.getLogger(self.__class__.__name__)
+        self.__file_path = file_path
+
+    def exists(self) -> bool:
+        return self.__file_path.is_file()
+
+    @property
+    def file_path(self) -> Path:
+        return self.__file_path
+
+    @classmethod
+    def __references_struct(cls, string_count: int) -> struct.Struct:
+        try:
+            return cls.__REFERENCES_STRUCTS[string_count]
+        except KeyError:
+            references_struct = cls.__REFERENCES_STRUCTS[string_count] = struct.Struct("<%dI" % string_count)
+            return references_struct
+
+    def read(self) -> Generator[Model, None, None]:
+        """
+        Replay the models in the file, in the order they were written.
+        """
+        with open(self.__file_path, "rb", buffering=self.__BUFFER_SIZE) as file_:
+            magic, version, string_table_size = self.__FILE_HEADER.unpack(file_.read(self.__FILE_HEADER.size))
+            if magic != self.__MAGIC:
+                raise ValueError(f"{self.__file_path} is not a model stream file")
+            if version != self.VERSION:
+                raise ValueError(f"unsupported model stream file version {version}")
+
+            read = file_.read
+            record_header_size = self.__RECORD_HEADER.size
+            unpack_record_header = self.__RECORD_HEADER.unpack
+            new_string = self.__NEW_STRING
+            string_length_mask = new_string - 1
+            string_table: List[str] = []
+            string_table_append = string_table.append
+            references_structs = self.__REFERENCES_STRUCTS
+            new = tuple.__new__
+            node_pos = self.__NODE_POS
+            edge_labels = self.__EDGE_LABELS
+            edge_weight = self.__EDGE_WEIGHT
+            weight_struct = self.__WEIGHT
+
+            while True:
+                record_header = read(record_header_size)
+                if not record_header:
+                    return
+                if len(record_header) != record_header_size:
+                    raise ValueError(f"truncated model stream file {self.__file_path}")
+                body_length, type_, flags, count1, count2 = unpack_record_header(record_header)
+                body = read(body_length)
+                if len(body) != body_length:
+                    raise ValueError(f"truncated model stream file {self.__file_path}")
+
+                if type_ == self.__PICKLE:
+                    yield pickle.loads(body)
+                    continue
+
+                if type_ == self.__KG_NODE:
+                    string_count = 1 + count1 + count2 + (1 if flags & node_pos else 0)
+                elif type_ == self.__KG_EDGE:
+                    string_count = 4 + count1 + count2
+                elif type_ == self.__KG_PATH:
+                    string_count = 1 + count1 + count2
+                else:
+                    raise ValueError(f"unknown model stream record type {type_}")
+
+                try:
+                    references_struct = references_structs[string_count]
+                except KeyError:
+                    references_struct = self.__references_struct(string_count)
+                offset = references_struct.size
+                strings = []
+                for reference in references_struct.unpack_from(body):
+                    if reference & new_string:
+                        end = offset + (reference & string_length_mask)
+                        string = body[offset:end].decode("utf-8")
+                        offset = end
+                        if len(string_table) < string_table_size:
+                            string_table_append(string)
+                        strings.append(string)
+                    else:
+                        strings.append(string_table[reference])
+
+                # Skip the NamedTuple's keyword argument handling, like KgNodeCodec
+                if type_ == self.__KG_NODE:
+                    source_ids_start = 1 + count1
+                    source_ids_stop = source_ids_start + count2
+                    yield new(KgNode, (
+                        strings[0],
+                        tuple(strings[1:source_ids_start]),
+                        tuple(strings[source_ids_start:source_ids_stop]),
+                        strings[source_ids_stop] if flags & node_pos else None,
+                    ))
+                elif type_ == self.__KG_EDGE:
+                    source_ids_stop = 4 + count1
+                    yield new(KgEdge, (
+                        strings[0],
+                        strings[1],
+                        strings[2],
+                        tuple(strings[4:source_ids_stop]),
+                        strings[3],
+                        tuple(strings[source_ids_stop:]) if flags & edge_labels else None,
+                        weight_struct.unpack_from(body, offset)[0] if flags & edge_weight else None,
+                    ))
+                else:
+                    path_stop = 1 + count1
+                    yield new(KgPath, (strings[0], tuple(strings[1:path_stop]), tuple(strings[path_stop:])))
+
+    def write(
+            self,
+            models: Iterable[Model],
+            *,
+            string_table_size: int = DEFAULT_STRING_TABLE_SIZE
+    ) -> Generator[Model, None, None]:
+        """
+        Write models to the file as they pass through.
+
+        The file is only replaced if models is exhausted without an exception.
+        """
+        temp_file_path = self.__file_path.with_name(self.__file_path.name + ".tmp")
+        string_table: Dict[str, int] = {}
+        record_header = self.__RECORD_HEADER
+        new_string = self.__NEW_STRING
+        model_count = 0
+        succeeded = False
+        with open(temp_file_path, "wb", buffering=self.__BUFFER_SIZE) as file_:
+            write = file_.write
+            write(self.__FILE_HEADER.pack(self.__MAGIC, self.VERSION, string_table_size))
+
+            def write_pickle_record(model: Model):
+                body = pickle.dumps(model, protocol=pickle.HIGHEST_PROTOCOL)
+                write(record_header.pack(len(body), self.__PICKLE, 0, 0, 0))
+                write(body)
+
+            def write_strings_record(model: Model, type_: int, flags: int, count1: int, count2: int, strings, trailer: bytes = b""):
+                if count1 > 0xFFFF or count2 > 0xFFFF:
+                    write_pickle_record(model)
+                    return
+                references = []
+                new_strings = []
+                for string in strings:
+                    reference = string_table.get(string)
+                    if reference is None:
+                        encoded_string = string.encode("utf-8")
+                        references.append(new_string | len(encoded_string))
+                        new_strings.append(encoded_string)
+                        if len(string_table) < string_table_size:
+                            string_table[string] = len(string_table)
+                    else:
+                        references.append(reference)
+                body = b"".join((self.__references_struct(len(references)).pack(*references), *new_strings, trailer))
+                write(record_header.pack(len(body), type_, flags, count1, count2))
+                write(body)
+
+            try:
+                for model in models:
+                    model_class = model.__class__
+                    if model_class is KgNode:
+                        strings = [model.id, *model.labels, *model.source_ids]
+                        flags = 0
+                        if model.pos is not None:
+                            strings.append(model.pos)
+                            flags = self.__NODE_POS
+                        write_strings_record(model, self.__KG_NODE, flags, len(model.labels), len(model.source_ids), strings)
+                    elif model_class is KgEdge:
+                        strings = [model.id, model.object, model.predicate, model.subject, *model.source_ids]
+                        flags = 0
+                        label_count = 0
+                        if model.labels is not None:
+                            strings.extend(model.labels)
+                            flags |= self.__EDGE_LABELS
+                            label_count = len(model.labels)
+                        trailer = b""
+                        if model.weight is not None:
+                            trailer = self.__WEIGHT.pack(model.weight)
+                            flags |= self.__EDGE_WEIGHT
+                        write_strings_record(model, self.__KG_EDGE, flags, len(model.source_ids), label_count, strings, trailer)
+                    elif model_class is KgPath:
+                        write_strings_record(
+                            model, self.__KG_PATH, 0, len(model.path), len(model.source_ids),
+                            (model.id, *model.path, *model.source_ids)
+                        )
+                    else:
+                        write_pickle_record(model)
+                    model_count += 1
+                    yield model
+                succeeded = True
+            finally:
+                file_.close()
+                if succeeded:
+                    os.replace(temp_file_path, self.__file_path)
+                    self._logger.info("wrote %d models to %s", model_count, self.__file_path)
+                else:
+                    os.unlink(temp_file_path)
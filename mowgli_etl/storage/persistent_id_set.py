@@ -1,22 +1,42 @@
 from pathlib import Path
 from tempfile import mkdtemp
+from typing import Iterable, Optional
 
 from mowgli_etl.storage._id_set import _IdSet
 from mowgli_etl.storage.level_db import LevelDb
+from mowgli_etl.storage.level_db_write_buffer import LevelDbWriteBuffer
 
 
 class PersistentIdSet(_IdSet):
-    def __init__(self, **level_db_kwds):
+    def __init__(
+            self,
+            *,
+            flush_on_close: bool = True,
+            write_batch_size: int = LevelDbWriteBuffer.DEFAULT_SIZE,
+            **level_db_kwds
+    ):
+        """
+        :param flush_on_close: if False, discard buffered additions on close instead of writing them
+        """
         _IdSet.__init__(self)
         self.__level_db = LevelDb(**level_db_kwds)
+        self.__write_buffer = LevelDbWriteBuffer(self.__level_db, flush_on_close=flush_on_close, size=write_batch_size)
 
     def add(self, id: str) -> None:
         key = self.__construct_key(id=id)
         value = b''
-        self.__level_db.put(key, value)
+        self.__write_buffer.put(key, value)
+
+    def add_many(self, ids: Iterable[str]) -> None:
+        put = self.__write_buffer.put
+        for id in ids:
+            put(self.__construct_key(id=id), b'')
 
     def close(self):
-        self.__level_db.close()
+        try:
+            self.__write_buffer.close()
+        finally:
+            self.__level_db.close()
 
     @property
     def closed(self):
@@ -28,9 +48,18 @@ class PersistentIdSet(_IdSet):
 
     def __contains__(self, id: str):
         key = self.__construct_key(id=id)
-        value = self.__level_db.get(key)
+        value = self.__write_buffer.get(key)
         return value is not None
 
+    def flush(self) -> None:
+        self.__write_buffer.flush()
+
+    def flush_undoably(self, undo_file_path: Path, *, generation: int) -> None:
+        self.__write_buffer.flush_undoably(undo_file_path, generation=generation)
+
     @classmethod
     def temporary(cls):
         return cls(directory_path=Path(mkdtemp()), delete_on_close=True)
+
+    def undo_flush(self, undo_file_path: Path, *, committed_generation: Optional[int]) -> None:
+        self.__write_buffer.undo_flush(undo_file_path, committed_generation=committed_generation)
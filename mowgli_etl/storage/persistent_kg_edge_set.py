@@ -1,36 +1,69 @@
-import pickle
 from pathlib import Path
 from tempfile import mkdtemp
-from typing import Optional
+from typing import Iterable, Optional
 
 from mowgli_etl.model.kg_edge import KgEdge
 from mowgli_etl.storage._kg_edge_set import _KgEdgeSet
+from mowgli_etl.storage._value_codec import _ValueCodec
+from mowgli_etl.storage.kg_edge_codec import KgEdgeCodec
 from mowgli_etl.storage.level_db import LevelDb
+from mowgli_etl.storage.level_db_write_buffer import LevelDbWriteBuffer
 
 
 class PersistentKgEdgeSet(_KgEdgeSet):
-    def __init__(self, **level_db_kwds):
+    def __init__(
+            self,
+            *,
+            flush_on_close: bool = True,
+            value_codec: Optional[_ValueCodec] = None,
+            write_batch_size: int = LevelDbWriteBuffer.DEFAULT_SIZE,
+            **level_db_kwds
+    ):
+        """
+        :param flush_on_close: if False, discard buffered additions on close instead of writing them
+        :param value_codec: codec for stored edges, defaults to KgEdgeCodec
+        """
         _KgEdgeSet.__init__(self)
+        self.__value_codec = value_codec if value_codec is not None else KgEdgeCodec()
         self.__level_db = LevelDb(**level_db_kwds)
+        self.__write_buffer = LevelDbWriteBuffer(self.__level_db, flush_on_close=flush_on_close, size=write_batch_size)
 
     def add(self, edge: KgEdge) -> None:
-        value = pickle.dumps(edge)
-        self.__level_db.put(edge.id.encode("utf-8"), value)
+        value = self.__value_codec.encode(edge)
+        self.__write_buffer.put(edge.id.encode("utf-8"), value)
+
+    def add_many(self, edges: Iterable[KgEdge]) -> None:
+        encode = self.__value_codec.encode
+        put = self.__write_buffer.put
+        for edge in edges:
+            put(edge.id.encode("utf-8"), encode(edge))
 
     def close(self):
-        self.__level_db.close()
+        try:
+            self.__write_buffer.close()
+        finally:
+            self.__level_db.close()
 
     @property
     def closed(self):
         return self.__level_db.closed
 
+    def flush(self) -> None:
+        self.__write_buffer.flush()
+
+    def flush_undoably(self, undo_file_path: Path, *, generation: int) -> None:
+        self.__write_buffer.flush_undoably(undo_file_path, generation=generation)
+
     def get(self, edge_id, default: Optional[KgEdge] = None) -> Optional[KgEdge]:
-        value = self.__level_db.get(edge_id.encode("utf-8"))
+        value = self.__write_buffer.get(edge_id.encode("utf-8"))
         if value is not None:
-            return pickle.loads(value)
+            return self.__value_codec.decode(value)
         else:
             return default
 
     @classmethod
     def temporary(cls):
         return cls(directory_path=Path(mkdtemp()), delete_on_close=True)
+
+    def undo_flush(self, undo_file_path: Path, *, committed_generation: Optional[int]) -> None:
+        self.__write_buffer.undo_flush(undo_file_path, committed_generation=committed_generation)
@@ -1,29 +1,53 @@
-import pickle
 from pathlib import Path
 from tempfile import mkdtemp
-from typing import Optional, Generator
+from typing import Optional, Generator, Iterable, Tuple
 
 from mowgli_etl.model.kg_node import KgNode
 from mowgli_etl.storage._kg_node_set import _KgNodeSet
+from mowgli_etl.storage._value_codec import _ValueCodec
+from mowgli_etl.storage.kg_node_codec import KgNodeCodec
 from mowgli_etl.storage.level_db import LevelDb
+from mowgli_etl.storage.level_db_write_buffer import LevelDbWriteBuffer
 
 
 class PersistentKgNodeSet(_KgNodeSet):
-    def __init__(self, **level_db_kwds):
+    def __init__(
+            self,
+            *,
+            flush_on_close: bool = True,
+            value_codec: Optional[_ValueCodec] = None,
+            write_batch_size: int = LevelDbWriteBuffer.DEFAULT_SIZE,
+            **level_db_kwds
+    ):
+        """
+        :param flush_on_close: if False, discard buffered additions on close instead of writing them
+        :param value_codec: codec for stored nodes, defaults to KgNodeCodec
+        """
         _KgNodeSet.__init__(self)
+        self.__value_codec = value_codec if value_codec is not None else KgNodeCodec()
         self.__level_db = LevelDb(**level_db_kwds)
+        self.__write_buffer = LevelDbWriteBuffer(self.__level_db, flush_on_close=flush_on_close, size=write_batch_size)
 
     def add(self, node: KgNode) -> None:
         key = self.__construct_node_key(node.id)
-        value = pickle.dumps(node)
-        self.__level_db.put(key, value)
+        value = self.__value_codec.encode(node)
+        self.__write_buffer.put(key, value)
+
+    def add_many(self, nodes: Iterable[KgNode]) -> None:
+        encode = self.__value_codec.encode
+        put = self.__write_buffer.put
+        for node in nodes:
+            put(self.__construct_node_key(node.id), encode(node))
 
     def delete(self, node_id: str) -> None:
         key = self.__construct_node_key(node_id)
-        self.__level_db.delete(key)
+        self.__write_buffer.delete(key)
 
     def close(self):
-        self.__level_db.close()
+        try:
+            self.__write_buffer.close()
+        finally:
+            self.__level_db.close()
 
     @property
     def closed(self):
@@ -35,18 +59,34 @@ class PersistentKgNodeSet(_KgNodeSet):
 
     def __contains__(self, node_id: str):
         key = self.__construct_node_key(node_id)
-        value = self.__level_db.get(key)
+        value = self.__write_buffer.get(key)
         return value is not None
 
+    def flush(self) -> None:
+        self.__write_buffer.flush()
+
+    def flush_undoably(self, undo_file_path: Path, *, generation: int) -> None:
+        self.__write_buffer.flush_undoably(undo_file_path, generation=generation)
+
     def get(self, node_id: str, default: Optional[KgNode] = None) -> Optional[KgNode]:
         key = self.__construct_node_key(node_id)
-        value = self.__level_db.get(key)
+        value = self.__write_buffer.get(key)
         if value is not None:
-            return pickle.loads(value)
+            return self.__value_codec.decode(value)
         else:
             return default
 
+    def get_labels(self, node_id: str, default: Optional[Tuple[str, ...]] = None) -> Optional[Tuple[str, ...]]:
+        key = self.__construct_node_key(node_id)
+        value = self.__write_buffer.get(key)
+        if value is None:
+            return default
+        if isinstance(self.__value_codec, KgNodeCodec):
+            return self.__value_codec.decode_labels(value)
+        return self.__value_codec.decode(value).labels
+
     def keys(self) -> Generator[str, None, None]:
+        self.__write_buffer.flush()
         with self.__level_db.iterator(include_value=False) as it:
             for key in it:
                 yield key.decode("utf-8")
@@ -54,3 +94,6 @@ class PersistentKgNodeSet(_KgNodeSet):
     @classmethod
     def temporary(cls):
         return cls(directory_path=Path(mkdtemp()), delete_on_close=True)
+
+    def undo_flush(self, undo_file_path: Path, *, committed_generation: Optional[int]) -> None:
+        self.__write_buffer.undo_flush(undo_file_path, committed_generation=committed_generation)
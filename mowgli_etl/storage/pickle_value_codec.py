@@ -0,0 +1,15 @@
+import pickle
+
+from mowgli_etl.storage._value_codec import _ValueCodec
+
+
+class PickleValueCodec(_ValueCodec):
+    """
+    Codec for arbitrary picklable values.
+    """
+
+    def decode(self, data: bytes):
+        return pickle.loads(data)
+
+    def encode(self, value) -> bytes:
+        return pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
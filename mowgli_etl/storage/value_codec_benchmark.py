@@ -0,0 +1,57 @@
+"""
+Benchmark the binary model codecs against pickle: bytes per record and encode/decode throughput.
+
+python -m mowgli_etl.storage.value_codec_benchmark [record count]
+"""
+
+import sys
+import timeit
+
+from mowgli_etl.model.concept_net_predicates import RELATED_TO
+from mowgli_etl.model.kg_edge import KgEdge
+from mowgli_etl.model.kg_node import KgNode
+from mowgli_etl.storage.kg_edge_codec import KgEdgeCodec
+from mowgli_etl.storage.kg_node_codec import KgNodeCodec
+from mowgli_etl.storage.pickle_value_codec import PickleValueCodec
+
+
+def _benchmark(*, codec, name: str, records, decode_labels=None) -> None:
+    encoded_records = [codec.encode(record) for record in records]
+    for encoded_record, record in zip(encoded_records, records):
+        assert codec.decode(encoded_record) == record
+
+    record_count = len(records)
+    encode_s = min(timeit.repeat(lambda: [codec.encode(record) for record in records], number=1, repeat=3))
+    decode_s = min(timeit.repeat(lambda: [codec.decode(encoded_record) for encoded_record in encoded_records], number=1, repeat=3))
+    line = "%-24s %8.1f bytes/record %10.0f encodes/s %10.0f decodes/s" % (
+        name,
+        sum(len(encoded_record) for encoded_record in encoded_records) / record_count,
+        record_count / encode_s,
+        record_count / decode_s,
+    )
+    if decode_labels is not None:
+        decode_labels_s = min(timeit.repeat(lambda: [decode_labels(encoded_record) for encoded_record in encoded_records], number=1, repeat=3))
+        line += " %10.0f label decodes/s" % (record_count / decode_labels_s)
+    print(line)
+
+
+def main(record_count: int = 100000) -> None:
+    nodes = [
+        KgNode.legacy(datasource="benchmark", id=f"benchmark:node{node_i}", label=f"node {node_i}", pos="n")
+        for node_i in range(record_count)
+    ]
+    edges = [
+        KgEdge.legacy(datasource="benchmark", object=f"benchmark:node{edge_i + 1}", predicate=RELATED_TO, subject=f"benchmark:node{edge_i}", weight=1.0)
+        for edge_i in range(record_count)
+    ]
+
+    pickle_value_codec = PickleValueCodec()
+    _benchmark(codec=pickle_value_codec, name="KgNode pickle", records=nodes, decode_labels=lambda data: pickle_value_codec.decode(data).labels)
+    kg_node_codec = KgNodeCodec()
+    _benchmark(codec=kg_node_codec, name="KgNode KgNodeCodec", records=nodes, decode_labels=kg_node_codec.decode_labels)
+    _benchmark(codec=pickle_value_codec, name="KgEdge pickle", records=edges)
+    _benchmark(codec=KgEdgeCodec(), name="KgEdge KgEdgeCodec", records=edges)
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
@@ -0,0 +1,74 @@
+import bz2
+from io import TextIOWrapper
+from pathlib import Path
+from typing import IO, Optional, Union
+from zipfile import ZipFile
+
+
+class VirtualExtractedFile:
+    """
+    An extracted file that is read straight out of its compressed source, a .bz2 file or a member of a zip archive,
+    instead of from a decompressed copy in the extracted data directory.
+
+    Extractors return these in place of extracted file paths when the PipelineStorage streams extracted files.
+    Transformers should open extracted files with open_extracted_file, which accepts either.
+    """
+
+    def __init__(self, *, compressed_file_path: Path, member_name: Optional[str] = None):
+        """
+        :param compressed_file_path: path to a .bz2 file, or to a zip archive if member_name is specified
+        :param member_name: name of the file in the zip archive
+        """
+        self.__compressed_file_path = Path(compressed_file_path)
+        self.__member_name = member_name
+
+    @property
+    def compressed_file_path(self) -> Path:
+        return self.__compressed_file_path
+
+    @property
+    def member_name(self) -> Optional[str]:
+        return self.__member_name
+
+    @property
+    def name(self) -> str:
+        """
+        Name of the extracted file, as if it had been decompressed.
+        """
+        if self.__member_name is not None:
+            return self.__member_name
+        name = self.__compressed_file_path.name
+        return name[:-len(".bz2")] if name.lower().endswith(".bz2") else name
+
+    def open(self, mode: str = "r", **kwds) -> IO:
+        """
+        Open the decompressed stream for reading, like the built-in open.
+
+        :param mode: "r" or "rt" for a buffered text stream, "rb" for a binary stream
+        :param kwds: encoding, errors, and newline for text streams
+        """
+        if mode not in ("r", "rt", "rb"):
+            raise ValueError(f"unsupported mode {mode}")
+        if self.__member_name is None:
+            binary_file = bz2.open(self.__compressed_file_path, "rb")
+        else:
+            # The member keeps the archive's file open after the ZipFile is closed
+            with ZipFile(self.__compressed_file_path) as zip_file:
+                binary_file = zip_file.open(self.__member_name)
+        if mode == "rb":
+            return binary_file
+        return TextIOWrapper(binary_file, **kwds)
+
+    def __repr__(self):
+        if self.__member_name is not None:
+            return f"{self.__class__.__name__}({self.__compressed_file_path}!{self.__member_name})"
+        return f"{self.__class__.__name__}({self.__compressed_file_path})"
+
+
+def open_extracted_file(file: Union[Path, str, VirtualExtractedFile], mode: str = "r", **kwds) -> IO:
+    """
+    Open an extracted file for reading, whether it's a decompressed copy or a VirtualExtractedFile.
+    """
+    if isinstance(file, VirtualExtractedFile):
+        return file.open(mode, **kwds)
+    return open(file, mode, **kwds)
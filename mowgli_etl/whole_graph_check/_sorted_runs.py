@@ -0,0 +1,50 @@
+import heapq
+from pathlib import Path
+from typing import Generator, List
+
+from mowgli_etl._closeable import _Closeable
+from mowgli_etl.whole_graph_check._spill_file import _SpillFile
+
+
+class _SortedRuns(_Closeable):
+    """
+    External sort of comparable records with bounded memory.
+
+    Appended records are buffered in memory. When the buffer fills up it's sorted and spilled to a run file. Iterating
+    k-way merges the runs and the sorted remainder of the buffer into a single sorted stream.
+    """
+
+    def __init__(self, *, directory_path: Path, name: str, run_size: int):
+        if run_size < 1:
+            raise ValueError("run_size must be >= 1")
+        self.__buffer: List[object] = []
+        self.__directory_path = directory_path
+        self.__name = name
+        self.__run_size = run_size
+        self.__runs: List[_SpillFile] = []
+
+    def append(self, record) -> None:
+        self.__buffer.append(record)
+        if len(self.__buffer) == self.__run_size:
+            self.__spill()
+
+    def close(self):
+        for run in self.__runs:
+            run.close()
+
+    def __iter__(self) -> Generator[object, None, None]:
+        """
+        Iterate over the records appended so far in sorted order. Don't append while iterating.
+        """
+        self.__buffer.sort()
+        yield from heapq.merge(*self.__runs, self.__buffer)
+
+    def __len__(self):
+        return sum(len(run) for run in self.__runs) + len(self.__buffer)
+
+    def __spill(self) -> None:
+        self.__buffer.sort()
+        run = _SpillFile(self.__directory_path / ("%s.%d.run" % (self.__name, len(self.__runs))))
+        run.extend(self.__buffer)
+        self.__runs.append(run)
+        self.__buffer = []
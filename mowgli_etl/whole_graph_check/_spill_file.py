@@ -0,0 +1,56 @@
+import pickle
+from pathlib import Path
+from typing import Generator
+
+from mowgli_etl._closeable import _Closeable
+
+
+class _SpillFile(_Closeable):
+    """
+    Append-only file of picklable records, written and read sequentially.
+
+    Records are pickled in chunks rather than one at a time, which amortizes the pickle overhead.
+    """
+
+    __BUFFER_SIZE = 1024 * 1024
+    __CHUNK_SIZE = 10000
+
+    def __init__(self, file_path: Path):
+        self.__chunk = []
+        self.__file = open(file_path, "w+b", buffering=self.__BUFFER_SIZE)
+        self.__record_count = 0
+
+    def append(self, record) -> None:
+        self.__chunk.append(record)
+        if len(self.__chunk) == self.__CHUNK_SIZE:
+            self.__flush_chunk()
+
+    def close(self):
+        self.__file.close()
+
+    def extend(self, records) -> None:
+        for record in records:
+            self.append(record)
+
+    def __flush_chunk(self):
+        pickle.dump(self.__chunk, self.__file, protocol=pickle.HIGHEST_PROTOCOL)
+        self.__record_count += len(self.__chunk)
+        self.__chunk = []
+
+    def __iter__(self) -> Generator[object, None, None]:
+        """
+        Iterate over the records appended so far. Don't append while iterating.
+        """
+        if self.__chunk:
+            self.__flush_chunk()
+        self.__file.flush()
+        with open(self.__file.name, "rb", buffering=self.__BUFFER_SIZE) as file:
+            while True:
+                try:
+                    chunk = pickle.load(file)
+                except EOFError:
+                    return
+                yield from chunk
+
+    def __len__(self):
+        return self.__record_count + len(self.__chunk)
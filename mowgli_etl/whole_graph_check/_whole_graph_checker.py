@@ -0,0 +1,56 @@
+from abc import abstractmethod
+from typing import Iterable
+
+from mowgli_etl._closeable import _Closeable
+from mowgli_etl.model.kg_edge import KgEdge
+from mowgli_etl.model.kg_node import KgNode
+
+
+class _WholeGraphChecker(_Closeable):
+    """
+    Abstract base class for whole graph checkers.
+
+    A whole graph checker checks graph-wide constraints on the models a transformer yields:
+    - node id's are unique, although exact duplicate nodes are tolerated (and dropped)
+    - edge id's are unique
+    - every node is used by at least one edge
+
+    Violations are reported by raising ValueError.
+    """
+
+    @abstractmethod
+    def add_used_node_id(self, node_id: str) -> None:
+        """
+        Record that a node id is referenced by an edge.
+        """
+
+    def add_used_node_ids(self, node_ids: Iterable[str]) -> None:
+        """
+        Record that multiple node id's are referenced by edges.
+        """
+        for node_id in node_ids:
+            self.add_used_node_id(node_id)
+
+    @abstractmethod
+    def check_complete_graph(self) -> None:
+        """
+        Check the constraints that can only be checked once the whole graph has been seen.
+
+        Call after all models have been checked.
+        """
+
+    @abstractmethod
+    def check_kg_edge(self, edge: KgEdge) -> None:
+        """
+        Check an edge and add it to the set of checked edges.
+
+        Doesn't record the edge's subject and object as used, see add_used_node_id.
+        """
+
+    @abstractmethod
+    def check_kg_node(self, node: KgNode) -> bool:
+        """
+        Check a node and add it to the set of checked nodes.
+
+        :return: False if the node is an exact duplicate of a previously-checked node and should be dropped, otherwise True
+        """
@@ -0,0 +1,184 @@
+import logging
+import math
+import zlib
+from pathlib import Path
+from shutil import rmtree
+from tempfile import mkdtemp
+from typing import Dict, List, Tuple
+
+from mowgli_etl.model.kg_edge import KgEdge
+from mowgli_etl.model.kg_node import KgNode
+from mowgli_etl.storage.bloom_filter import BloomFilter
+from mowgli_etl.whole_graph_check._spill_file import _SpillFile
+from mowgli_etl.whole_graph_check._whole_graph_checker import _WholeGraphChecker
+
+
+class BloomFilterWholeGraphChecker(_WholeGraphChecker):
+    """
+    Whole graph checker that tests membership with Bloom filters instead of exact sets.
+
+    Checked nodes, edges, and used node id's are appended to sequential spill files instead of being stored in LevelDB.
+    A filter miss proves that an id is new. A filter hit is either a real duplicate or a false positive, and only hits
+    are remembered. check_complete_graph then resolves the hits exactly in a verification pass over the spill files, so
+    every violation the exact checker reports is still caught, but at the end of the graph rather than as soon as the
+    offending model is checked.
+
+    Used node id's aren't filtered: in a valid graph every node is used, so a used node id filter would hit on every
+    node and never spare the exact unused node check.
+
+    Exact duplicate nodes are dropped as they're checked when both the node's id and its contents hit the filters. The
+    contents filter is much more accurate than the others, since a false positive there loses a node. The verification
+    pass confirms every drop.
+    """
+
+    # The node contents filter's error rate relative to error_rate
+    __NODE_CONTENTS_ERROR_RATE_FACTOR = 1e-6
+
+    # Upper bound on the number of node id's held in memory by the exact unused node check
+    __UNUSED_NODE_CHECK_PARTITION_SIZE = 1000000
+
+    def __init__(self, *, capacity: int = 1000000, error_rate: float = 0.001):
+        """
+        :param capacity: expected number of nodes/edges, the filters grow past this at some cost
+        :param error_rate: false positive rate of the filters
+        """
+        self._logger = logging.getLogger(self.__class__.__name__)
+        filter_kwds = {"capacity": capacity, "error_rate": error_rate}
+        self.__directory_path = Path(mkdtemp())
+        self.__edge_candidate_ids = set()
+        self.__edge_id_filter = BloomFilter(**filter_kwds)
+        self.__edge_spill_file = _SpillFile(self.__directory_path / "edges")
+        # node id -> [(position, node)] of nodes dropped as exact duplicates
+        self.__node_candidates: Dict[str, List[Tuple[int, KgNode]]] = {}
+        self.__node_contents_filter = BloomFilter(
+            capacity=capacity, error_rate=error_rate * self.__NODE_CONTENTS_ERROR_RATE_FACTOR
+        )
+        self.__node_id_filter = BloomFilter(**filter_kwds)
+        self.__node_spill_file = _SpillFile(self.__directory_path / "nodes")
+        self.__position = 0
+        self.__used_node_id_spill_file = _SpillFile(self.__directory_path / "used_node_ids")
+
+    def add_used_node_id(self, node_id: str) -> None:
+        self.__used_node_id_spill_file.append(node_id)
+
+    def check_complete_graph(self) -> None:
+        self._logger.info(
+            "verifying %d node and %d edge filter hits",
+            len(self.__node_candidates),
+            len(self.__edge_candidate_ids),
+        )
+        violations = []
+        violations.extend(self.__verify_node_candidates())
+        violations.extend(self.__verify_edge_candidates())
+        if violations:
+            # Report the violation the exact checker would have reported first
+            raise min(violations, key=lambda violation: violation[0])[1]
+
+        self.__check_unused_nodes()
+
+    def __check_unused_nodes(self) -> None:
+        # Take the exact difference of the node id's and the used node id's, one hash partition of the node id's at a
+        # time to bound memory.
+        unused_node_ids = []
+        partition_count = max(1, math.ceil(len(self.__node_spill_file) / self.__UNUSED_NODE_CHECK_PARTITION_SIZE))
+        for partition_i in range(partition_count):
+            def in_partition(node_id: str) -> bool:
+                return partition_count == 1 or zlib.crc32(node_id.encode("utf-8")) % partition_count == partition_i
+
+            partition_node_ids = {node.id for _, node in self.__node_spill_file if in_partition(node.id)}
+            for used_node_id in self.__used_node_id_spill_file:
+                partition_node_ids.discard(used_node_id)
+            if partition_node_ids:
+                unused_node_ids.append(min(partition_node_ids))
+        if unused_node_ids:
+            raise ValueError("node %s not used by an edge" % min(unused_node_ids))
+
+    def check_kg_edge(self, edge: KgEdge) -> None:
+        position = self.__next_position()
+        if self.__edge_id_filter.add(edge.id):
+            self.__edge_candidate_ids.add(edge.id)
+        self.__edge_spill_file.append((position, edge))
+
+    def check_kg_node(self, node: KgNode) -> bool:
+        position = self.__next_position()
+        if not self.__node_id_filter.add(node.id):
+            # Common case: a node id we haven't seen before
+            self.__node_contents_filter.add(repr(node))
+            self.__node_spill_file.append((position, node))
+            return True
+
+        # The node id has probably been seen before
+        dropped_nodes = self.__node_candidates.setdefault(node.id, [])
+        if self.__node_contents_filter.add(repr(node)):
+            # Probably an exact duplicate of a previous node
+            dropped_nodes.append((position, node))
+            return False
+        # Definitely not an exact duplicate. Either the id filter hit was a false positive or this node conflicts with
+        # a previous node with the same id. The verification pass will tell.
+        self.__node_spill_file.append((position, node))
+        return True
+
+    def close(self):
+        try:
+            for spill_file in (self.__edge_spill_file, self.__node_spill_file, self.__used_node_id_spill_file):
+                spill_file.close()
+        finally:
+            rmtree(self.__directory_path)
+
+    def __next_position(self) -> int:
+        position = self.__position
+        self.__position += 1
+        return position
+
+    def __verify_edge_candidates(self) -> List[Tuple[int, ValueError]]:
+        if not self.__edge_candidate_ids:
+            return []
+
+        edges_by_id = {}
+        for position, edge in self.__edge_spill_file:
+            if edge.id in self.__edge_candidate_ids:
+                edges_by_id.setdefault(edge.id, []).append((position, edge))
+
+        violations = []
+        for edges in edges_by_id.values():
+            if len(edges) < 2:
+                # False positive
+                continue
+            (_, original_edge), (duplicate_position, duplicate_edge) = edges[0], edges[1]
+            violations.append((duplicate_position, ValueError(
+                "duplicate edge: original=%s, duplicate=%s"
+                % (original_edge, duplicate_edge)
+            )))
+        return violations
+
+    def __verify_node_candidates(self) -> List[Tuple[int, ValueError]]:
+        if not self.__node_candidates:
+            return []
+
+        # node id -> [(position, node, dropped)]
+        nodes_by_id = {
+            node_id: [(position, node, True) for position, node in dropped_nodes]
+            for node_id, dropped_nodes in self.__node_candidates.items()
+        }
+        for position, node in self.__node_spill_file:
+            nodes = nodes_by_id.get(node.id)
+            if nodes is not None:
+                nodes.append((position, node, False))
+
+        violations = []
+        for nodes in nodes_by_id.values():
+            nodes.sort(key=lambda node: node[0])
+            _, original_node, original_dropped = nodes[0]
+            if original_dropped:
+                # Both the id and the contents filters gave false positives, and a node was lost.
+                raise RuntimeError(
+                    "Bloom filter false positive dropped node %s, rerun with the exact whole graph check" % (original_node,)
+                )
+            for position, node, _ in nodes[1:]:
+                if node != original_node:
+                    violations.append((position, ValueError(
+                        "nodes with same id, different contents: original=%s, duplicate=%s"
+                        % (original_node, node)
+                    )))
+                    break
+        return violations
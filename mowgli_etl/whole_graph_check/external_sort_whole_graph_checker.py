@@ -0,0 +1,152 @@
+import logging
+from pathlib import Path
+from shutil import rmtree
+from tempfile import mkdtemp
+from typing import Generator, Iterable, Optional, Tuple
+
+from mowgli_etl.model.kg_edge import KgEdge
+from mowgli_etl.model.kg_node import KgNode
+from mowgli_etl.storage.bloom_filter import BloomFilter
+from mowgli_etl.storage.kg_edge_codec import KgEdgeCodec
+from mowgli_etl.storage.kg_node_codec import KgNodeCodec
+from mowgli_etl.whole_graph_check._sorted_runs import _SortedRuns
+from mowgli_etl.whole_graph_check._whole_graph_checker import _WholeGraphChecker
+
+
+class ExternalSortWholeGraphChecker(_WholeGraphChecker):
+    """
+    Whole graph checker for graphs bigger than RAM that replaces random-access lookups with an external sort.
+
+    Node records (id, position, encoded node), edge records (id, position, encoded edge), and used node id's are
+    spilled to sorted run files with bounded memory. check_complete_graph k-way merges the runs and finds conflicting
+    nodes, duplicate edges, and unused nodes in one sequential pass over each stream. It raises the same errors as the
+    exact checker, but at the end of the graph rather than as soon as the offending model is checked.
+
+    Exact duplicate nodes have to be dropped as they're checked, before the sort. A node is dropped when its contents
+    hit a very accurate Bloom filter. The merge pass confirms every drop.
+    """
+
+    def __init__(self, *, capacity: int = 1000000, error_rate: float = 1e-9, run_size: int = 1000000):
+        """
+        :param capacity: expected number of nodes, the node contents filter grows past this at some cost
+        :param error_rate: false positive rate of the node contents filter
+        :param run_size: number of records per sorted run, bounds the memory used by each of the three sorts
+        """
+        self._logger = logging.getLogger(self.__class__.__name__)
+        self.__directory_path = Path(mkdtemp())
+        self.__edge_codec = KgEdgeCodec()
+        self.__node_codec = KgNodeCodec()
+        self.__node_contents_filter = BloomFilter(capacity=capacity, error_rate=error_rate)
+        self.__position = 0
+        sorted_runs_kwds = {"directory_path": self.__directory_path, "run_size": run_size}
+        # (edge id, position, encoded edge)
+        self.__edge_runs = _SortedRuns(name="edges", **sorted_runs_kwds)
+        # (node id, position, encoded node, dropped)
+        self.__node_runs = _SortedRuns(name="nodes", **sorted_runs_kwds)
+        self.__used_node_id_runs = _SortedRuns(name="used_node_ids", **sorted_runs_kwds)
+
+    def add_used_node_id(self, node_id: str) -> None:
+        self.__used_node_id_runs.append(node_id)
+
+    def add_used_node_ids(self, node_ids: Iterable[str]) -> None:
+        append = self.__used_node_id_runs.append
+        for node_id in node_ids:
+            append(node_id)
+
+    def check_complete_graph(self) -> None:
+        self._logger.info(
+            "merging sorted runs of %d nodes, %d edges, and %d used node id's",
+            len(self.__node_runs),
+            len(self.__edge_runs),
+            len(self.__used_node_id_runs),
+        )
+        violations = []
+        first_unused_node_id = None
+        for violation in self.__check_nodes():
+            if isinstance(violation, str):
+                first_unused_node_id = violation
+            else:
+                violations.append(violation)
+        violations.extend(self.__check_edges())
+        if violations:
+            # Report the violation the exact checker would have reported first
+            raise min(violations, key=lambda violation: violation[0])[1]
+        if first_unused_node_id is not None:
+            raise ValueError("node %s not used by an edge" % first_unused_node_id)
+
+    def __check_edges(self) -> Generator[Tuple[int, ValueError], None, None]:
+        previous_edge_id = None
+        original_encoded_edge = None
+        for edge_id, position, encoded_edge in self.__edge_runs:
+            if edge_id != previous_edge_id:
+                previous_edge_id = edge_id
+                original_encoded_edge = encoded_edge
+                continue
+            # Only the first duplicate of each edge can be the first violation
+            if original_encoded_edge is not None:
+                yield position, ValueError(
+                    "duplicate edge: original=%s, duplicate=%s"
+                    % (self.__edge_codec.decode(original_encoded_edge), self.__edge_codec.decode(encoded_edge))
+                )
+                original_encoded_edge = None
+
+    def __check_nodes(self) -> Generator[object, None, None]:
+        """
+        Merge the sorted node records with the sorted used node id's.
+
+        :return: (position, ValueError) for each conflicting node id, and the first unused node id as a str
+        """
+        used_node_ids = iter(self.__used_node_id_runs)
+        used_node_id = next(used_node_ids, None)
+        unused_node_id_found = False
+        previous_node_id = None
+        original_encoded_node: Optional[bytes] = None
+        for node_id, position, encoded_node, dropped in self.__node_runs:
+            if node_id == previous_node_id:
+                # Records with the same id are sorted by position, so this is a later node with a previously-seen id.
+                if original_encoded_node is not None and encoded_node != original_encoded_node:
+                    yield position, ValueError(
+                        "nodes with same id, different contents: original=%s, duplicate=%s"
+                        % (self.__node_codec.decode(original_encoded_node), self.__node_codec.decode(encoded_node))
+                    )
+                    original_encoded_node = None
+                continue
+
+            if dropped:
+                # The contents filter gave a false positive, and a node was lost.
+                raise RuntimeError(
+                    "Bloom filter false positive dropped node %s, rerun with the exact whole graph check"
+                    % (self.__node_codec.decode(encoded_node),)
+                )
+            previous_node_id = node_id
+            original_encoded_node = encoded_node
+
+            if unused_node_id_found:
+                continue
+            while used_node_id is not None and used_node_id < node_id:
+                used_node_id = next(used_node_ids, None)
+            if used_node_id != node_id:
+                unused_node_id_found = True
+                yield node_id
+
+    def check_kg_edge(self, edge: KgEdge) -> None:
+        self.__edge_runs.append((edge.id, self.__next_position(), self.__edge_codec.encode(edge)))
+
+    def check_kg_node(self, node: KgNode) -> bool:
+        position = self.__next_position()
+        encoded_node = self.__node_codec.encode(node)
+        dropped = self.__node_contents_filter.add(repr(node))
+        self.__node_runs.append((node.id, position, encoded_node, dropped))
+        return not dropped
+
+    def close(self):
+        try:
+            for sorted_runs in (self.__edge_runs, self.__node_runs, self.__used_node_id_runs):
+                sorted_runs.close()
+        finally:
+            rmtree(self.__directory_path)
+
+    def __next_position(self) -> int:
+        position = self.__position
+        self.__position += 1
+        return position
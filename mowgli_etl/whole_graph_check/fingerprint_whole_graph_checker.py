@@ -0,0 +1,152 @@
+import struct
+from hashlib import blake2b
+from pathlib import Path
+from shutil import rmtree
+from tempfile import mkdtemp
+from typing import Iterable, Optional
+
+from mowgli_etl.model.kg_edge import KgEdge
+from mowgli_etl.model.kg_node import KgNode
+from mowgli_etl.storage.kg_edge_codec import KgEdgeCodec
+from mowgli_etl.storage.kg_node_codec import KgNodeCodec
+from mowgli_etl.storage.level_db import LevelDb
+from mowgli_etl.storage.level_db_write_buffer import LevelDbWriteBuffer
+from mowgli_etl.whole_graph_check._spill_file import _SpillFile
+from mowgli_etl.whole_graph_check._whole_graph_checker import _WholeGraphChecker
+
+
+class FingerprintWholeGraphChecker(_WholeGraphChecker):
+    """
+    Exact whole graph checker keyed on fixed-width digests instead of ids and complete models.
+
+    - the node set maps a 128-bit digest of the node id to a 128-bit digest of the encoded node and the node's position
+    - the edge set maps a 128-bit digest of the edge id to the edge's position
+    - the used node id set contains 128-bit digests of node ids
+
+    Nothing is deserialized on the common path. Encoded nodes and edges are appended to sequential spill files, which
+    are only read to build the error message on a real conflict.
+
+    Violations are reported as soon as the offending model is checked, except for unused nodes, like WholeGraphChecker.
+    """
+
+    __DIGEST_SIZE = 16
+    __POSITION = struct.Struct("<Q")
+
+    def __init__(self):
+        self.__directory_path = Path(mkdtemp())
+        self.__edge_codec = KgEdgeCodec()
+        self.__node_codec = KgNodeCodec()
+        self.__edge_count = 0
+        self.__node_count = 0
+        self.__level_dbs = []
+        self.__write_buffers = []
+        self.__edge_set = self.__open_set("edges")
+        self.__node_set = self.__open_set("nodes")
+        self.__used_node_id_set = self.__open_set("used_node_ids")
+        self.__edge_spill_file = _SpillFile(self.__directory_path / "edges.spill")
+        self.__node_spill_file = _SpillFile(self.__directory_path / "nodes.spill")
+
+    def add_used_node_id(self, node_id: str) -> None:
+        self.__used_node_id_set.put(self.__digest(node_id.encode("utf-8")), b"")
+
+    def add_used_node_ids(self, node_ids: Iterable[str]) -> None:
+        put = self.__used_node_id_set.put
+        for node_id in node_ids:
+            put(self.__digest(node_id.encode("utf-8")), b"")
+
+    def check_complete_graph(self) -> None:
+        unused_node_id_digest = self.__first_unused_node_id_digest()
+        if unused_node_id_digest is None:
+            return
+        for encoded_node in self.__node_spill_file:
+            node = self.__node_codec.decode(encoded_node)
+            if self.__digest(node.id.encode("utf-8")) == unused_node_id_digest:
+                raise ValueError("node %s not used by an edge" % node.id)
+        raise RuntimeError("unused node id digest not found in the node spill file")
+
+    def check_kg_edge(self, edge: KgEdge) -> None:
+        edge_id_digest = self.__digest(edge.id.encode("utf-8"))
+        existing_edge_position = self.__edge_set.get(edge_id_digest)
+        if existing_edge_position is not None:
+            existing_edge = self.__edge_codec.decode(
+                self.__read_spilled(self.__edge_spill_file, self.__POSITION.unpack(existing_edge_position)[0])
+            )
+            self.__check_collision(existing_edge.id, edge.id)
+            raise ValueError(
+                "duplicate edge: original=%s, duplicate=%s"
+                % (existing_edge, edge)
+            )
+        self.__edge_set.put(edge_id_digest, self.__POSITION.pack(self.__edge_count))
+        self.__edge_spill_file.append(self.__edge_codec.encode(edge))
+        self.__edge_count += 1
+
+    def check_kg_node(self, node: KgNode) -> bool:
+        node_id_digest = self.__digest(node.id.encode("utf-8"))
+        encoded_node = self.__node_codec.encode(node)
+        node_digest = self.__digest(encoded_node)
+        existing_value = self.__node_set.get(node_id_digest)
+        if existing_value is None:
+            self.__node_set.put(node_id_digest, node_digest + self.__POSITION.pack(self.__node_count))
+            self.__node_spill_file.append(encoded_node)
+            self.__node_count += 1
+            return True
+        if existing_value[:self.__DIGEST_SIZE] == node_digest:
+            # Exact duplicate
+            return False
+        existing_node = self.__node_codec.decode(
+            self.__read_spilled(self.__node_spill_file, self.__POSITION.unpack_from(existing_value, self.__DIGEST_SIZE)[0])
+        )
+        self.__check_collision(existing_node.id, node.id)
+        raise ValueError(
+            "nodes with same id, different contents: original=%s, duplicate=%s"
+            % (existing_node, node)
+        )
+
+    @staticmethod
+    def __check_collision(existing_id: str, id: str) -> None:
+        if existing_id != id:
+            raise RuntimeError("digest collision between %s and %s" % (existing_id, id))
+
+    def close(self):
+        try:
+            for write_buffer in self.__write_buffers:
+                write_buffer.close()
+            for level_db in self.__level_dbs:
+                level_db.close()
+            self.__edge_spill_file.close()
+            self.__node_spill_file.close()
+        finally:
+            rmtree(self.__directory_path)
+
+    @classmethod
+    def __digest(cls, data: bytes) -> bytes:
+        return blake2b(data, digest_size=cls.__DIGEST_SIZE).digest()
+
+    def __first_unused_node_id_digest(self) -> Optional[bytes]:
+        # Both sets are sorted by digest, so merge them in one sequential pass instead of looking up every node.
+        for write_buffer in self.__write_buffers:
+            write_buffer.flush()
+        node_level_db, used_node_id_level_db = self.__level_dbs[1], self.__level_dbs[2]
+        with node_level_db.iterator(include_value=False) as node_id_digests, \
+                used_node_id_level_db.iterator(include_value=False) as used_node_id_digests:
+            used_node_id_digest = next(used_node_id_digests, None)
+            for node_id_digest in node_id_digests:
+                while used_node_id_digest is not None and used_node_id_digest < node_id_digest:
+                    used_node_id_digest = next(used_node_id_digests, None)
+                if used_node_id_digest != node_id_digest:
+                    return node_id_digest
+        return None
+
+    def __open_set(self, name: str) -> LevelDbWriteBuffer:
+        level_db = LevelDb(directory_path=self.__directory_path / name)
+        self.__level_dbs.append(level_db)
+        write_buffer = LevelDbWriteBuffer(level_db)
+        self.__write_buffers.append(write_buffer)
+        return write_buffer
+
+    @staticmethod
+    def __read_spilled(spill_file: _SpillFile, position: int) -> bytes:
+        for record_i, record in enumerate(spill_file):
+            if record_i == position:
+                return record
+        raise IndexError(position)
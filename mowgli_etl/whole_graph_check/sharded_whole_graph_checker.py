@@ -0,0 +1,166 @@
+import logging
+import multiprocessing
+import queue
+import zlib
+from typing import Generator, List, Sequence, Tuple
+
+from mowgli_etl._closeable import _Closeable
+from mowgli_etl.model.kg_edge import KgEdge
+from mowgli_etl.model.kg_node import KgNode
+from mowgli_etl.model.model import Model
+from mowgli_etl.whole_graph_check.whole_graph_checker import WholeGraphChecker
+
+
+def _shard_worker(in_queue: multiprocessing.Queue, out_queue: multiprocessing.Queue) -> None:
+    """
+    Worker process entry point. Owns the WholeGraphChecker for one shard of the graph.
+
+    Requests on in_queue:
+    ("check", ((model index, KgNode | KgEdge | used node id), ...)) -> (skipped model indices, (model index, exception) or None)
+    ("unused",) -> (first unused node id or None, exception or None)
+    None -> close the checker and exit
+    """
+    with WholeGraphChecker.temporary() as checker:
+        while True:
+            request = in_queue.get()
+            if request is None:
+                return
+            elif request[0] == "check":
+                skipped_model_indices = []
+                error = None
+                # Used node id's only matter to the final unused node check, so add them in one batch.
+                used_node_ids = []
+                for model_index, op in request[1]:
+                    try:
+                        if isinstance(op, str):
+                            used_node_ids.append(op)
+                        elif isinstance(op, KgNode):
+                            if not checker.check_kg_node(op):
+                                skipped_model_indices.append(model_index)
+                        else:
+                            checker.check_kg_edge(op)
+                    except Exception as e:
+                        error = (model_index, e)
+                        break
+                checker.add_used_node_ids(used_node_ids)
+                out_queue.put((skipped_model_indices, error))
+            elif request[0] == "unused":
+                try:
+                    out_queue.put((next(checker.unused_node_ids(), None), None))
+                except Exception as e:
+                    out_queue.put((None, e))
+            else:
+                raise ValueError(request[0])
+
+
+class ShardedWholeGraphChecker(_Closeable):
+    """
+    Parallel version of WholeGraphChecker.
+
+    Nodes and edges are partitioned by a hash of their id's across worker processes, each of which owns a shard of the
+    node, edge, and used node id sets. Edges also send their subject and object id's to the shards that own those nodes,
+    so that the final "node not used by an edge" check can run per shard.
+
+    Models are checked in batches: submit a batch, then collect it to get the batch's models back in their original
+    order, minus exact duplicate nodes. collect raises the same ValueError the serial check would have raised, after
+    yielding the models that preceded the offending model. Up to two batches can be outstanding, so the caller can
+    prepare the next batch while the workers check the current one.
+    """
+
+    def __init__(self, *, worker_count: int):
+        if worker_count < 1:
+            raise ValueError("worker_count must be >= 1")
+        self._logger = logging.getLogger(self.__class__.__name__)
+        self.__in_queues = []
+        self.__out_queues = []
+        self.__processes = []
+        for worker_i in range(worker_count):
+            in_queue = multiprocessing.Queue()
+            out_queue = multiprocessing.Queue()
+            process = multiprocessing.Process(
+                target=_shard_worker,
+                args=(in_queue, out_queue),
+                name=f"WholeGraphCheckWorker-{worker_i}",
+                daemon=True,
+            )
+            process.start()
+            self.__in_queues.append(in_queue)
+            self.__out_queues.append(out_queue)
+            self.__processes.append(process)
+        self._logger.info("started %d whole graph check workers", worker_count)
+
+    def check_complete_graph(self) -> None:
+        """
+        Check that every node is used by at least one edge.
+
+        Call after all submitted batches have been collected.
+        """
+        for in_queue in self.__in_queues:
+            in_queue.put(("unused",))
+        unused_node_ids = []
+        for worker_i in range(len(self.__processes)):
+            unused_node_id, error = self.__get_response(worker_i)
+            if error is not None:
+                raise error
+            if unused_node_id is not None:
+                unused_node_ids.append(unused_node_id)
+        if unused_node_ids:
+            # Report the same node the serial check would have reported, if the sets iterate in key order.
+            raise ValueError("node %s not used by an edge" % min(unused_node_ids))
+
+    def close(self):
+        for in_queue, process in zip(self.__in_queues, self.__processes):
+            if process.is_alive():
+                in_queue.put(None)
+        for process in self.__processes:
+            process.join()
+        for queue_ in self.__in_queues + self.__out_queues:
+            queue_.close()
+        self.__in_queues = []
+        self.__out_queues = []
+        self.__processes = []
+
+    def collect(self, batch: Sequence[Model]) -> Generator[Model, None, None]:
+        """
+        Collect the results of checking the oldest submitted batch, which must be passed in again.
+        """
+        skipped_model_indices = set()
+        first_error = None
+        for worker_i in range(len(self.__processes)):
+            worker_skipped_model_indices, worker_error = self.__get_response(worker_i)
+            skipped_model_indices.update(worker_skipped_model_indices)
+            if worker_error is not None and (first_error is None or worker_error[0] < first_error[0]):
+                first_error = worker_error
+
+        for model_i, model in enumerate(batch):
+            if first_error is not None and model_i == first_error[0]:
+                raise first_error[1]
+            if model_i not in skipped_model_indices:
+                yield model
+
+    def __get_response(self, worker_i: int):
+        while True:
+            try:
+                return self.__out_queues[worker_i].get(timeout=1.0)
+            except queue.Empty:
+                if not self.__processes[worker_i].is_alive():
+                    raise RuntimeError(f"whole graph check worker {worker_i} exited unexpectedly")
+
+    def __shard(self, id_: str) -> int:
+        # Python's hash() of a str is salted per process, use a stable hash instead.
+        return zlib.crc32(id_.encode("utf-8")) % len(self.__processes)
+
+    def submit(self, batch: Sequence[Model]) -> None:
+        """
+        Submit a batch of models to be checked. Models other than nodes and edges are passed through unchecked.
+        """
+        worker_ops: Tuple[List[Tuple[int, object]], ...] = tuple([] for _ in self.__processes)
+        for model_i, model in enumerate(batch):
+            if isinstance(model, KgNode):
+                worker_ops[self.__shard(model.id)].append((model_i, model))
+            elif isinstance(model, KgEdge):
+                worker_ops[self.__shard(model.id)].append((model_i, model))
+                worker_ops[self.__shard(model.subject)].append((model_i, model.subject))
+                worker_ops[self.__shard(model.object)].append((model_i, model.object))
+        for in_queue, ops in zip(self.__in_queues, worker_ops):
+            in_queue.put(("check", ops))
@@ -0,0 +1,51 @@
+"""
+Benchmark the whole graph checkers on a valid graph, checking every model and then the complete graph: models/s.
+
+python -m mowgli_etl.whole_graph_check.whole_graph_check_benchmark [node count]
+"""
+
+import sys
+import timeit
+
+from mowgli_etl.model.concept_net_predicates import RELATED_TO
+from mowgli_etl.model.kg_edge import KgEdge
+from mowgli_etl.model.kg_node import KgNode
+from mowgli_etl.whole_graph_check.bloom_filter_whole_graph_checker import BloomFilterWholeGraphChecker
+from mowgli_etl.whole_graph_check.external_sort_whole_graph_checker import ExternalSortWholeGraphChecker
+from mowgli_etl.whole_graph_check.whole_graph_checker import WholeGraphChecker
+
+
+def main(node_count: int = 100000) -> None:
+    # Nodes and the edges that use them, interleaved like a pipeline's output, with some exact duplicate nodes
+    models = []
+    for node_i in range(0, node_count, 2):
+        nodes = tuple(
+            KgNode.legacy(datasource="benchmark", id=f"benchmark:node{node_i + pair_i}", label=f"node {node_i + pair_i}", pos="n")
+            for pair_i in range(2)
+        )
+        models.extend(nodes)
+        if node_i % 10 == 0:
+            models.append(nodes[0])
+        models.append(KgEdge.legacy(datasource="benchmark", object=nodes[1].id, predicate=RELATED_TO, subject=nodes[0].id, weight=1.0))
+
+    def check(create_checker) -> None:
+        with create_checker() as checker:
+            for model in models:
+                if isinstance(model, KgNode):
+                    checker.check_kg_node(model)
+                else:
+                    checker.check_kg_edge(model)
+                    checker.add_used_node_ids((model.subject, model.object))
+            checker.check_complete_graph()
+
+    for name, create_checker in (
+            ("exact", WholeGraphChecker.temporary),
+            ("external_sort", ExternalSortWholeGraphChecker),
+            ("bloom_filter", BloomFilterWholeGraphChecker),
+    ):
+        check_s = min(timeit.repeat(lambda: check(create_checker), number=1, repeat=3))
+        print("%-16s %10.0f models/s" % (name, len(models) / check_s))
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
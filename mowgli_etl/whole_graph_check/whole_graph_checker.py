@@ -0,0 +1,148 @@
+import sys
+from pathlib import Path
+from typing import Generator, Iterable, Optional
+
+from mowgli_etl.model.kg_edge import KgEdge
+from mowgli_etl.model.kg_node import KgNode
+from mowgli_etl.storage._id_set import _IdSet
+from mowgli_etl.storage._kg_edge_set import _KgEdgeSet
+from mowgli_etl.storage._kg_node_set import _KgNodeSet
+from mowgli_etl.whole_graph_check._whole_graph_checker import _WholeGraphChecker
+
+try:
+    from mowgli_etl.storage.persistent_kg_edge_set import PersistentKgEdgeSet as EdgeSet
+    from mowgli_etl.storage.persistent_id_set import PersistentIdSet as NodeIdSet
+    from mowgli_etl.storage.persistent_kg_node_set import PersistentKgNodeSet as NodeSet
+except ImportError:
+    from mowgli_etl.storage.mem_kg_edge_set import MemKgEdgeSet as EdgeSet
+    from mowgli_etl.storage.mem_id_set import MemIdSet as NodeIdSet
+    from mowgli_etl.storage.mem_kg_node_set import MemKgNodeSet as NodeSet
+
+
+class WholeGraphChecker(_WholeGraphChecker):
+    """
+    Exact whole graph checker backed by node, edge, and used node id sets.
+
+    Violations are reported as soon as the offending model is checked, except for unused nodes.
+    """
+
+    def __init__(self, *, edge_set: _KgEdgeSet, node_set: _KgNodeSet, used_node_ids_set: _IdSet):
+        self.__edge_set = edge_set
+        self.__node_set = node_set
+        self.__used_node_ids_set = used_node_ids_set
+        # Set by checkpointed
+        self.__undo_file_directory_path: Optional[Path] = None
+
+    def add_used_node_id(self, node_id: str) -> None:
+        self.__used_node_ids_set.add(node_id)
+
+    def add_used_node_ids(self, node_ids: Iterable[str]) -> None:
+        self.__used_node_ids_set.add_many(node_ids)
+
+    def check_complete_graph(self) -> None:
+        for node_id in self.unused_node_ids():
+            raise ValueError("node %s not used by an edge" % node_id)
+
+    def check_kg_edge(self, edge: KgEdge) -> None:
+        # Edges should be unique in the CSKG, meaning that the tuple of (subject, predicate, object) should be unique.
+        existing_edge = self.__edge_set.get(edge.id)
+        if existing_edge is not None:
+            # Don't try to handle the exact duplicate case differently. It should never happen.
+            raise ValueError(
+                "duplicate edge: original=%s, duplicate=%s"
+                % (existing_edge, edge)
+            )
+        self.__edge_set.add(edge)
+
+    def check_kg_node(self, node: KgNode) -> bool:
+        # KgNode ID's should be unique in the CSKG.
+        existing_node = self.__node_set.get(node.id)
+        if existing_node is None:
+            self.__node_set.add(node)
+            return True
+        if existing_node == node:
+            # Common case: ignore exact duplicate nodes i.e., nodes that are the same in all fields.
+            # This happens frequently in the word association sources, where the same word can come
+            # up as a response to multiple cues.
+            return False
+        # Throw an exception if two nodes have the same id but aren't the same in all of their fields
+        raise ValueError(
+            "nodes with same id, different contents: original=%s, duplicate=%s"
+            % (existing_node, node)
+        )
+
+    def close(self):
+        try:
+            self.__edge_set.close()
+        finally:
+            try:
+                self.__node_set.close()
+            finally:
+                self.__used_node_ids_set.close()
+
+    @classmethod
+    def checkpointed(cls, directory_path: Path, *, committed_generation: Optional[int] = None):
+        """
+        Factory method to create a checker for a checkpointed run, backed by persistent sets in the given directory.
+
+        Additions are buffered in memory until flush is called with a generation at a checkpoint, and discarded on close.
+        Each set's flush is undoable, so reopening the directory with the generation of the last committed checkpoint
+        rolls back any flush after it, and resumes checking from that checkpoint. A crash between the flush and the
+        commit of a checkpoint therefore can't leave the sets ahead of it.
+
+        Requires plyvel.
+
+        :param committed_generation: generation of the last committed checkpoint, or None if there is none
+        """
+        from mowgli_etl.storage.persistent_id_set import PersistentIdSet
+        from mowgli_etl.storage.persistent_kg_edge_set import PersistentKgEdgeSet
+        from mowgli_etl.storage.persistent_kg_node_set import PersistentKgNodeSet
+
+        directory_path.mkdir(parents=True, exist_ok=True)
+        set_kwds = {"create_if_missing": True, "flush_on_close": False, "write_batch_size": sys.maxsize}
+        checker = cls(
+            edge_set=PersistentKgEdgeSet(directory_path=directory_path / "edges", **set_kwds),
+            node_set=PersistentKgNodeSet(directory_path=directory_path / "nodes", **set_kwds),
+            used_node_ids_set=PersistentIdSet(directory_path=directory_path / "used_node_ids", **set_kwds),
+        )
+        checker.__undo_file_directory_path = directory_path
+        for name, set_ in checker.__named_sets():
+            set_.undo_flush(directory_path / (name + ".undo"), committed_generation=committed_generation)
+        return checker
+
+    def flush(self, *, generation: Optional[int] = None) -> None:
+        """
+        Write buffered additions to the underlying sets.
+
+        :param generation: if specified, generation of the checkpoint that's about to be committed, for a checker created
+        with checkpointed. The flush is undoable until then.
+        """
+        if generation is not None and self.__undo_file_directory_path is None:
+            raise ValueError("only a checkpointed checker can flush a generation")
+        for name, set_ in self.__named_sets():
+            if generation is not None:
+                set_.flush_undoably(self.__undo_file_directory_path / (name + ".undo"), generation=generation)
+            else:
+                set_.flush()
+
+    def __named_sets(self):
+        return (
+            ("edges", self.__edge_set),
+            ("nodes", self.__node_set),
+            ("used_node_ids", self.__used_node_ids_set),
+        )
+
+    @classmethod
+    def temporary(cls):
+        """
+        Factory method to create a checker backed by temporary sets.
+        """
+        return cls(edge_set=EdgeSet.temporary(), node_set=NodeSet.temporary(), used_node_ids_set=NodeIdSet.temporary())
+
+    def unused_node_ids(self) -> Generator[str, None, None]:
+        """
+        Iterate over the ids of checked nodes that are not used by any edge.
+        """
+        for node_id in self.__node_set.keys():
+            if node_id not in self.__used_node_ids_set:
+                yield node_id
@@ -0,0 +1,54 @@
+from configargparse import ArgParser
+
+import mowgli_etl.cli.commands.etl_command
+from mowgli_etl.cli.commands.etl_command import EtlCommand
+
+
+class _MockMappers:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+
+def _add_global_args(arg_parser: ArgParser):
+    # The Cli's global arguments
+    arg_parser.add_argument("-c", is_config_file=True)
+    arg_parser.add_argument("--debug", action="store_true")
+    arg_parser.add_argument("--logging-level")
+
+
+def _pipeline_arguments(monkeypatch, tmp_path, *args) -> dict:
+    """
+    Run the etl command without running the pipeline, and return the pipeline arguments recorded in the incremental
+    run manifest.
+    """
+    run_kwds = {}
+
+    class MockPipelineWrapper:
+        def __init__(self, **kwds):
+            pass
+
+        def run(self, **kwds):
+            run_kwds.update(kwds)
+
+    monkeypatch.setattr(mowgli_etl.cli.commands.etl_command, "Mappers", _MockMappers)
+    monkeypatch.setattr(mowgli_etl.cli.commands.etl_command, "PipelineWrapper", MockPipelineWrapper)
+    etl_command = EtlCommand()
+    arg_parser = ArgParser()
+    subparsers = arg_parser.add_subparsers(dest="command")
+    subparser = subparsers.add_parser("etl")
+    _add_global_args(subparser)
+    etl_command.add_arguments(subparser, _add_global_args)
+    etl_command(arg_parser.parse_args(["etl", "usf", "--data-dir-path", str(tmp_path), *args]))
+    return run_kwds["pipeline_arguments"]
+
+
+def test_pipeline_arguments_exclude_debug(monkeypatch, tmp_path):
+    assert _pipeline_arguments(monkeypatch, tmp_path, "--debug") == _pipeline_arguments(monkeypatch, tmp_path)
+
+
+def test_pipeline_arguments_exclude_loader_threads(monkeypatch, tmp_path):
+    assert _pipeline_arguments(monkeypatch, tmp_path, "--loader-threaded", "--loader-compression-threads", "4") \
+        == _pipeline_arguments(monkeypatch, tmp_path)
@@ -0,0 +1,31 @@
+import pstats
+import signal
+
+from mowgli_etl.cli.sampling_profiler import SamplingProfiler
+
+
+def busy() -> int:
+    total = 0
+    for i in range(3000000):
+        total += i * i
+    return total
+
+
+if hasattr(signal, "SIGPROF"):
+    def test_profile(tmp_path):
+        with SamplingProfiler() as profiler:
+            busy()
+        assert profiler.sample_count > 0
+
+        collapsed_stacks_file_path = tmp_path / "profile.collapsed"
+        profiler.write_collapsed_stacks(collapsed_stacks_file_path)
+        lines = collapsed_stacks_file_path.read_text().splitlines()
+        assert any("tests.mowgli_etl_test.cli.test_sampling_profiler:busy:" in line for line in lines)
+        for line in lines:
+            stack, count = line.rsplit(" ", 1)
+            assert int(count) > 0
+
+        pstats_file_path = tmp_path / "profile.pstats"
+        profiler.write_pstats(pstats_file_path)
+        stats = pstats.Stats(str(pstats_file_path))
+        assert any(function_name == "busy" for _, _, function_name in stats.stats)
@@ -1,3 +1,5 @@
+import gzip
+
 from mowgli_etl.model.kg_edge import KgEdge
 from mowgli_etl.model.kg_node import KgNode
 from mowgli_etl.loader.cskg_csv.cskg_csv_loader import CskgCsvLoader
@@ -59,3 +61,16 @@ def test_write_edge(pipeline_storage):
 
     with open(pipeline_storage.loaded_data_dir_path / "nodes.csv") as f:
         assert f.read() == _EXPECTED_NODE_HEADER + '\n'
+
+
+def test_write_compressed(pipeline_storage):
+    test_node = KgNode.legacy(datasource='test_datasource', id='test_nid', label='Test KgNode')
+
+    with CskgCsvLoader(compression="gzip", compression_threads=2).open(pipeline_storage) as loader:
+        loader.load_kg_node(test_node)
+
+    assert not (pipeline_storage.loaded_data_dir_path / "nodes.csv").exists()
+    with gzip.open(pipeline_storage.loaded_data_dir_path / "nodes.csv.gz", "rt") as f:
+        assert f.read() == _EXPECTED_NODE_HEADER + '\n' + 'test_nid\tTest KgNode\t\t\ttest_datasource\t\n'
+    with gzip.open(pipeline_storage.loaded_data_dir_path / "edges.csv.gz", "rt") as f:
+        assert f.read() == _EXPECTED_EDGE_HEADER + '\n'
@@ -1,5 +1,6 @@
 from itertools import islice
 
+from mowgli_etl.loader.json._json_loader import _JsonLoader
 from mowgli_etl.loader.json.json_edge_loader import JsonEdgeLoader
 from mowgli_etl.model.kg_edge import KgEdge
 from mowgli_etl.pipeline_storage import PipelineStorage
@@ -17,3 +18,18 @@ def test_load_edge(graph_generator, pipeline_storage: PipelineStorage):
         edges = json.load(json_file)
         assert isinstance(edges, list)
         assert len(edges) > 0
+
+
+def test_load_edge_same_as_json_dump(graph_generator, pipeline_storage: PipelineStorage):
+    edges = [edge for edge in islice(graph_generator, 100) if isinstance(edge, KgEdge)]
+    with JsonEdgeLoader().open(pipeline_storage) as loader:
+        for edge in edges:
+            loader.load_kg_edge(edge)
+    file_path = pipeline_storage.loaded_data_dir_path / "edges.json"
+    assert file_path.read_text() == json.dumps(_JsonLoader._convert_to_json(edges), indent=4)
+
+
+def test_load_no_edges(pipeline_storage: PipelineStorage):
+    with JsonEdgeLoader().open(pipeline_storage):
+        pass
+    assert (pipeline_storage.loaded_data_dir_path / "edges.json").read_text() == "[]"
@@ -0,0 +1,71 @@
+from mowgli_etl.loader.json.model_json_encoders import encode_json
+from mowgli_etl.model.benchmark_answer import BenchmarkAnswer
+from mowgli_etl.model.benchmark_answer_explanation import BenchmarkAnswerExplanation
+from mowgli_etl.model.benchmark_question_answer_path import BenchmarkQuestionAnswerPath
+from mowgli_etl.model.benchmark_question_answer_paths import BenchmarkQuestionAnswerPaths
+from mowgli_etl.model.benchmark_question_choice import BenchmarkQuestionChoice
+from mowgli_etl.model.benchmark_question_choice_analysis import BenchmarkQuestionChoiceAnalysis
+from mowgli_etl.model.benchmark_question_choice_type import BenchmarkQuestionChoiceType
+from mowgli_etl.model.kg_edge import KgEdge
+
+
+def test_encode_benchmark_answer():
+    answer = BenchmarkAnswer(
+        choice_id="c0",
+        question_id="q0",
+        submission_id="s0",
+        explanation=BenchmarkAnswerExplanation(
+            choice_analyses=(
+                BenchmarkQuestionChoiceAnalysis(
+                    choice_id="c0",
+                    question_answer_paths=(
+                        BenchmarkQuestionAnswerPaths(
+                            start_node_id="n0",
+                            end_node_id="n1",
+                            paths=(BenchmarkQuestionAnswerPath(path=("n0", "p", "n1"), score=0.5),),
+                            score=0.25,
+                        ),
+                    ),
+                ),
+            )
+        ),
+    )
+    assert encode_json(answer) == {
+        "choiceId": "c0",
+        "questionId": "q0",
+        "submissionId": "s0",
+        "explanation": {
+            "choiceAnalyses": [
+                {
+                    "choiceId": "c0",
+                    "questionAnswerPaths": [
+                        {
+                            "startNodeId": "n0",
+                            "endNodeId": "n1",
+                            "paths": [{"path": ["n0", "p", "n1"], "score": 0.5}],
+                            "score": 0.25,
+                        }
+                    ],
+                }
+            ]
+        },
+    }
+
+
+def test_encode_skips_none():
+    assert encode_json(BenchmarkAnswer(choice_id="c0", question_id="q0", submission_id="s0")) == \
+        {"choiceId": "c0", "questionId": "q0", "submissionId": "s0"}
+    edge = KgEdge.legacy(datasource="test", object="o", predicate="p", subject="s")
+    assert encode_json(edge) == \
+        {"id": "s-p-o", "object": "o", "predicate": "p", "sourceIds": ["test"], "subject": "s"}
+
+
+def test_encode_enum():
+    choice = BenchmarkQuestionChoice(
+        id="c0", identifier="A", position=0, text="Choice", type=BenchmarkQuestionChoiceType.ANSWER
+    )
+    assert encode_json(choice)["type"] == "ANSWER"
+
+
+def test_encode_tuple():
+    assert encode_json(("a", ("b",), None)) == ["a", ["b"], None]
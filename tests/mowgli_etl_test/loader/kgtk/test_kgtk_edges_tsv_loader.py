@@ -1,6 +1,11 @@
+from itertools import islice
+
+import pytest
+
 from mowgli_etl.loader.kgtk.kgtk_edges_tsv_loader import KgtkEdgesTsvLoader
 from mowgli_etl.model.kg_edge import KgEdge
 from mowgli_etl.model.kg_node import KgNode
+from mowgli_etl.pipeline_storage import PipelineStorage
 
 
 def test_load(graph_generator, pipeline_storage):
@@ -24,3 +29,47 @@ def test_load(graph_generator, pipeline_storage):
 node1\trelation\tnode2\tnode1;label\tnode2;label\trelation;label\trelation;dimension\tweight\tsource\torigin\tsentence\tquestion\tid
 test_node_1\ttest_predicate\ttest_node_2\ttest node\ttest node\t\t\t\ttest_datasource\t\t\t\ttest_node_1-test_predicate-test_node_2
 """
+
+
+def _load(graph, storage, **loader_kwds) -> str:
+    with KgtkEdgesTsvLoader(**loader_kwds).open(storage) as loader:
+        for edge_or_node in graph:
+            if isinstance(edge_or_node, KgNode):
+                loader.load_kg_node(edge_or_node)
+            else:
+                loader.load_kg_edge(edge_or_node)
+    with open(storage.loaded_data_dir_path / "edges.tsv") as f:
+        return f.read()
+
+
+@pytest.mark.parametrize("in_memory_node_limit", (0, 1000000))
+def test_sort_merge(graph_generator, in_memory_node_limit, tmp_path):
+    graph = tuple(islice(graph_generator, 2000))
+    # Duplicate nodes and edges referring to nodes loaded after them
+    graph = graph + graph[:100] + tuple(reversed(graph))
+    lookup_graph = tuple(model for model in graph if isinstance(model, KgNode)) + \
+        tuple(model for model in graph if isinstance(model, KgEdge))
+    expected = _load(lookup_graph, PipelineStorage(pipeline_id="lookup", root_data_dir_path=tmp_path))
+
+    sort_merge_kwds = {"in_memory_node_limit": in_memory_node_limit, "node_label_join": "sort_merge", "run_size": 100}
+    actual = _load(graph, PipelineStorage(pipeline_id="original", root_data_dir_path=tmp_path), **sort_merge_kwds)
+    assert actual == expected
+
+    actual = _load(
+        graph,
+        PipelineStorage(pipeline_id="subject", root_data_dir_path=tmp_path),
+        edge_order="subject",
+        **sort_merge_kwds
+    )
+    header, *expected_lines = expected.splitlines(keepends=True)
+    assert actual == header + "".join(sorted(expected_lines, key=lambda line: line.split("\t")[0]))
+
+
+@pytest.mark.parametrize("in_memory_node_limit", (0, 1000000))
+def test_sort_merge_missing_node(in_memory_node_limit, pipeline_storage):
+    graph = (
+        KgNode.legacy(datasource="test", id="a", label="a"),
+        KgEdge.legacy(datasource="test", object="b", predicate="test", subject="a"),
+    )
+    with pytest.raises(ValueError):
+        _load(graph, pipeline_storage, in_memory_node_limit=in_memory_node_limit, node_label_join="sort_merge")
@@ -0,0 +1,71 @@
+import threading
+
+import pytest
+
+from mowgli_etl.loader._kg_edge_loader import _KgEdgeLoader
+from mowgli_etl.loader._kg_node_loader import _KgNodeLoader
+from mowgli_etl.loader.composite_loader import CompositeLoader
+from mowgli_etl.model.kg_edge import KgEdge
+from mowgli_etl.model.kg_node import KgNode
+from mowgli_etl.model.kg_path import KgPath
+
+
+class _RecordingEdgeLoader(_KgEdgeLoader):
+    def __init__(self):
+        _KgEdgeLoader.__init__(self)
+        self.closed = False
+        self.models = []
+        self.threads = set()
+
+    def close(self):
+        self.closed = True
+
+    def load_kg_edge(self, edge):
+        if edge.subject == "fail":
+            raise ValueError("fail")
+        self.models.append(edge)
+        self.threads.add(threading.current_thread())
+
+    def open(self, storage):
+        return self
+
+
+class _RecordingNodeEdgeLoader(_RecordingEdgeLoader, _KgNodeLoader):
+    def load_kg_node(self, node):
+        self.models.append(node)
+        self.threads.add(threading.current_thread())
+
+
+def _graph():
+    for i in range(2500):
+        yield KgNode.legacy(datasource="test", id=f"n{i}", label=f"node {i}")
+        yield KgEdge.legacy(datasource="test", object=f"n{i}", predicate="p", subject=f"n{i}")
+
+
+@pytest.mark.parametrize("threaded", (False, True))
+def test_load(pipeline_storage, threaded):
+    edge_loader = _RecordingEdgeLoader()
+    node_edge_loader = _RecordingNodeEdgeLoader()
+    graph = tuple(_graph())
+    with CompositeLoader((edge_loader, node_edge_loader), batch_size=10, threaded=threaded).open(pipeline_storage) as loader:
+        for model in graph:
+            if isinstance(model, KgNode):
+                loader.load_kg_node(model)
+            else:
+                loader.load_kg_edge(model)
+        with pytest.raises(RuntimeError):
+            loader.load_kg_path(KgPath(id="path", path=("n0", "p", "n0"), source_ids=("test",)))
+    assert edge_loader.closed and node_edge_loader.closed
+    assert edge_loader.models == [model for model in graph if isinstance(model, KgEdge)]
+    assert node_edge_loader.models == list(graph)
+    assert (threading.current_thread() in edge_loader.threads) != threaded
+    assert edge_loader.threads.isdisjoint(node_edge_loader.threads) == threaded
+
+
+def test_threaded_load_error(pipeline_storage):
+    edge_loader = _RecordingEdgeLoader()
+    loader = CompositeLoader((edge_loader,), threaded=True).open(pipeline_storage)
+    loader.load_kg_edge(KgEdge.legacy(datasource="test", object="o", predicate="p", subject="fail"))
+    with pytest.raises(ValueError):
+        loader.close()
+    assert edge_loader.closed
@@ -0,0 +1,51 @@
+import bz2
+import gzip
+import lzma
+
+import pytest
+
+from mowgli_etl.loader.compressed_output_file import CompressedOutputFile
+
+_DECOMPRESS = {"bz2": bz2.decompress, "gzip": gzip.decompress, "lzma": lzma.decompress}
+_DATA = b"".join(b"subject%d\tpredicate\tobject%d\n" % (i, i % 7) for i in range(20000))
+
+
+@pytest.mark.parametrize("compression", CompressedOutputFile.COMPRESSIONS)
+@pytest.mark.parametrize("threads", (1, 3))
+def test_write(compression, threads, tmp_path):
+    file_path = tmp_path / ("test" + CompressedOutputFile.FILE_EXTENSIONS[compression])
+    with CompressedOutputFile(file_path, compression=compression, block_size=10000, threads=threads) as file_:
+        for start in range(0, len(_DATA), 777):
+            file_.write(_DATA[start:start + 777])
+    assert _DECOMPRESS[compression](file_path.read_bytes()) == _DATA
+
+
+@pytest.mark.parametrize("compression", CompressedOutputFile.COMPRESSIONS)
+@pytest.mark.parametrize("threads", (1, 3))
+def test_write_empty(compression, threads, tmp_path):
+    file_path = tmp_path / "test"
+    CompressedOutputFile(file_path, compression=compression, threads=threads).close()
+    assert _DECOMPRESS[compression](file_path.read_bytes()) == b""
+
+
+@pytest.mark.parametrize("compression", CompressedOutputFile.COMPRESSIONS)
+@pytest.mark.parametrize("threads", (1, 3))
+def test_checkpoint(compression, threads, tmp_path):
+    file_path = tmp_path / "test"
+    split = len(_DATA) // 3
+    file_ = CompressedOutputFile(file_path, compression=compression, block_size=10000, threads=threads)
+    file_.write(_DATA[:split])
+    offset = file_.checkpoint()
+    # Written after the checkpoint and lost in a crash
+    file_.write(b"discarded\n" * 5000)
+    file_.checkpoint()
+    file_.close()
+
+    with CompressedOutputFile(file_path, compression=compression, offset=offset, threads=threads) as file_:
+        file_.write(_DATA[split:])
+    assert _DECOMPRESS[compression](file_path.read_bytes()) == _DATA
+
+
+def test_unknown_compression(tmp_path):
+    with pytest.raises(NotImplementedError):
+        CompressedOutputFile(tmp_path / "test", compression="zstd")
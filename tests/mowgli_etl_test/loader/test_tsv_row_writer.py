@@ -0,0 +1,26 @@
+import csv
+from io import StringIO
+
+from mowgli_etl.loader.tsv_row_writer import TsvRowWriter
+
+_ROWS = (
+    ("subject", "predicate", "object"),
+    ("a", "", "c"),
+    ("tab\there", "b", "c"),
+    ('quote"here', "b", "c"),
+    ("new\nline", "carriage\rreturn", ""),
+    ("", ""),
+    ("ünïcode", "b", "c"),
+)
+
+
+def test_same_as_csv_writer():
+    expected = StringIO()
+    csv.writer(expected, delimiter="\t", lineterminator="\n").writerows(_ROWS * 3)
+
+    actual = StringIO()
+    writer = TsvRowWriter(actual, batch_size=2)
+    writer.writerows(_ROWS * 3)
+    writer.flush()
+
+    assert actual.getvalue() == expected.getvalue()
@@ -1,5 +1,8 @@
+import pickle
 from pathlib import Path
 
+import pytest
+
 try:
     from mowgli_etl.mapper.concept_net.concept_net_index import ConceptNetIndex
 except ImportError:
@@ -33,3 +36,91 @@ if ConceptNetIndex is not None:
         with ConceptNetIndex.open(tmpdir) as index:
             assert index.get("a") == "/c/en/a"
 
+
+
+    def create_from_nodes_csv_file(tmp_path: Path, **kwds):
+        nodes_csv_file_path = tmp_path / "nodes.csv"
+        nodes_csv_file_path.write_text("""\
+id	label	aliases	pos	datasource	other
+/c/en/30	30			CN	
+/c/en/30/a/wn	30		a	CN	
+/c/en/a	a			CN	
+/c/fr/a	a			CN	
+/c/en/ab	ab			CN	
+""")
+        return ConceptNetIndex.create(directory_path=tmp_path / "indexed", nodes_csv_file=nodes_csv_file_path, **kwds)
+
+
+    @pytest.mark.parametrize("parallel", (False, True))
+    def test_create_from_nodes_csv_file(tmp_path, parallel):
+        # A run size of 1 merges one run per node
+        with create_from_nodes_csv_file(tmp_path, parallel=parallel, run_size=1) as index:
+            assert index.get("30") == "/c/en/30"
+            assert index.get("30", pos="a") == "/c/en/30/a/wn"
+            assert index.get("a") == "/c/en/a"
+            assert index.get("ab") == "/c/en/ab"
+            assert index.get("b") is None
+        assert [path.name for path in (tmp_path / "indexed").iterdir()] == ["concept_net_index.2.dat"]
+
+
+    @pytest.mark.parametrize("cache_size", (0, 1, ConceptNetIndex.DEFAULT_CACHE_SIZE))
+    def test_get_cached(tmp_path, cache_size):
+        with create_from_nodes_csv_file(tmp_path, cache_size=cache_size) as index:
+            for _ in range(2):
+                assert index.get("30", pos="a") == "/c/en/30/a/wn"
+                assert index.get("30", pos="v") == "/c/en/30"
+                assert index.get("30") == "/c/en/30"
+                assert index.get("b") is None
+
+
+    def test_get_many(tmp_path):
+        with create_from_nodes_csv_file(tmp_path) as index:
+            assert index.get("a") == "/c/en/a"
+            assert index.get_many(("b", "a", "30", "A", "a", "ab")) == (None, "/c/en/a", "/c/en/30", "/c/en/a", "/c/en/a", "/c/en/ab")
+            assert index.get_many(("30", "b"), pos="a") == ("/c/en/30/a/wn", None)
+            assert index.get_many(()) == ()
+
+
+    def test_create_limit(tmp_path):
+        with create_from_nodes_csv_file(tmp_path, limit=2) as index:
+            assert index.get("30", pos="a") == "/c/en/30/a/wn"
+            assert index.get("a") is None
+
+
+    def test_create_missing_nodes_csv_file(tmp_path):
+        with pytest.raises(FileNotFoundError):
+            ConceptNetIndex.create(directory_path=tmp_path / "indexed", nodes_csv_file=tmp_path / "nodes.csv")
+
+
+    def test_create_namespace(tmp_path):
+        with create_from_nodes_csv_file(tmp_path, namespace="/c/fr/") as index:
+            assert index.get("a") == "/c/fr/a"
+            assert index.get("30") is None
+
+
+    def test_open_concurrently(tmp_path):
+        with create_from_nodes_csv_file(tmp_path) as _:
+            pass
+        # The index file can be opened more than once at a time, unlike a LevelDB database
+        with ConceptNetIndex.open(tmp_path / "indexed") as index1, ConceptNetIndex.open(tmp_path / "indexed") as index2:
+            assert index1.get("a") == index2.get("a") == "/c/en/a"
+            assert index1.get("30", pos="a") == "/c/en/30/a/wn"
+
+
+    def test_open_level_db(tmp_path):
+        plyvel = pytest.importorskip("plyvel")
+        # Index directories built as LevelDB databases get an index file when they're opened
+        db = plyvel.DB(str(tmp_path), create_if_missing=True)
+        db.put(b"30", pickle.dumps(["/c/en/30", "/c/en/30/a/wn"]))
+        db.put(b"a", pickle.dumps("/c/en/a"))
+        db.close()
+        with ConceptNetIndex.open(tmp_path) as index:
+            assert index.get("30", pos="a") == "/c/en/30/a/wn"
+            assert index.get("a") == "/c/en/a"
+            assert index.get("b") is None
+        assert (tmp_path / "concept_net_index.2.dat").is_file()
+
+
+    def test_open_missing(tmp_path):
+        with pytest.raises(FileNotFoundError):
+            ConceptNetIndex.open(tmp_path / "indexed")
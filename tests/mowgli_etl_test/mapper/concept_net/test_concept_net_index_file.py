@@ -0,0 +1,67 @@
+from pathlib import Path
+
+import pytest
+
+from mowgli_etl.mapper.concept_net.concept_net_index_file import ConceptNetIndexFile
+
+ENTRIES = (
+    (b"30", ("/c/en/30", "/c/en/30/a/wn")),
+    (b"a", ("/c/en/a",)),
+    (b"aa", ("/c/en/aa",)),
+    (b"aardvark", ("/c/en/aardvark", "/c/en/aardvark/n")),
+    (b"ab", ("/c/en/ab",)),
+    ("café".encode("utf-8"), ("/c/fr/café",)),
+)
+
+
+def write(tmp_path: Path, entries=ENTRIES, **kwds) -> Path:
+    file_path = tmp_path / "index.dat"
+    ConceptNetIndexFile.write(file_path, entries, **kwds)
+    return file_path
+
+
+@pytest.mark.parametrize("block_size", (1, 2, 4, ConceptNetIndexFile.DEFAULT_BLOCK_SIZE))
+def test_get(tmp_path, block_size):
+    with ConceptNetIndexFile.open(write(tmp_path, block_size=block_size)) as index_file:
+        assert len(index_file) == len(ENTRIES)
+        for key, node_ids in ENTRIES:
+            assert index_file.get(key) == node_ids
+        for key in (b"", b"0", b"3", b"300", b"aar", b"b", b"caf", b"zzz"):
+            assert index_file.get(key) is None
+
+
+def test_get_many_blocks(tmp_path):
+    entries = tuple((b"label %05d" % label_i, ("/c/en/label_%d" % label_i,)) for label_i in range(0, 10000, 2))
+    with ConceptNetIndexFile.open(write(tmp_path, entries=entries, block_size=2)) as index_file:
+        for label_i in range(10000):
+            if label_i % 2 == 0:
+                assert index_file.get(b"label %05d" % label_i) == ("/c/en/label_%d" % label_i,)
+            else:
+                assert index_file.get(b"label %05d" % label_i) is None
+
+
+@pytest.mark.parametrize("block_size", (1, 2, 4, ConceptNetIndexFile.DEFAULT_BLOCK_SIZE))
+def test_get_many(tmp_path, block_size):
+    keys = (b"zzz", b"a", b"aar", b"30", b"a", b"", "café".encode("utf-8"), b"ab", b"aardvark")
+    with ConceptNetIndexFile.open(write(tmp_path, block_size=block_size)) as index_file:
+        assert index_file.get_many(keys) == {key: index_file.get(key) for key in keys if index_file.get(key) is not None}
+        assert index_file.get_many(()) == {}
+
+
+def test_get_empty(tmp_path):
+    with ConceptNetIndexFile.open(write(tmp_path, entries=())) as index_file:
+        assert len(index_file) == 0
+        assert index_file.get(b"a") is None
+
+
+def test_open_invalid(tmp_path):
+    file_path = tmp_path / "index.dat"
+    file_path.write_bytes(b"not an index file" * 10)
+    with pytest.raises(ValueError):
+        ConceptNetIndexFile.open(file_path)
+
+
+def test_write_unsorted(tmp_path):
+    with pytest.raises(ValueError):
+        write(tmp_path, entries=tuple(reversed(ENTRIES)))
+    assert not tuple(tmp_path.iterdir())
@@ -1,5 +1,8 @@
 from mowgli_etl.pipeline.swow.swow_constants import SWOW_CSV_FILE_KEY
 from mowgli_etl.pipeline.swow.swow_extractor import SwowExtractor
+from mowgli_etl.pipeline.swow.swow_transformer import SwowTransformer
+from mowgli_etl.pipeline_storage import PipelineStorage
+from mowgli_etl.virtual_extracted_file import VirtualExtractedFile
 
 
 def test_swow_extractor(pipeline_storage, sample_swow_csv_path, sample_archive_path):
@@ -11,3 +14,13 @@ def test_swow_extractor(pipeline_storage, sample_swow_csv_path, sample_archive_p
         expected_contents = sample_strengths_file.read()
 
     assert contents == expected_contents
+
+
+def test_swow_extractor_stream_extracted_files(sample_swow_edges, sample_swow_nodes, sample_archive_path, tmp_path):
+    storage = PipelineStorage(pipeline_id="test", root_data_dir_path=tmp_path, stream_extracted_files=True)
+    extraction = SwowExtractor(swow_archive_path=sample_archive_path).extract(force=False, storage=storage)
+    assert isinstance(extraction[SWOW_CSV_FILE_KEY], VirtualExtractedFile)
+    assert not storage.extracted_data_dir_path.exists() or not any(storage.extracted_data_dir_path.iterdir())
+
+    models = set(SwowTransformer().transform(**extraction))
+    assert models == sample_swow_nodes | sample_swow_edges
@@ -0,0 +1,35 @@
+from mowgli_etl.storage.bloom_filter import BloomFilter
+
+
+def test_add():
+    bloom_filter = BloomFilter()
+    assert not bloom_filter.add("test")
+    assert bloom_filter.add("test")
+    assert len(bloom_filter) == 1
+
+
+def test_contains():
+    bloom_filter = BloomFilter()
+    bloom_filter.add("test")
+    assert "test" in bloom_filter
+    assert "other" not in bloom_filter
+
+
+def test_grow():
+    bloom_filter = BloomFilter(capacity=10, error_rate=0.01)
+    keys = tuple(f"test{i}" for i in range(1000))
+    for key in keys:
+        bloom_filter.add(key)
+    # No false negatives
+    for key in keys:
+        assert key in bloom_filter
+    false_positive_count = sum(1 for i in range(1000) if f"other{i}" in bloom_filter)
+    assert false_positive_count < 50
+
+
+def test_false_positive_rate():
+    bloom_filter = BloomFilter(capacity=20000, error_rate=0.01)
+    for i in range(20000):
+        bloom_filter.add(f"test{i}")
+    false_positive_count = sum(1 for i in range(20000) if f"other{i}" in bloom_filter)
+    assert false_positive_count < 200
@@ -0,0 +1,30 @@
+import pytest
+
+from mowgli_etl.model.kg_edge import KgEdge
+from mowgli_etl.storage.kg_edge_codec import KgEdgeCodec
+
+
+def test_round_trip(edge: KgEdge):
+    codec = KgEdgeCodec()
+    assert codec.decode(codec.encode(edge)) == edge
+
+
+def test_round_trip_labels_weight(edge: KgEdge):
+    codec = KgEdgeCodec()
+    edge = edge._replace(labels=("test label", "étiquette"), weight=0.5)
+    assert codec.decode(codec.encode(edge)) == edge
+
+
+@pytest.mark.parametrize("source_id_count", (0xFFFF, 0x10000))
+def test_round_trip_many_source_ids(source_id_count: int, edge: KgEdge):
+    codec = KgEdgeCodec()
+    edge = edge._replace(labels=("test label",), source_ids=tuple("source %d" % source_i for source_i in range(source_id_count)))
+    assert codec.decode(codec.encode(edge)) == edge
+    assert codec.decode_labels(codec.encode(edge)) == edge.labels
+
+
+def test_decode_labels(edge: KgEdge):
+    codec = KgEdgeCodec()
+    assert codec.decode_labels(codec.encode(edge)) is None
+    edge = edge._replace(labels=("test label",), weight=1.0)
+    assert codec.decode_labels(codec.encode(edge)) == edge.labels
@@ -0,0 +1,49 @@
+import pytest
+
+from mowgli_etl.model.kg_node import KgNode
+from mowgli_etl.storage.kg_node_codec import KgNodeCodec
+
+
+def test_round_trip(node: KgNode):
+    codec = KgNodeCodec()
+    assert codec.decode(codec.encode(node)) == node
+
+
+def test_round_trip_no_pos(node: KgNode):
+    codec = KgNodeCodec()
+    node = node._replace(pos=None)
+    assert codec.decode(codec.encode(node)) == node
+
+
+def test_round_trip_non_ascii(node: KgNode):
+    codec = KgNodeCodec()
+    node = node._replace(labels=("café", "日本"), source_ids=("test", "tést"))
+    assert codec.decode(codec.encode(node)) == node
+
+
+def test_round_trip_long_label(node: KgNode):
+    codec = KgNodeCodec()
+    node = node._replace(labels=("x" * 70000,))
+    assert codec.decode(codec.encode(node)) == node
+
+
+@pytest.mark.parametrize("label_count", (0xFFFF, 0x10000))
+def test_round_trip_many_labels(label_count: int, node: KgNode):
+    codec = KgNodeCodec()
+    node = node._replace(labels=tuple("label %d" % label_i for label_i in range(label_count)))
+    assert codec.decode(codec.encode(node)) == node
+    assert codec.decode_labels(codec.encode(node)) == node.labels
+
+
+def test_decode_labels(node: KgNode):
+    codec = KgNodeCodec()
+    node = node._replace(labels=("test label", "alias"))
+    assert codec.decode_labels(codec.encode(node)) == node.labels
+
+
+def test_decode_unsupported_version(node: KgNode):
+    codec = KgNodeCodec()
+    data = bytearray(codec.encode(node))
+    data[0] = 0xFF
+    with pytest.raises(ValueError):
+        codec.decode(bytes(data))
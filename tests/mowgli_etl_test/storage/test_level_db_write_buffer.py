@@ -0,0 +1,69 @@
+from pathlib import Path
+
+try:
+    from mowgli_etl.storage.level_db import LevelDb
+    from mowgli_etl.storage.level_db_write_buffer import LevelDbWriteBuffer
+except ImportError:
+    LevelDb = None
+
+if LevelDb is not None:
+    def test_get_pending(tmpdir):
+        with LevelDb(directory_path=tmpdir.mkdir("test")) as level_db:
+            with LevelDbWriteBuffer(level_db) as write_buffer:
+                write_buffer.put(b"key", b"value")
+                assert write_buffer.get(b"key") == b"value"
+                assert level_db.get(b"key") is None
+            assert level_db.get(b"key") == b"value"
+
+
+    def test_delete_pending(tmpdir):
+        with LevelDb(directory_path=tmpdir.mkdir("test")) as level_db:
+            level_db.put(b"key", b"value")
+            with LevelDbWriteBuffer(level_db) as write_buffer:
+                write_buffer.delete(b"key")
+                assert write_buffer.get(b"key") is None
+                assert level_db.get(b"key") == b"value"
+            assert level_db.get(b"key") is None
+
+
+    def test_flush_when_full(tmpdir):
+        with LevelDb(directory_path=tmpdir.mkdir("test")) as level_db:
+            with LevelDbWriteBuffer(level_db, size=2) as write_buffer:
+                write_buffer.put(b"key1", b"value1")
+                assert level_db.get(b"key1") is None
+                write_buffer.put(b"key2", b"value2")
+                assert level_db.get(b"key1") == b"value1"
+                assert level_db.get(b"key2") == b"value2"
+
+
+    def test_discard_on_close(tmpdir):
+        with LevelDb(directory_path=tmpdir.mkdir("test")) as level_db:
+            with LevelDbWriteBuffer(level_db, flush_on_close=False) as write_buffer:
+                write_buffer.put(b"key1", b"value1")
+                write_buffer.flush()
+                write_buffer.put(b"key2", b"value2")
+            assert level_db.get(b"key1") == b"value1"
+            assert level_db.get(b"key2") is None
+
+
+    def test_undo_flush(tmpdir):
+        undo_file_path = Path(tmpdir) / "test.undo"
+        with LevelDb(directory_path=tmpdir.mkdir("test")) as level_db:
+            level_db.put(b"key1", b"value1")
+            write_buffer = LevelDbWriteBuffer(level_db, flush_on_close=False)
+            write_buffer.put(b"key1", b"value1a")
+            write_buffer.flush_undoably(undo_file_path, generation=1)
+            write_buffer.put(b"key2", b"value2")
+            write_buffer.delete(b"key1")
+            write_buffer.flush_undoably(undo_file_path, generation=2)
+            assert level_db.get(b"key1") is None
+
+            # Generation 2 was committed
+            write_buffer.undo_flush(undo_file_path, committed_generation=2)
+            assert level_db.get(b"key2") == b"value2"
+
+            # Generation 2 wasn't committed, roll back to generation 1
+            write_buffer.undo_flush(undo_file_path, committed_generation=1)
+            assert level_db.get(b"key1") == b"value1a"
+            assert level_db.get(b"key2") is None
+            assert not undo_file_path.exists()
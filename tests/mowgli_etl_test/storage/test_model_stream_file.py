@@ -0,0 +1,73 @@
+from itertools import islice
+
+from mowgli_etl.model.benchmark_question import BenchmarkQuestion
+from mowgli_etl.model.benchmark_question_choice import BenchmarkQuestionChoice
+from mowgli_etl.model.benchmark_question_choice_type import BenchmarkQuestionChoiceType
+from mowgli_etl.model.benchmark_question_prompt import BenchmarkQuestionPrompt
+from mowgli_etl.model.benchmark_question_prompt_type import BenchmarkQuestionPromptType
+from mowgli_etl.model.kg_edge import KgEdge
+from mowgli_etl.model.kg_node import KgNode
+from mowgli_etl.model.kg_path import KgPath
+from mowgli_etl.storage.model_stream_file import ModelStreamFile
+
+
+MODELS = (
+    KgNode(id="node1", labels=("label", "étiquette"), source_ids=("test",), pos="n"),
+    KgNode(id="node2", labels=("x" * 70000,), source_ids=("test", "other")),
+    KgEdge(id="edge1", object="node2", predicate="rel", source_ids=("test",), subject="node1"),
+    KgEdge(id="edge2", object="node1", predicate="rel", source_ids=("test",), subject="node2", labels=("label",), weight=0.5),
+    KgEdge(id="edge3", object="node1", predicate="rel", source_ids=("test",), subject="node2", labels=()),
+    KgPath(id="path", path=("node1", "rel", "node2"), source_ids=("test",)),
+    BenchmarkQuestion(
+        choices=(BenchmarkQuestionChoice(id="choice", position=0, text="text", type=BenchmarkQuestionChoiceType.ANSWER),),
+        id="question",
+        dataset_id="dataset",
+        prompts=(BenchmarkQuestionPrompt(text="prompt", type=BenchmarkQuestionPromptType.QUESTION),),
+    ),
+)
+
+
+def test_round_trip(tmp_path):
+    file = ModelStreamFile(tmp_path / "models.bin")
+    assert tuple(file.write(MODELS)) == MODELS
+    replayed_models = tuple(file.read())
+    assert replayed_models == MODELS
+    assert [model.__class__ for model in replayed_models] == [model.__class__ for model in MODELS]
+
+
+def test_full_string_table(graph_generator, tmp_path):
+    models = tuple(islice(graph_generator, 300))
+    file = ModelStreamFile(tmp_path / "models.bin")
+    tuple(file.write(models, string_table_size=10))
+    assert tuple(file.read()) == models
+
+
+def test_exception_keeps_previous_file(tmp_path):
+    file = ModelStreamFile(tmp_path / "models.bin")
+    tuple(file.write(MODELS))
+
+    def failing_models():
+        yield MODELS[0]
+        raise ValueError
+
+    try:
+        tuple(file.write(failing_models()))
+    except ValueError:
+        pass
+    assert tuple(file.read()) == MODELS
+    assert tuple(tmp_path.iterdir()) == (file.file_path,)
+
+
+def test_round_trip_many_strings(tmp_path):
+    # Too many strings of a kind for the record header's u16 counts
+    strings = tuple("string %d" % string_i for string_i in range(0x10000))
+    models = (
+        KgNode(id="node1", labels=strings, source_ids=("test",)),
+        KgNode(id="node2", labels=("label",), source_ids=strings),
+        KgEdge(id="edge1", object="node2", predicate="rel", source_ids=strings, subject="node1"),
+        KgEdge(id="edge2", object="node1", predicate="rel", source_ids=("test",), subject="node2", labels=strings),
+        KgPath(id="path", path=strings, source_ids=("test",)),
+    ) + MODELS
+    file = ModelStreamFile(tmp_path / "models.bin")
+    assert tuple(file.write(models)) == models
+    assert tuple(file.read()) == models
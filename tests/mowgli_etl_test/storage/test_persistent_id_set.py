@@ -27,3 +27,17 @@ if PersistentIdSet is not None:
     def test_get_nonextant(node: KgNode, tmpdir):
         with PersistentIdSet(directory_path=tmpdir.mkdir("test"), create_if_missing=True) as node_id_set:
             assert node.id not in node_id_set
+
+
+    def test_add_many(tmpdir):
+        with PersistentIdSet(directory_path=tmpdir.mkdir("test"), create_if_missing=True, write_batch_size=2) as node_id_set:
+            node_id_set.add_many(("testid1", "testid2", "testid3"))
+            assert all(node_id in node_id_set for node_id in ("testid1", "testid2", "testid3"))
+
+
+    def test_add_persists_on_close(node: KgNode, tmpdir):
+        directory_path = tmpdir.mkdir("test")
+        with PersistentIdSet(directory_path=directory_path, create_if_missing=True) as node_id_set:
+            node_id_set.add(node.id)
+        with PersistentIdSet(directory_path=directory_path, create_if_missing=False) as node_id_set:
+            assert node.id in node_id_set
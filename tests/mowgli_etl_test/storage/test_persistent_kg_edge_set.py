@@ -27,3 +27,11 @@ if PersistentKgEdgeSet is not None:
     def test_get_nonextant(edge: KgEdge, tmpdir):
         with PersistentKgEdgeSet(directory_path=tmpdir.mkdir("test"), create_if_missing=True) as edge_set:
             assert edge_set.get(edge.id) is None
+
+
+    def test_add_many(edge: KgEdge, tmpdir):
+        edges = [edge._replace(id=f"{edge.id}{edge_i}") for edge_i in range(3)]
+        with PersistentKgEdgeSet(directory_path=tmpdir.mkdir("test"), create_if_missing=True, write_batch_size=2) as edge_set:
+            edge_set.add_many(edges)
+            for edge in edges:
+                assert edge_set.get(edge.id) == edge
@@ -36,3 +36,26 @@ if PersistentKgNodeSet is not None:
     def test_get_nonextant(node: KgNode, tmpdir):
         with PersistentKgNodeSet(directory_path=tmpdir.mkdir("test"), create_if_missing=True) as node_set:
             assert node_set.get(node_id=node.id) is None
+
+
+    def test_delete_flushed(node: KgNode, tmpdir):
+        with PersistentKgNodeSet(directory_path=tmpdir.mkdir("test"), create_if_missing=True) as node_set:
+            node_set.add(node)
+            node_set.flush()
+            node_set.delete(node.id)
+            assert node.id not in node_set
+            assert list(node_set.keys()) == []
+
+
+    def test_keys(node: KgNode, tmpdir):
+        nodes = [node._replace(id=f"{node.id}{node_i}") for node_i in range(3)]
+        with PersistentKgNodeSet(directory_path=tmpdir.mkdir("test"), create_if_missing=True, write_batch_size=2) as node_set:
+            node_set.add_many(nodes)
+            assert list(node_set.keys()) == [node.id for node in nodes]
+
+
+    def test_get_labels(node: KgNode, tmpdir):
+        with PersistentKgNodeSet(directory_path=tmpdir.mkdir("test"), create_if_missing=True) as node_set:
+            node_set.add(node)
+            assert node_set.get_labels(node.id) == node.labels
+            assert node_set.get_labels("nonextant") is None
@@ -0,0 +1,37 @@
+import pytest
+
+from mowgli_etl.bounded_handoff import BoundedHandoff
+
+
+def test_order():
+    with BoundedHandoff(range(1000), batch_size=7, queue_depth=2) as handoff:
+        assert list(handoff) == list(range(1000))
+
+
+def test_producer_exception():
+    def generator():
+        yield from range(10)
+        raise ValueError("test")
+
+    items = []
+    with pytest.raises(ValueError, match="test"):
+        with BoundedHandoff(generator(), batch_size=3, queue_depth=1) as handoff:
+            for item in handoff:
+                items.append(item)
+    assert items == list(range(10))
+
+
+def test_consumer_stops_early():
+    closed = []
+
+    def generator():
+        try:
+            yield from range(100000)
+        finally:
+            closed.append(True)
+
+    with BoundedHandoff(generator(), batch_size=10, queue_depth=1) as handoff:
+        for item in handoff:
+            if item == 5:
+                break
+    assert closed == [True]
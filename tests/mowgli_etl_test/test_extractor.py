@@ -0,0 +1,132 @@
+import hashlib
+import re
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from mowgli_etl._extractor import _Extractor
+from mowgli_etl.http_client.real_etl_http_client import RealEtlHttpClient
+
+CONTENT = bytes(range(256)) * 4096
+
+
+class _RangeRequestHandler(BaseHTTPRequestHandler):
+    """
+    Serves the server's content, with an ETag and Range support if the server's support_ranges is set. If the server's
+    truncate_at is set, the connection is closed after that many bytes of the content.
+    """
+
+    def do_GET(self):
+        content = self.server.content
+        etag = '"%s"' % hashlib.sha256(content).hexdigest()
+        start = 0
+        range_header = self.headers.get("Range")
+        if_range_header = self.headers.get("If-Range")
+        if range_header is not None and self.server.support_ranges and if_range_header in (None, etag):
+            start = int(re.match(r"bytes=(\d+)-", range_header).group(1))
+            self.send_response(206)
+            self.send_header("Content-Range", "bytes %d-%d/%d" % (start, len(content) - 1, len(content)))
+        else:
+            self.send_response(200)
+        self.server.starts.append(start)
+        self.send_header("Content-Length", str(len(content) - start))
+        if self.server.support_ranges:
+            self.send_header("ETag", etag)
+        self.end_headers()
+        end = len(content)
+        if self.server.truncate_at is not None:
+            end = self.server.truncate_at
+            self.server.truncate_at = None
+            self.close_connection = True
+        self.wfile.write(content[start:end])
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def http_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _RangeRequestHandler)
+    server.content = CONTENT
+    server.starts = []
+    server.support_ranges = True
+    server.truncate_at = None
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+class _DownloadingExtractor(_Extractor):
+    def __init__(self, url: str, sha256=None):
+        _Extractor.__init__(self, http_client=RealEtlHttpClient())
+        self.__sha256 = sha256
+        self.__url = url
+
+    def extract(self, *, force, storage):
+        return {"file_path": self._download(self.__url, force, storage, sha256=self.__sha256)}
+
+
+def _url(http_server) -> str:
+    return "http://127.0.0.1:%d/content" % http_server.server_address[1]
+
+
+def test_download(http_server, pipeline_storage):
+    file_path = _DownloadingExtractor(_url(http_server), sha256=hashlib.sha256(CONTENT).hexdigest()) \
+        .extract(force=False, storage=pipeline_storage)["file_path"]
+    assert file_path.read_bytes() == CONTENT
+    assert [path.name for path in pipeline_storage.extracted_data_dir_path.iterdir()] == [file_path.name]
+
+
+@pytest.mark.parametrize("support_ranges", (True, False))
+def test_resume_download(http_server, pipeline_storage, support_ranges):
+    http_server.support_ranges = support_ranges
+    http_server.truncate_at = 100000
+    extractor = _DownloadingExtractor(_url(http_server), sha256=hashlib.sha256(CONTENT).hexdigest())
+    with pytest.raises(IOError):
+        extractor.extract(force=False, storage=pipeline_storage)
+    # The truncated download isn't mistaken for a complete one
+    # The server only sends an ETag if it supports ranges
+    assert sorted(path.suffix for path in pipeline_storage.extracted_data_dir_path.iterdir()) == \
+        ([".part", ".validator"] if support_ranges else [".part"])
+
+    file_path = extractor.extract(force=False, storage=pipeline_storage)["file_path"]
+    assert file_path.read_bytes() == CONTENT
+    assert http_server.starts == [0, 100000 if support_ranges else 0]
+    assert [path.name for path in pipeline_storage.extracted_data_dir_path.iterdir()] == [file_path.name]
+
+
+def test_resume_changed_download(http_server, pipeline_storage):
+    http_server.truncate_at = 100000
+    extractor = _DownloadingExtractor(_url(http_server))
+    with pytest.raises(IOError):
+        extractor.extract(force=False, storage=pipeline_storage)
+
+    # The content changes between attempts, so its ETag no longer matches the If-Range and the download starts over
+    changed_content = bytes(reversed(CONTENT))
+    http_server.content = changed_content
+    file_path = extractor.extract(force=False, storage=pipeline_storage)["file_path"]
+    assert file_path.read_bytes() == changed_content
+    assert http_server.starts == [0, 0]
+
+
+def test_resume_download_without_validator(http_server, pipeline_storage):
+    http_server.truncate_at = 100000
+    extractor = _DownloadingExtractor(_url(http_server))
+    with pytest.raises(IOError):
+        extractor.extract(force=False, storage=pipeline_storage)
+    for validator_file_path in pipeline_storage.extracted_data_dir_path.glob("*.validator"):
+        validator_file_path.unlink()
+
+    # Without the validator the content may have changed, so the download starts over
+    file_path = extractor.extract(force=False, storage=pipeline_storage)["file_path"]
+    assert file_path.read_bytes() == CONTENT
+    assert http_server.starts == [0, 0]
+
+
+def test_sha256_mismatch(http_server, pipeline_storage):
+    with pytest.raises(ValueError):
+        _DownloadingExtractor(_url(http_server), sha256="0" * 64).extract(force=False, storage=pipeline_storage)
+    assert not tuple(pipeline_storage.extracted_data_dir_path.iterdir())
@@ -0,0 +1,69 @@
+import bz2
+import logging
+import multiprocessing
+import random
+
+from mowgli_etl.parallel_bz2_decompressor import ParallelBz2Decompressor
+
+
+def _data(size: int) -> bytes:
+    random_ = random.Random(0)
+    words = [b"has", b"part", b"swow", b"cue", b"response", b"\n"]
+    return b" ".join(random_.choice(words) for _ in range(size))
+
+
+def test_multi_stream(caplog, tmp_path):
+    data = _data(200000)
+    bz2_file_path = tmp_path / "data.bz2"
+    with open(bz2_file_path, "wb") as bz2_file:
+        for start in range(0, len(data), 100000):
+            bz2_file.write(bz2.compress(data[start:start + 100000]))
+    out_file_path = tmp_path / "data"
+    caplog.set_level(logging.INFO)
+    with open(out_file_path, "w+b") as out_file:
+        ParallelBz2Decompressor(chunk_size=1, processes=2).decompress(bz2_file_path, out_file)
+    assert out_file_path.read_bytes() == data
+    assert "in 10 chunks" in caplog.text
+
+
+def _decompress_in_worker(bz2_file_path, out_file_path) -> None:
+    with open(out_file_path, "w+b") as out_file:
+        ParallelBz2Decompressor(chunk_size=1, processes=2).decompress(bz2_file_path, out_file)
+
+
+def test_multi_stream_in_pool_worker(tmp_path):
+    # Pool workers are daemonic and can't start a pool of their own
+    data = _data(200000)
+    bz2_file_path = tmp_path / "data.bz2"
+    with open(bz2_file_path, "wb") as bz2_file:
+        for start in range(0, len(data), 100000):
+            bz2_file.write(bz2.compress(data[start:start + 100000]))
+    out_file_path = tmp_path / "data"
+    with multiprocessing.Pool(1) as pool:
+        pool.apply(_decompress_in_worker, (bz2_file_path, out_file_path))
+    assert out_file_path.read_bytes() == data
+
+
+def test_single_stream(tmp_path):
+    data = _data(100000)
+    bz2_file_path = tmp_path / "data.bz2"
+    bz2_file_path.write_bytes(bz2.compress(data))
+    out_file_path = tmp_path / "data"
+    with open(out_file_path, "w+b") as out_file:
+        ParallelBz2Decompressor(chunk_size=1, processes=2).decompress(bz2_file_path, out_file)
+    assert out_file_path.read_bytes() == data
+
+
+def test_false_stream_start(tmp_path):
+    # A stream start pattern in the middle of a stream can't be told apart from a real one until it fails to decompress
+    data = _data(100000)
+    compressed_data = bz2.compress(data)
+    bz2_file_path = tmp_path / "data.bz2"
+    bz2_file_path.write_bytes(compressed_data + compressed_data)
+    out_file_path = tmp_path / "data"
+    with open(out_file_path, "w+b") as out_file:
+        out_file.write(b"prefix")
+        decompressor = ParallelBz2Decompressor(chunk_size=1, processes=2)
+        decompressor._ParallelBz2Decompressor__chunk_ranges = lambda file_path: [(0, 100), (100, len(compressed_data) * 2)]
+        decompressor.decompress(bz2_file_path, out_file)
+    assert out_file_path.read_bytes() == b"prefix" + data + data
@@ -0,0 +1,66 @@
+import json
+from itertools import islice
+
+from mowgli_etl.pipeline_manifest import PipelineManifest
+from mowgli_etl.pipeline_run_report import PipelineRunReport
+from mowgli_etl.pipeline_wrapper import PipelineWrapper
+from tests.mowgli_etl_test.etl_mocks import MockExtractor, MockPipeline, MockTransformer
+
+
+def run_incremental(graph, input_file_path, pipeline_storage, **pipeline_kwds) -> bool:
+    """
+    :return: True if the run transformed and loaded
+    """
+    pipeline = MockPipeline(
+        extractor=MockExtractor({"input_file_path": input_file_path}),
+        transformer=MockTransformer(graph),
+        **pipeline_kwds
+    )
+    PipelineWrapper(pipeline, pipeline_storage).run(incremental=True, pipeline_arguments=pipeline_kwds)
+    with open(pipeline_storage.loaded_data_dir_path / PipelineRunReport.FILE_NAME) as run_report_file:
+        run_report = json.load(run_report_file)
+    return "transform" in (stage["name"] for stage in run_report["stages"])
+
+
+def test_skip_unchanged(graph_generator, pipeline_storage, tmp_path):
+    graph = tuple(islice(graph_generator, 30))
+    input_file_path = tmp_path / "input.txt"
+    input_file_path.write_text("input")
+    assert run_incremental(graph, input_file_path, pipeline_storage)
+    assert not run_incremental(graph, input_file_path, pipeline_storage)
+
+    # Changed input
+    input_file_path.write_text("changed input")
+    assert run_incremental(graph, input_file_path, pipeline_storage)
+    assert not run_incremental(graph, input_file_path, pipeline_storage)
+
+    # Changed arguments
+    assert run_incremental(graph, input_file_path, pipeline_storage, loader="kgtk_edges_tsv")
+
+    # Deleted output
+    (pipeline_storage.loaded_data_dir_path / "edges.tsv").unlink()
+    assert run_incremental(graph, input_file_path, pipeline_storage, loader="kgtk_edges_tsv")
+
+
+def test_failed_run_invalidates_manifest(graph_generator, pipeline_storage, tmp_path):
+    graph = tuple(islice(graph_generator, 30))
+    input_file_path = tmp_path / "input.txt"
+    input_file_path.write_text("input")
+    assert run_incremental(graph, input_file_path, pipeline_storage)
+    input_file_path.write_text("changed input")
+    try:
+        run_incremental(graph + (graph[0]._replace(labels=("changed",)),), input_file_path, pipeline_storage)
+    except ValueError:
+        pass
+    assert PipelineManifest.read(pipeline_storage.loaded_data_dir_path) is None
+
+
+def test_hash_directory(tmp_path):
+    directory_path = tmp_path / "input"
+    directory_path.mkdir()
+    (directory_path / "a.txt").write_text("a")
+    manifest = PipelineManifest.create(arguments={}, extract_kwds={"paths": (directory_path,), "other": 1}, pipeline=MockPipeline())
+    assert set(manifest.inputs.keys()) == {"paths[0]"}
+    assert manifest.arguments == {"extract.other": "1"}
+    (directory_path / "a.txt").write_text("b")
+    assert PipelineManifest.create(arguments={}, extract_kwds={"paths": (directory_path,)}, pipeline=MockPipeline()).inputs != manifest.inputs
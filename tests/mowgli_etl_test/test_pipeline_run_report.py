@@ -0,0 +1,51 @@
+from mowgli_etl.pipeline_run_report import PipelineRunReport, _InputProgress
+
+
+def test_instrument(graph_generator):
+    run_report = PipelineRunReport(pipeline_id="test")
+    models = [next(graph_generator) for _ in range(3)]
+    assert list(run_report.instrument("transform", iter(models))) == models
+    stage = run_report.stage("transform")
+    assert sum(stage.model_counts.values()) == 3
+    assert stage.wall_time_s > 0
+
+
+def test_self_time():
+    run_report = PipelineRunReport(pipeline_id="test")
+    run_report.stage("whole_graph_check").wall_time_s = 3.0
+    run_report.stage("transform").wall_time_s = 2.0
+    stages = run_report.as_dict()["stages"]
+    assert [stage["name"] for stage in stages] == ["transform", "whole_graph_check"]
+    assert stages[1]["self_time_s"] == 1.0
+
+
+def test_self_time_after_extract():
+    run_report = PipelineRunReport(pipeline_id="test")
+    run_report.stage("extract").wall_time_s = 100.0
+    run_report.stage("transform").wall_time_s = 5.0
+    run_report.stage("whole_graph_check").wall_time_s = 7.0
+    stages = {stage["name"]: stage for stage in run_report.as_dict()["stages"]}
+    # Extract isn't part of the generator chain, so it isn't subtracted from transform
+    assert stages["transform"]["self_time_s"] == 5.0
+    assert stages["whole_graph_check"]["self_time_s"] == 2.0
+
+
+def test_self_time_replay():
+    run_report = PipelineRunReport(pipeline_id="test")
+    run_report.stage("extract").wall_time_s = 100.0
+    run_report.stage("replay").wall_time_s = 5.0
+    run_report.stage("map").wall_time_s = 6.0
+    stages = {stage["name"]: stage for stage in run_report.as_dict()["stages"]}
+    assert stages["replay"]["self_time_s"] == 5.0
+    assert stages["map"]["self_time_s"] == 1.0
+
+
+def test_input_progress(tmp_path):
+    file_path = tmp_path / "input.txt"
+    file_path.write_text("x" * 100)
+    input_progress = _InputProgress((file_path,))
+    if not input_progress.available:
+        return
+    with open(file_path, "rb", buffering=0) as file_:
+        file_.read(50)
+        assert input_progress.fraction() == 0.5
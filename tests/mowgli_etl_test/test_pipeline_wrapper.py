@@ -1,5 +1,8 @@
-from typing import Tuple, Union
+import json
+from itertools import islice
+from typing import Dict, Optional, Tuple, Union
 
+import pytest
 from pytest import fail
 
 from mowgli_etl.model.kg_edge import KgEdge
@@ -7,6 +10,8 @@ from mowgli_etl.model.kg_node import KgNode
 from mowgli_etl._extractor import _Extractor
 from mowgli_etl._pipeline import _Pipeline
 from mowgli_etl._transformer import _Transformer
+from mowgli_etl.pipeline_checkpoint import PipelineCheckpoint
+from mowgli_etl.pipeline_run_report import PipelineRunReport
 from mowgli_etl.pipeline_storage import PipelineStorage
 from mowgli_etl.pipeline_wrapper import PipelineWrapper
 
@@ -28,17 +33,30 @@ class MockTransformer(_Transformer):
 
 
 class MockPipeline(_Pipeline):
-    def __init__(self, node_edge_sequence: Tuple[Union[KgNode, KgEdge], ...]):
+    def __init__(self, node_edge_sequence: Tuple[Union[KgNode, KgEdge], ...], loader: Optional[str] = None):
         _Pipeline.__init__(
             self,
             extractor=NopExtractor(),
             id=DATASOURCE,
+            loader=loader,
             transformer=MockTransformer(node_edge_sequence)
         )
 
 
-def run(node_edge_sequence: Tuple[Union[KgNode, KgEdge], ...], pipeline_storage: PipelineStorage):
-    return PipelineWrapper(MockPipeline(node_edge_sequence), pipeline_storage).run()
+def run(node_edge_sequence: Tuple[Union[KgNode, KgEdge], ...], pipeline_storage: PipelineStorage, loader: Optional[str] = None, **run_kwds):
+    return PipelineWrapper(MockPipeline(node_edge_sequence, loader=loader), pipeline_storage).run(**run_kwds)
+
+
+def loaded_file_contents(pipeline_storage: PipelineStorage) -> Dict[str, bytes]:
+    return {
+        file_path.name: file_path.read_bytes()
+        for file_path in pipeline_storage.loaded_data_dir_path.iterdir()
+        if file_path.name != PipelineRunReport.FILE_NAME
+    }
+
+
+def transform(node_edge_sequence: Tuple[Union[KgNode, KgEdge], ...], pipeline_storage: PipelineStorage, **transform_kwds):
+    return PipelineWrapper(MockPipeline(node_edge_sequence), pipeline_storage).transform(**transform_kwds)
 
 
 SUBJECT_NODE = KgNode.legacy(id="testid", label="test label", pos="n", datasource=DATASOURCE)
@@ -79,3 +97,239 @@ def test_mixed_datasource(pipeline_storage):
         fail()
     except ValueError:
         pass
+
+
+def test_check_workers_exact_duplicate_node(pipeline_storage):
+    transformed = tuple(transform((SUBJECT_NODE, OBJECT_NODE, EDGE, EXACT_DUPLICATE_SUBJECT_NODE), pipeline_storage, check_workers=2))
+    assert transformed == (SUBJECT_NODE, OBJECT_NODE, EDGE)
+
+
+def test_check_workers_inexact_duplicate_node(pipeline_storage):
+    transformed = []
+    try:
+        for model in transform((SUBJECT_NODE, OBJECT_NODE, EDGE, INEXACT_DUPLICATE_SUBJECT_NODE), pipeline_storage, check_workers=2):
+            transformed.append(model)
+        fail()
+    except ValueError:
+        pass
+    # Models preceding the offending node are yielded, as in the serial check
+    assert tuple(transformed) == (SUBJECT_NODE, OBJECT_NODE, EDGE)
+
+
+def test_check_workers_duplicate_edge(pipeline_storage):
+    try:
+        run((SUBJECT_NODE, OBJECT_NODE, EDGE, EDGE), pipeline_storage, check_workers=2)
+        fail()
+    except ValueError:
+        pass
+
+
+def test_check_workers_extraneous_node(pipeline_storage):
+    try:
+        run((SUBJECT_NODE, OBJECT_NODE,
+             KgEdge.legacy(subject=SUBJECT_NODE.id, object="externalnode", predicate=DATASOURCE,
+                  datasource=DATASOURCE)), pipeline_storage, check_workers=2)
+        fail()
+    except ValueError as e:
+        assert str(e) == "node %s not used by an edge" % OBJECT_NODE.id
+
+
+def test_check_workers_order(graph_generator, pipeline_storage):
+    # More models than fit in a single batch
+    graph = tuple(islice(graph_generator, 30000))
+    assert tuple(transform(graph, pipeline_storage, check_workers=3)) == graph
+
+
+def test_bloom_filter_exact_duplicate_node(pipeline_storage):
+    transformed = tuple(transform((SUBJECT_NODE, OBJECT_NODE, EDGE, EXACT_DUPLICATE_SUBJECT_NODE), pipeline_storage, whole_graph_check="bloom_filter"))
+    assert transformed == (SUBJECT_NODE, OBJECT_NODE, EDGE)
+
+
+def test_bloom_filter_inexact_duplicate_node(pipeline_storage):
+    try:
+        run((SUBJECT_NODE, OBJECT_NODE, EDGE, INEXACT_DUPLICATE_SUBJECT_NODE), pipeline_storage, whole_graph_check="bloom_filter")
+        fail()
+    except ValueError:
+        pass
+
+
+def test_bloom_filter_extraneous_node(pipeline_storage):
+    try:
+        run((SUBJECT_NODE, OBJECT_NODE,
+             KgEdge.legacy(subject=SUBJECT_NODE.id, object="externalnode", predicate=DATASOURCE,
+                  datasource=DATASOURCE)), pipeline_storage, whole_graph_check="bloom_filter")
+        fail()
+    except ValueError as e:
+        assert str(e) == "node %s not used by an edge" % OBJECT_NODE.id
+
+
+def test_fingerprint_exact_duplicate_node(pipeline_storage):
+    pytest.importorskip("plyvel")
+    transformed = tuple(transform((SUBJECT_NODE, OBJECT_NODE, EDGE, EXACT_DUPLICATE_SUBJECT_NODE), pipeline_storage, whole_graph_check="fingerprint"))
+    assert transformed == (SUBJECT_NODE, OBJECT_NODE, EDGE)
+
+
+def test_fingerprint_inexact_duplicate_node(pipeline_storage):
+    pytest.importorskip("plyvel")
+    try:
+        run((SUBJECT_NODE, OBJECT_NODE, EDGE, INEXACT_DUPLICATE_SUBJECT_NODE), pipeline_storage, whole_graph_check="fingerprint")
+        fail()
+    except ValueError:
+        pass
+
+
+def test_fingerprint_without_plyvel(monkeypatch, pipeline_storage):
+    import mowgli_etl.pipeline_wrapper
+    monkeypatch.setattr(mowgli_etl.pipeline_wrapper, "FingerprintWholeGraphChecker", None)
+    with pytest.raises(ModuleNotFoundError):
+        run((SUBJECT_NODE, OBJECT_NODE, EDGE), pipeline_storage, whole_graph_check="fingerprint")
+
+
+def test_external_sort_exact_duplicate_node(pipeline_storage):
+    transformed = tuple(transform((SUBJECT_NODE, OBJECT_NODE, EDGE, EXACT_DUPLICATE_SUBJECT_NODE), pipeline_storage, whole_graph_check="external_sort"))
+    assert transformed == (SUBJECT_NODE, OBJECT_NODE, EDGE)
+
+
+def test_external_sort_extraneous_node(pipeline_storage):
+    try:
+        run((SUBJECT_NODE, OBJECT_NODE,
+             KgEdge.legacy(subject=SUBJECT_NODE.id, object="externalnode", predicate=DATASOURCE,
+                  datasource=DATASOURCE)), pipeline_storage, whole_graph_check="external_sort")
+        fail()
+    except ValueError as e:
+        assert str(e) == "node %s not used by an edge" % OBJECT_NODE.id
+
+
+def test_run_report(pipeline_storage):
+    run((SUBJECT_NODE, OBJECT_NODE, EDGE), pipeline_storage)
+    with open(pipeline_storage.loaded_data_dir_path / PipelineRunReport.FILE_NAME) as run_report_file:
+        run_report = json.load(run_report_file)
+    assert run_report["succeeded"]
+    stages = {stage["name"]: stage for stage in run_report["stages"]}
+    assert [stage["name"] for stage in run_report["stages"]] == ["extract", "transform", "whole_graph_check", "load"]
+    assert stages["transform"]["model_counts"] == {"KgEdge": 1, "KgNode": 2}
+    assert stages["whole_graph_check"]["model_count"] == 3
+
+
+def test_run_report_failed(pipeline_storage):
+    try:
+        run((SUBJECT_NODE, OBJECT_NODE, EDGE, INEXACT_DUPLICATE_SUBJECT_NODE), pipeline_storage)
+        fail()
+    except ValueError:
+        pass
+    with open(pipeline_storage.loaded_data_dir_path / PipelineRunReport.FILE_NAME) as run_report_file:
+        assert not json.load(run_report_file)["succeeded"]
+
+
+def test_pipelined(graph_generator, pipeline_storage, tmp_path):
+    graph = tuple(islice(graph_generator, 3000))
+    run(graph, pipeline_storage)
+    serial_file_contents = loaded_file_contents(pipeline_storage)
+    pipelined_storage = PipelineStorage(pipeline_id="test", root_data_dir_path=tmp_path)
+    run(graph, pipelined_storage, pipelined=True, handoff_batch_size=7, handoff_queue_depth=2)
+    pipelined_file_contents = loaded_file_contents(pipelined_storage)
+    assert serial_file_contents
+    assert pipelined_file_contents == serial_file_contents
+
+
+def test_pipelined_exception(pipeline_storage):
+    try:
+        run((SUBJECT_NODE, OBJECT_NODE, EDGE, INEXACT_DUPLICATE_SUBJECT_NODE), pipeline_storage, pipelined=True)
+        fail()
+    except ValueError:
+        pass
+
+
+class CrashingSequence:
+    def __init__(self, node_edge_sequence: Tuple[Union[KgNode, KgEdge], ...], crash_after: int):
+        self.__crash_after = crash_after
+        self.__node_edge_sequence = node_edge_sequence
+
+    def __iter__(self):
+        yield from self.__node_edge_sequence[:self.__crash_after]
+        raise RuntimeError("crash")
+
+
+@pytest.mark.parametrize("loader", ("cskg_csv", "kgtk_edges_tsv"))
+def test_resume(graph_generator, loader, pipeline_storage, tmp_path):
+    pytest.importorskip("plyvel")
+    graph = tuple(islice(graph_generator, 3000))
+    run(graph, pipeline_storage, loader=loader)
+    expected_file_contents = loaded_file_contents(pipeline_storage)
+
+    resumed_storage = PipelineStorage(pipeline_id="test", root_data_dir_path=tmp_path)
+    try:
+        run(CrashingSequence(graph, 1234), resumed_storage, checkpoint_interval=100, loader=loader)
+        fail()
+    except RuntimeError:
+        pass
+    # Output was written past the last checkpoint before the crash
+    assert PipelineCheckpoint.read(resumed_storage.checkpoint_data_dir_path).model_count == 1200
+    run(graph, resumed_storage, checkpoint_interval=100, loader=loader, resume=True)
+    assert loaded_file_contents(resumed_storage) == expected_file_contents
+    assert not tuple(resumed_storage.checkpoint_data_dir_path.iterdir())
+
+
+def test_resume_after_crash_in_checkpoint(graph_generator, monkeypatch, pipeline_storage, tmp_path):
+    pytest.importorskip("plyvel")
+    graph = tuple(islice(graph_generator, 3000))
+    run(graph, pipeline_storage)
+    expected_file_contents = loaded_file_contents(pipeline_storage)
+
+    # Crash after the checker's sets are flushed for the checkpoint at 1300 models, before it's committed
+    write_checkpoint = PipelineCheckpoint.write
+
+    def crashing_write_checkpoint(checkpoint, directory_path):
+        if checkpoint.model_count == 1300:
+            raise RuntimeError("crash")
+        write_checkpoint(checkpoint, directory_path)
+
+    resumed_storage = PipelineStorage(pipeline_id="test", root_data_dir_path=tmp_path)
+    monkeypatch.setattr(PipelineCheckpoint, "write", crashing_write_checkpoint)
+    try:
+        run(graph, resumed_storage, checkpoint_interval=100)
+        fail()
+    except RuntimeError:
+        pass
+    monkeypatch.setattr(PipelineCheckpoint, "write", write_checkpoint)
+    assert PipelineCheckpoint.read(resumed_storage.checkpoint_data_dir_path).model_count == 1200
+    run(graph, resumed_storage, checkpoint_interval=100, resume=True)
+    assert loaded_file_contents(resumed_storage) == expected_file_contents
+
+
+def test_resume_without_checkpoint(pipeline_storage):
+    pytest.importorskip("plyvel")
+    run((SUBJECT_NODE, OBJECT_NODE, EDGE), pipeline_storage, resume=True)
+    assert (pipeline_storage.loaded_data_dir_path / "edges.csv").read_text().count("\n") == 2
+
+
+def test_checkpoint_unsupported_whole_graph_check(pipeline_storage):
+    try:
+        run((SUBJECT_NODE, OBJECT_NODE, EDGE), pipeline_storage, checkpoint_interval=1, whole_graph_check="bloom_filter")
+        fail()
+    except ValueError:
+        pass
+
+
+def test_replay_transform_output(graph_generator, pipeline_storage, tmp_path):
+    graph = tuple(islice(graph_generator, 3000))
+    run(graph, pipeline_storage, spill_transform_output=True)
+    expected_storage = PipelineStorage(pipeline_id="test", root_data_dir_path=tmp_path)
+    run(graph, expected_storage, loader="kgtk_edges_tsv")
+
+    # Replay into a different loader, with a transformer that would fail
+    run(CrashingSequence(graph, 0), pipeline_storage, loader="kgtk_edges_tsv", replay_transform_output=True)
+    replayed_file_contents = loaded_file_contents(pipeline_storage)
+    assert replayed_file_contents["edges.tsv"] == loaded_file_contents(expected_storage)["edges.tsv"]
+
+
+def test_multiple_loaders(graph_generator, pipeline_storage, tmp_path):
+    graph = tuple(islice(graph_generator, 300))
+    expected_file_contents = {}
+    for loader in ("cskg_csv", "kgtk_edges_tsv"):
+        storage = PipelineStorage(pipeline_id=loader, root_data_dir_path=tmp_path)
+        run(graph, storage, loader=loader)
+        expected_file_contents.update(loaded_file_contents(storage))
+
+    run(graph, pipeline_storage, loader="cskg_csv, kgtk_edges_tsv")
+    assert loaded_file_contents(pipeline_storage) == expected_file_contents
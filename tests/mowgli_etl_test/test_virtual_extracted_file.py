@@ -0,0 +1,35 @@
+import bz2
+from zipfile import ZipFile
+
+from mowgli_etl.virtual_extracted_file import VirtualExtractedFile, open_extracted_file
+
+_TEXT = "cue,response\nä,b\n" * 1000
+
+
+def test_bz2(tmp_path):
+    bz2_file_path = tmp_path / "test.csv.bz2"
+    bz2_file_path.write_bytes(bz2.compress(_TEXT.encode("utf-8")))
+    file_ = VirtualExtractedFile(compressed_file_path=bz2_file_path)
+    assert file_.name == "test.csv"
+    with open_extracted_file(file_, encoding="utf-8") as text_file:
+        assert text_file.read() == _TEXT
+    with file_.open("rb") as binary_file:
+        assert binary_file.read() == _TEXT.encode("utf-8")
+
+
+def test_zip_member(tmp_path):
+    zip_file_path = tmp_path / "test.zip"
+    with ZipFile(zip_file_path, "w") as zip_file:
+        zip_file.writestr("other.txt", "other")
+        zip_file.writestr("dir/test.csv", _TEXT.encode("utf-8"))
+    file_ = VirtualExtractedFile(compressed_file_path=zip_file_path, member_name="dir/test.csv")
+    assert file_.name == "dir/test.csv"
+    with open_extracted_file(file_, "r", encoding="utf-8") as text_file:
+        assert list(text_file) == _TEXT.splitlines(keepends=True)
+
+
+def test_path(tmp_path):
+    file_path = tmp_path / "test.csv"
+    file_path.write_text(_TEXT, encoding="utf-8")
+    with open_extracted_file(file_path, encoding="utf-8") as text_file:
+        assert text_file.read() == _TEXT
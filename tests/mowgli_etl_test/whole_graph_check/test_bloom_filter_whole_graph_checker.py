@@ -0,0 +1,58 @@
+from itertools import islice
+
+import pytest
+
+from mowgli_etl.model.kg_edge import KgEdge
+from mowgli_etl.model.kg_node import KgNode
+from mowgli_etl.whole_graph_check.bloom_filter_whole_graph_checker import BloomFilterWholeGraphChecker
+
+
+def check(models, **kwds):
+    checked_models = []
+    with BloomFilterWholeGraphChecker(**kwds) as checker:
+        for model in models:
+            if isinstance(model, KgNode):
+                if not checker.check_kg_node(model):
+                    continue
+            elif isinstance(model, KgEdge):
+                checker.check_kg_edge(model)
+                checker.add_used_node_id(model.subject)
+                checker.add_used_node_id(model.object)
+            checked_models.append(model)
+        checker.check_complete_graph()
+    return tuple(checked_models)
+
+
+# A tiny, inaccurate filter produces many false positives, which must not cause false violations
+@pytest.mark.parametrize("filter_kwds", ({}, {"capacity": 1, "error_rate": 0.5}))
+def test_valid_graph(filter_kwds, graph_generator):
+    graph = tuple(islice(graph_generator, 3000))
+    assert check(graph, **filter_kwds) == graph
+
+
+@pytest.mark.parametrize("filter_kwds", ({}, {"capacity": 1, "error_rate": 0.5}))
+def test_exact_duplicate_node(filter_kwds, graph_generator):
+    graph = tuple(islice(graph_generator, 3000))
+    assert check(graph + (graph[0],), **filter_kwds) == graph
+
+
+@pytest.mark.parametrize("filter_kwds", ({}, {"capacity": 1, "error_rate": 0.5}))
+def test_inexact_duplicate_node(filter_kwds, graph_generator):
+    graph = tuple(islice(graph_generator, 3000))
+    with pytest.raises(ValueError, match="nodes with same id, different contents"):
+        check(graph + (graph[0]._replace(labels=("other label",)),), **filter_kwds)
+
+
+@pytest.mark.parametrize("filter_kwds", ({}, {"capacity": 1, "error_rate": 0.5}))
+def test_duplicate_edge(filter_kwds, graph_generator):
+    graph = tuple(islice(graph_generator, 3000))
+    with pytest.raises(ValueError, match="duplicate edge"):
+        check(graph + (graph[2],), **filter_kwds)
+
+
+@pytest.mark.parametrize("filter_kwds", ({}, {"capacity": 1, "error_rate": 0.5}))
+def test_unused_node(filter_kwds, graph_generator):
+    graph = tuple(islice(graph_generator, 3000))
+    unused_node = KgNode.legacy(datasource="test_datasource", id="test_unused_node", label="test node")
+    with pytest.raises(ValueError, match="node test_unused_node not used by an edge"):
+        check(graph + (unused_node,), **filter_kwds)
@@ -0,0 +1,66 @@
+from itertools import islice
+
+import pytest
+
+from mowgli_etl.model.kg_edge import KgEdge
+from mowgli_etl.model.kg_node import KgNode
+from mowgli_etl.whole_graph_check.external_sort_whole_graph_checker import ExternalSortWholeGraphChecker
+
+
+def check(models, **kwds):
+    checked_models = []
+    with ExternalSortWholeGraphChecker(**kwds) as checker:
+        for model in models:
+            if isinstance(model, KgNode):
+                if not checker.check_kg_node(model):
+                    continue
+            elif isinstance(model, KgEdge):
+                checker.check_kg_edge(model)
+                checker.add_used_node_id(model.subject)
+                checker.add_used_node_id(model.object)
+            checked_models.append(model)
+        checker.check_complete_graph()
+    return tuple(checked_models)
+
+
+# Tiny runs exercise the k-way merge
+@pytest.mark.parametrize("checker_kwds", ({}, {"run_size": 7}))
+def test_valid_graph(checker_kwds, graph_generator):
+    graph = tuple(islice(graph_generator, 3000))
+    assert check(graph, **checker_kwds) == graph
+
+
+@pytest.mark.parametrize("checker_kwds", ({}, {"run_size": 7}))
+def test_exact_duplicate_node(checker_kwds, graph_generator):
+    graph = tuple(islice(graph_generator, 3000))
+    assert check(graph + (graph[0],), **checker_kwds) == graph
+
+
+@pytest.mark.parametrize("checker_kwds", ({}, {"run_size": 7}))
+def test_inexact_duplicate_node(checker_kwds, graph_generator):
+    graph = tuple(islice(graph_generator, 3000))
+    with pytest.raises(ValueError, match="nodes with same id, different contents"):
+        check(graph + (graph[0]._replace(labels=("other label",)),), **checker_kwds)
+
+
+@pytest.mark.parametrize("checker_kwds", ({}, {"run_size": 7}))
+def test_duplicate_edge(checker_kwds, graph_generator):
+    graph = tuple(islice(graph_generator, 3000))
+    with pytest.raises(ValueError, match="duplicate edge"):
+        check(graph + (graph[2],), **checker_kwds)
+
+
+@pytest.mark.parametrize("checker_kwds", ({}, {"run_size": 7}))
+def test_unused_node(checker_kwds, graph_generator):
+    graph = tuple(islice(graph_generator, 3000))
+    unused_node = KgNode.legacy(datasource="test_datasource", id="test_unused_node", label="test node")
+    with pytest.raises(ValueError, match="node test_unused_node not used by an edge"):
+        check(graph + (unused_node,), **checker_kwds)
+
+
+@pytest.mark.parametrize("checker_kwds", ({}, {"run_size": 7}))
+def test_first_violation(checker_kwds, graph_generator):
+    graph = tuple(islice(graph_generator, 3000))
+    # The duplicate edge comes before the inexact duplicate node, like the exact checker would report it
+    with pytest.raises(ValueError, match="duplicate edge"):
+        check(graph + (graph[2], graph[0]._replace(labels=("other label",))), **checker_kwds)
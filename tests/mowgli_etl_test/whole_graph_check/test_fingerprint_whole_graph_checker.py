@@ -0,0 +1,59 @@
+from itertools import islice
+
+import pytest
+
+from mowgli_etl.model.kg_edge import KgEdge
+from mowgli_etl.model.kg_node import KgNode
+
+try:
+    from mowgli_etl.whole_graph_check.fingerprint_whole_graph_checker import FingerprintWholeGraphChecker
+except ImportError:
+    FingerprintWholeGraphChecker = None
+
+
+def check(models):
+    checked_models = []
+    with FingerprintWholeGraphChecker() as checker:
+        for model in models:
+            if isinstance(model, KgNode):
+                if not checker.check_kg_node(model):
+                    continue
+            elif isinstance(model, KgEdge):
+                checker.check_kg_edge(model)
+                checker.add_used_node_ids((model.subject, model.object))
+            checked_models.append(model)
+        checker.check_complete_graph()
+    return tuple(checked_models)
+
+
+if FingerprintWholeGraphChecker is not None:
+    def test_valid_graph(graph_generator):
+        graph = tuple(islice(graph_generator, 3000))
+        assert check(graph) == graph
+
+
+    def test_exact_duplicate_node(graph_generator):
+        graph = tuple(islice(graph_generator, 3000))
+        assert check(graph + (graph[0],)) == graph
+
+
+    def test_inexact_duplicate_node(graph_generator):
+        graph = tuple(islice(graph_generator, 3000))
+        duplicate_node = graph[0]._replace(labels=("other label",))
+        with pytest.raises(ValueError) as excinfo:
+            check(graph + (duplicate_node,))
+        assert str(excinfo.value) == "nodes with same id, different contents: original=%s, duplicate=%s" % (graph[0], duplicate_node)
+
+
+    def test_duplicate_edge(graph_generator):
+        graph = tuple(islice(graph_generator, 3000))
+        with pytest.raises(ValueError) as excinfo:
+            check(graph + (graph[2],))
+        assert str(excinfo.value) == "duplicate edge: original=%s, duplicate=%s" % (graph[2], graph[2])
+
+
+    def test_unused_node(graph_generator):
+        graph = tuple(islice(graph_generator, 3000))
+        unused_node = KgNode.legacy(datasource="test_datasource", id="test_unused_node", label="test node")
+        with pytest.raises(ValueError, match="node test_unused_node not used by an edge"):
+            check(graph + (unused_node,))